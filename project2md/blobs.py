@@ -0,0 +1,254 @@
+# project2md/blobs.py
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional, Tuple, TypeVar
+import logging
+import queue
+import subprocess
+import threading
+
+logger = logging.getLogger(__name__)
+
+Key = TypeVar('Key')
+
+# Requests queued between the thread writing object ids and the reader
+_MAX_QUEUED = 1024
+_DONE = object()
+
+class BlobReaderError(Exception):
+    """Custom exception for errors reading from the object database."""
+    pass
+
+class BlobReader:
+    """
+    Reads blobs through long-running `git cat-file` processes.
+
+    Single reads share one `git cat-file --batch` process. Streams of
+    requests get a process of their own: a feeder thread writes object ids
+    while the caller reads the answers, so git never waits for a round
+    trip. When a size limit is given, sizes are first looked up with
+    `--batch-check` and oversized blobs are never transferred.
+    """
+
+    def __init__(self, git_dir: Path):
+        self.git_dir = Path(git_dir)
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def read(self, oid: str) -> Optional[bytes]:
+        """Read one blob, returning None if it does not exist."""
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                self._process = self._start('--batch')
+            try:
+                self._process.stdin.write(oid.encode('ascii') + b'\n')
+                self._process.stdin.flush()
+            except OSError as e:
+                raise BlobReaderError(f"git cat-file failed: {e}")
+            size = self._read_header(self._process.stdout, with_content=True)
+            return self._read_content(self._process.stdout, size)
+
+    def read_many(
+        self,
+        requests: Iterable[Tuple[Key, Optional[str]]],
+        max_size: Optional[int] = None
+    ) -> Iterator[Tuple[Key, Optional[bytes]]]:
+        """
+        Read many blobs in one pipelined stream.
+
+        Args:
+            requests: (key, oid) pairs, consumed lazily. Pairs without an
+                oid are passed through, so callers can mix in items whose
+                result is already known without losing the order.
+            max_size: Skip blobs larger than this many bytes without
+                transferring them
+
+        Yields:
+            (key, contents) in request order; contents is None for requests
+            without an oid and for missing, non-blob or oversized objects
+        """
+        if max_size is not None:
+            requests = (
+                (key, oid if size is not None and size <= max_size else None)
+                for key, oid, size in self._stream('--batch-check', requests)
+            )
+        stream = self._stream('--batch', requests)
+        for key, oid, size in stream:
+            # The content of each answer must be read before the next header
+            yield key, self._read_content(stream.stdout, size) if oid is not None else None
+
+    def get_sizes(self, oids: Iterable[str]) -> Iterator[Tuple[str, Optional[int]]]:
+        """Look up the size of many blobs in one pipelined stream, None if missing."""
+        for oid, _, size in self._stream('--batch-check', ((oid, oid) for oid in oids)):
+            yield oid, size
+
+    def close(self) -> None:
+        """Stop the process used for single reads."""
+        with self._lock:
+            if self._process is not None:
+                self._stop(self._process)
+                self._process = None
+
+    def _stream(self, option: str, requests: Iterable[Tuple[Key, Optional[str]]]) -> '_Stream':
+        """Start a cat-file process answering the requests in the background."""
+        return _Stream(self._start(option), requests, with_content=option == '--batch')
+
+    def _start(self, *options: str) -> subprocess.Popen:
+        """Start `git cat-file` with the given options."""
+        try:
+            return subprocess.Popen(
+                ['git', f'--git-dir={self.git_dir}', 'cat-file', *options],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            raise BlobReaderError(f"Failed to start git cat-file: {e}")
+
+    @staticmethod
+    def _stop(process: subprocess.Popen) -> None:
+        """Close a cat-file process's pipes and wait for it to exit."""
+        for pipe in (process.stdin, process.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    @staticmethod
+    def _read_header(stdout: IO[bytes], with_content: bool) -> Optional[int]:
+        """
+        Read the header line of one answer.
+
+        Args:
+            stdout: Output of the cat-file process
+            with_content: Whether the answer carries the object's content (--batch)
+
+        Returns:
+            The object size, or None if the object is missing or is not a blob
+            (in which case its content has been skipped)
+        """
+        line = stdout.readline()
+        if not line.endswith(b'\n'):
+            raise BlobReaderError("git cat-file exited unexpectedly")
+        fields = line.split()
+        if len(fields) != 3:
+            logger.debug(f"git cat-file: {line.decode('utf-8', 'replace').strip()}")
+            return None
+        size = int(fields[2])
+        if fields[1] != b'blob':
+            if with_content:
+                BlobReader._read_content(stdout, size)
+            return None
+        return size
+
+    @staticmethod
+    def _read_content(stdout: IO[bytes], size: Optional[int]) -> Optional[bytes]:
+        """Read the content that follows a header, including its trailing newline."""
+        if size is None:
+            return None
+        data = stdout.read(size + 1)
+        if len(data) != size + 1:
+            raise BlobReaderError("git cat-file exited unexpectedly")
+        return data[:-1]
+
+class _Stream:
+    """
+    One cat-file process answering a stream of requests.
+
+    A feeder thread writes the object ids and queues which requests were
+    sent; iterating reads the header of each answer in the same order.
+    With --batch, the caller reads each content from stdout itself.
+
+    Every object id is flushed as soon as it is written, so git can answer
+    it at once, even while the feeder waits for the next request.
+    """
+
+    def __init__(
+        self,
+        process: subprocess.Popen,
+        requests: Iterable[Tuple[Key, Optional[str]]],
+        with_content: bool
+    ):
+        self.process = process
+        self.stdout = process.stdout
+        self._requests = requests
+        self._with_content = with_content
+        self._queue: queue.Queue = queue.Queue(maxsize=_MAX_QUEUED)
+        self._stopped = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._feeder = threading.Thread(target=self._feed, name='project2md-cat-file', daemon=True)
+        self._feeder.start()
+
+    def __iter__(self) -> Iterator[Tuple[Key, Optional[str], Optional[int]]]:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _DONE:
+                    break
+                key, oid = item
+                try:
+                    size = BlobReader._read_header(self.stdout, self._with_content) if oid is not None else None
+                except BlobReaderError:
+                    self._raise_feed_error()
+                    raise
+                yield key, oid if size is not None else None, size
+            self._raise_feed_error()
+        finally:
+            self._stopped.set()
+            if self.process.poll() is None:
+                self.process.kill()  # unblocks a feeder stuck writing
+            self._feeder.join()
+            BlobReader._stop(self.process)
+
+    def _raise_feed_error(self) -> None:
+        """Re-raise an error the feeder ran into, if any."""
+        if self._error is None:
+            return
+        if isinstance(self._error, OSError):
+            raise BlobReaderError(f"Failed to send requests to git cat-file: {self._error}")
+        # Errors from the requests iterable itself surface unchanged
+        raise self._error
+
+    def _feed(self) -> None:
+        """Write the object ids of all requests, then close stdin."""
+        try:
+            for key, oid in self._requests:
+                if not self._put((key, oid)):
+                    return
+                if oid is not None:
+                    self.process.stdin.write(oid.encode('ascii') + b'\n')
+                    # The reader may already wait for this answer, and the next
+                    # request may only come once it got it
+                    self.process.stdin.flush()
+        except Exception as e:
+            if not self._stopped.is_set():
+                self._error = e
+        finally:
+            # Closing stdin lets git answer everything queued and exit
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+            close = getattr(self._requests, 'close', None)
+            if close is not None:
+                close()
+            self._put(_DONE)
+
+    def _put(self, item) -> bool:
+        """Queue an item unless the reader has gone away."""
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
@@ -0,0 +1,292 @@
+# project2md/cache.py
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contents (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    text TEXT,
+    encoding TEXT,
+    is_binary INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    tokens INTEGER,
+    tokenizer TEXT,
+    PRIMARY KEY (root, path)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    oid TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    text TEXT,
+    encoding TEXT,
+    is_binary INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    tokens INTEGER,
+    tokenizer TEXT
+)
+"""
+
+# Columns that cache files written by older versions lack, added on open
+_ADDED_COLUMNS = (('tokens', 'INTEGER'), ('tokenizer', 'TEXT'))
+
+# Seconds to wait for another process's write to finish before giving up
+_BUSY_TIMEOUT = 5.0
+
+class CacheEntry(NamedTuple):
+    """Result of reading a file, as stored in the cache."""
+    text: Optional[str]
+    encoding: Optional[str]
+    is_binary: bool
+    tokens: Optional[int] = None  # token count of text, by the named tokenizer
+    tokenizer: Optional[str] = None
+
+class ContentCache:
+    """
+    On-disk cache of decoded file contents, stored in SQLite.
+
+    Entries are keyed by repository root and relative path, and are only
+    used while the file's size, mtime_ns and inode are unchanged. Files
+    tracked by git can instead be stored under their blob id, which stays
+    valid across branches, clones and repositories. Once the stored files
+    add up to more than max_size bytes, the least recently used entries
+    are evicted when the cache is closed.
+
+    Every stored entry is committed at once, so several runs can share one
+    cache directory. Lookups only note when an entry was used; these times
+    are written together, in one transaction, when the cache is evicted or
+    closed. A database error is treated as a miss or a skipped write:
+    the cache can only make reads faster, never make them fail.
+    """
+
+    FILENAME = 'contents.sqlite'
+
+    def __init__(self, cache_dir: Path, max_size: int):
+        self.path = Path(cache_dir).expanduser() / self.FILENAME
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # last_used times of entries hit since they were last written
+        self._used_contents: Dict[Tuple[str, str], float] = {}
+        self._used_blobs: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Read workers share the connection, serialized by the lock
+        self._conn = sqlite3.connect(str(self.path), timeout=_BUSY_TIMEOUT, check_same_thread=False)
+        try:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            # In WAL mode this keeps the per-write commits from syncing to disk
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        except sqlite3.DatabaseError as e:
+            logger.debug(f"WAL mode not available for {self.path}: {e}")
+        self._conn.executescript(_SCHEMA)
+        self._add_columns()
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, config) -> Optional['ContentCache']:
+        """Open the cache configured in config.cache, or None if it is disabled or unusable."""
+        if not config.cache.enabled:
+            return None
+        try:
+            return cls(Path(config.cache.dir), config.cache.max_size_bytes)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Content cache disabled: {e}")
+            return None
+
+    def get(self, root: Path, rel_path: str, file_stat: os.stat_result) -> Optional[CacheEntry]:
+        """
+        Look up a file, returning None unless the stored stat still matches.
+
+        Args:
+            root: Repository root the path is relative to
+            rel_path: POSIX path relative to root
+            file_stat: Current stat of the file
+        """
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    'SELECT size, mtime_ns, inode, text, encoding, is_binary, tokens, tokenizer '
+                    'FROM contents WHERE root = ? AND path = ?',
+                    (str(root), rel_path)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.debug(f"Cache lookup of {rel_path} failed: {e}")
+                row = None
+            if row is None or tuple(row[:3]) != self.identity(file_stat):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._used_contents[(str(root), rel_path)] = time.time()
+        return CacheEntry(row[3], row[4], bool(row[5]), row[6], row[7])
+
+    def put(self, root: Path, rel_path: str, file_stat: os.stat_result, entry: CacheEntry) -> None:
+        """Store the result of reading a file with the stat it was read with."""
+        size, mtime_ns, inode = self.identity(file_stat)
+        with self._lock:
+            self._write(
+                'INSERT OR REPLACE INTO contents '
+                '(root, path, size, mtime_ns, inode, text, encoding, is_binary, last_used, tokens, tokenizer) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (str(root), rel_path, size, mtime_ns, inode,
+                 entry.text, entry.encoding, int(entry.is_binary), time.time(), entry.tokens, entry.tokenizer)
+            )
+
+    def get_blob(self, oid: str) -> Optional[CacheEntry]:
+        """Look up the contents of a git blob by its object id."""
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    'SELECT text, encoding, is_binary, tokens, tokenizer FROM blobs WHERE oid = ?', (oid,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.debug(f"Cache lookup of blob {oid} failed: {e}")
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._used_blobs[oid] = time.time()
+        return CacheEntry(row[0], row[1], bool(row[2]), row[3], row[4])
+
+    def put_blob(self, oid: str, size: int, entry: CacheEntry) -> None:
+        """Store the result of reading a file whose content is the given git blob."""
+        with self._lock:
+            self._write(
+                'INSERT OR REPLACE INTO blobs (oid, size, text, encoding, is_binary, last_used, tokens, tokenizer) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (oid, size, entry.text, entry.encoding, int(entry.is_binary), time.time(),
+                 entry.tokens, entry.tokenizer)
+            )
+
+    def evict(self) -> int:
+        """
+        Drop least recently used entries until the total size fits max_size.
+
+        The use times noted by lookups are written first.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            self._write_used()
+            try:
+                removed = self._evict()
+            except sqlite3.Error as e:
+                self._rollback()
+                logger.warning(f"Failed to evict entries from {self.path}: {e}")
+                return 0
+        logger.debug(f"Evicted {removed} entries from {self.path}")
+        return removed
+
+    def close(self) -> None:
+        """Evict over-limit entries, commit and close the database."""
+        try:
+            self.evict()
+            with self._lock:
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to update {self.path}: {e}")
+        finally:
+            self._conn.close()
+
+    def _evict(self) -> int:
+        """Delete least recently used entries in one transaction; the caller holds the lock."""
+        total = self._conn.execute(
+            'SELECT (SELECT COALESCE(SUM(size), 0) FROM contents)'
+            ' + (SELECT COALESCE(SUM(size), 0) FROM blobs)'
+        ).fetchone()[0]
+        if total <= self.max_size:
+            return 0
+        doomed = {'contents': [], 'blobs': []}
+        for table, rowid, size, _ in self._conn.execute(
+            "SELECT 'contents', rowid, size, last_used FROM contents"
+            " UNION ALL SELECT 'blobs', rowid, size, last_used FROM blobs"
+            " ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_size:
+                break
+            doomed[table].append((rowid,))
+            total -= size
+        for table, rowids in doomed.items():
+            self._conn.executemany(f'DELETE FROM {table} WHERE rowid = ?', rowids)
+        self._conn.commit()
+        return sum(len(rowids) for rowids in doomed.values())
+
+    def _write_used(self) -> None:
+        """Write the noted use times in one transaction; the caller holds the lock."""
+        if not self._used_contents and not self._used_blobs:
+            return
+        try:
+            self._conn.executemany(
+                'UPDATE contents SET last_used = ? WHERE root = ? AND path = ?',
+                [(used, root, path) for (root, path), used in self._used_contents.items()]
+            )
+            self._conn.executemany(
+                'UPDATE blobs SET last_used = ? WHERE oid = ?',
+                [(used, oid) for oid, used in self._used_blobs.items()]
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            self._rollback()
+            logger.debug(f"Skipped updating use times in {self.path}: {e}")
+        self._used_contents.clear()
+        self._used_blobs.clear()
+
+    def _write(self, sql: str, params: tuple) -> None:
+        """Run one write and commit it, or skip it on a database error; the caller holds the lock."""
+        try:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+        except sqlite3.Error as e:
+            self._rollback()
+            logger.debug(f"Skipped cache write to {self.path}: {e}")
+
+    def _rollback(self) -> None:
+        """Abandon the open transaction, if any."""
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _add_columns(self) -> None:
+        """Add columns missing from a cache file written by an older version."""
+        for table in ('contents', 'blobs'):
+            existing = {row[1] for row in self._conn.execute(f'PRAGMA table_info({table})')}
+            for column, kind in _ADDED_COLUMNS:
+                if column in existing:
+                    continue
+                try:
+                    self._conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {kind}')
+                except sqlite3.OperationalError as e:
+                    # Another process may have added it first
+                    logger.debug(f"Could not add {table}.{column} to {self.path}: {e}")
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get lookup statistics for this run.
+
+        Returns:
+            Dictionary with hits, misses and hit_rate as a percentage
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+        }
+
+    @staticmethod
+    def identity(file_stat: os.stat_result) -> Tuple[int, int, int]:
+        """Stat fields that must be unchanged for an entry to be used."""
+        return file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino
@@ -1,15 +1,20 @@
 # project2md/cli.py
+import re
 import sys
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 import click
 from rich.console import Console
+from rich.text import Text
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskID
 import logging
 
 from .config import Config, ConfigError, OutputFormat
 from .git import GitHandler
 from .walker import FileSystemWalker
+from .cache import ContentCache
+from .incremental import IncrementalGenerator, manifest_path
+from .sharding import ShardedGenerator, index_path, part_budget, part_pattern
 from .formatters.factory import get_formatter  # Single formatter import
 from .formatters.base import BaseFormatter
 from .stats import StatsCollector
@@ -23,13 +28,24 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 console = Console()
 
+class CountOrPercentageColumn(TextColumn):
+    """Shows a task's percentage, or how many steps are done while its total is unknown."""
+
+    def __init__(self):
+        super().__init__("[progress.percentage]{task.percentage:>3.0f}%")
+
+    def render(self, task) -> Text:
+        if task.total is None:
+            return Text(f"{task.completed:>4.0f}", style="progress.percentage")
+        return super().render(task)
+
 def setup_progress() -> Progress:
     """Create a Rich progress bar instance."""
     return Progress(
         SpinnerColumn(),
         TextColumn("[bold blue]{task.description}"),
         BarColumn(),
-        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+        CountOrPercentageColumn(),
         console=console,
     )
 
@@ -81,7 +97,10 @@ def init(root_dir: str, force: bool):
 )
 @click.option(
     "--branch",
-    help="Specific branch to checkout (defaults to 'main')",
+    "--ref",
+    "branch",
+    help="Branch to process (defaults to the remote's default branch, or the current one locally). "
+         "In local repositories also a tag or commit, read from git objects without changing the checkout",
 )
 @click.option(
     "--target",
@@ -130,10 +149,65 @@ def init(root_dir: str, force: bool):
 )
 @click.option(
     "--format",
-    type=click.Choice(['markdown', 'json', 'yaml'], case_sensitive=False),
+    type=click.Choice(['markdown', 'json', 'jsonl', 'yaml'], case_sensitive=False),
     default='markdown',
     help="Output format (default: markdown)",
 )
+@click.option(
+    "--read-workers",
+    type=click.IntRange(min=1),
+    help="Number of files to read in parallel (overrides general.read_workers)",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=None,
+    help="Only re-read files changed since the last run and update the existing output",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=None,
+    help="Reuse file contents decoded by earlier runs (overrides cache.enabled)",
+)
+@click.option(
+    "--no-checkout",
+    is_flag=True,
+    default=None,
+    help="Read files from the branch's commit in the git object database instead of a checked out working tree",
+)
+@click.option(
+    "--check-dirty",
+    is_flag=True,
+    default=None,
+    help="Check for uncommitted changes (overrides general.check_dirty)",
+)
+@click.option(
+    "--diff",
+    help="Only process files changed between two refs, given as base..head or base...head",
+)
+@click.option(
+    "--diff-tree",
+    type=click.Choice(['changed', 'full'], case_sensitive=False),
+    help="Show only the changed paths or the full tree of head in --diff runs (overrides output.diff_tree)",
+)
+@click.option(
+    "--max-part-size",
+    help="Split the output into numbered parts of at most this size, e.g. 200KB (overrides output.max_part_size)",
+)
+@click.option(
+    "--max-part-tokens",
+    type=click.IntRange(min=1),
+    help="Split the output into numbered parts of at most this many estimated tokens (overrides output.max_part_tokens)",
+)
+@click.option(
+    "--tokenizer",
+    help='Token counter for statistics: "approximate" or "tiktoken[:<encoding>]" (overrides output.tokenizer)',
+)
+@click.option(
+    "--mirror-cache/--no-mirror-cache",
+    default=None,
+    help="Keep a local mirror of --repo and only fetch new objects (overrides cache.mirrors)",
+)
 def process(
     repo_url: Optional[str],
     root_dir: Optional[str],
@@ -147,6 +221,17 @@ def process(
     force: bool,
     branch: Optional[str],
     format: str,
+    read_workers: Optional[int],
+    cache: Optional[bool],
+    incremental: Optional[bool],
+    mirror_cache: Optional[bool],
+    no_checkout: Optional[bool],
+    check_dirty: Optional[bool],
+    diff: Optional[str],
+    diff_tree: Optional[str],
+    max_part_size: Optional[str],
+    max_part_tokens: Optional[int],
+    tokenizer: Optional[str],
 ) -> None:
     """
     Transform Git repositories or local directories into comprehensive Markdown documentation.
@@ -172,26 +257,33 @@ def process(
         # Update target directory in config
         config.target_dir = working_dir
         
+        content_cache = ContentCache.from_config(config)
         with setup_progress() as progress:
             # Initialize components
             git_handler = GitHandler(config, progress)
-            walker = FileSystemWalker(config, progress)
+            walker = FileSystemWalker(config, progress, content_cache)
             stats_collector = StatsCollector()
 
             # Get appropriate formatter using factory
             formatter = get_formatter(config)
+            formatter.token_counter = walker.get_tokens
 
             # Main workflow
-            process_repository(
-                config,
-                git_handler,
-                walker,
-                formatter,  # Pass the formatter
-                stats_collector,
-                progress,
-                force,
-                message_handler
-            )
+            try:
+                process_repository(
+                    config,
+                    git_handler,
+                    walker,
+                    formatter,  # Pass the formatter
+                    stats_collector,
+                    progress,
+                    force,
+                    message_handler
+                )
+            finally:
+                git_handler.cleanup()
+                if content_cache is not None:
+                    content_cache.close()
 
             # Print completion message with statistics
             message_handler.print_completion_message(str(config.output_file))
@@ -259,14 +351,13 @@ def load_configuration(config_file: Optional[str], cli_args: dict) -> Config:
         # Apply smart defaults if no patterns configured
         config.apply_smart_defaults()
         
-        # Load .gitignore patterns only for local directories
-        if not cli_args.get('repo_url'):
-            config._load_gitignore_patterns(Path.cwd())
-        
         # Merge CLI arguments
         filtered_args = {
             k: v for k, v in cli_args.items()
-            if k in ['repo_url', 'target_dir', 'output_file', 'include', 'exclude', 'branch', 'format']
+            if k in ['repo_url', 'target_dir', 'output_file', 'include', 'exclude', 'branch', 'format',
+                     'read_workers', 'cache', 'incremental', 'mirror_cache', 'no_checkout',
+                     'check_dirty', 'diff', 'diff_tree', 'max_part_size', 'max_part_tokens',
+                     'tokenizer']
             and v is not None
         }
         config.merge_cli_args(filtered_args)
@@ -279,6 +370,18 @@ def load_configuration(config_file: Optional[str], cli_args: dict) -> Config:
     except Exception as e:
         raise ConfigError(f"Failed to load configuration: {e}")
 
+def output_patterns(config: Config) -> List[str]:
+    """
+    Get patterns matching every file a run writes: the output, its
+    manifest, and the parts and index of split output.
+
+    These files may lie inside the repository under any name, so they are
+    excluded from the walk by path rather than by the exclude patterns.
+    """
+    output_path = Path(config.output_file).resolve()
+    written = (output_path, manifest_path(output_path), index_path(output_path))
+    return [re.escape(path.as_posix()) for path in written] + [part_pattern(output_path)]
+
 def process_repository(
     config: Config,
     git_handler: GitHandler,
@@ -303,6 +406,8 @@ def process_repository(
     
     # Setup progress tracking
     clone_task = progress.add_task("Cloning repository...", total=1, visible=bool(config.repo_url))
+    # Files are read while the walk still runs, so their number is not known
+    # up front: this task has no total and shows a count instead
     walk_task = progress.add_task("Analyzing files...", total=None)
     stats_task = progress.add_task("Collecting statistics...", total=None)
     format_task = progress.add_task("Generating documentation...", total=None)
@@ -318,39 +423,102 @@ def process_repository(
         # Get repository information
         repo_info = git_handler.get_repo_info()
         
-        # Collect files
-        files = walker.collect_files(repo_path)
-        progress.update(walk_task, total=len(files), completed=0)
-        
-        # Process files and collect statistics
-        processed_files = []
-        for file in files:
-            content = walker.read_file(file)
-            if content is not None or not config.general.stats_in_output:
-                stats_collector.process_file(file, content)
-                processed_files.append((file, content))
-            progress.update(walk_task, advance=1)
-            
-        progress.update(stats_task, total=1, completed=0)
-        stats = stats_collector.get_stats(repo_info.get('branch', 'unknown'))
-        progress.update(stats_task, completed=1)
-            
-        # Get appropriate formatter using factory
-        formatter = get_formatter(config)  # This will now properly handle the format
-        
-        # Generate output
-        progress.update(format_task, total=1, completed=0)
-        formatter.generate_output(
-            repo_path,
-            processed_files,
-            stats,
-            config.output_file
-        )
-        progress.update(format_task, completed=1)
+        # Commit trees are read from the object database, git repositories
+        # are enumerated from the index, other directories are walked
+        walker.exclude_outputs(output_patterns(config))
+        if config.diff:
+            tree_files = git_handler.list_changed_files()
+            if config.output.diff_tree == 'full':
+                tree_walker = FileSystemWalker(config, progress)
+                tree_walker.exclude_outputs(output_patterns(config))
+                formatter.tree_files = tree_walker.collect_files(repo_path, git_handler.list_tree_files())
+        else:
+            tree_files = git_handler.list_tree_files()
+        if tree_files is not None:
+            files = walker.iter_files(repo_path, tree_files, blob_reader=git_handler.get_blob_reader())
+        else:
+            files = walker.iter_files(repo_path, git_handler.list_tracked_files())
+        incremental = IncrementalGenerator(config, walker, formatter) if config.output.incremental else None
+        if incremental is not None and not incremental.supported:
+            logger.warning(f"Incremental updates are not supported for {config.output.format.value} output")
+            incremental = None
+        if incremental is not None and tree_files is not None:
+            logger.warning("Incremental updates need a working tree and are disabled with --no-checkout")
+            incremental = None
+        sharded = ShardedGenerator(config, walker, formatter) if part_budget(config.output) else None
+        if sharded is not None and not sharded.supported:
+            logger.warning(f"Split output is not supported for {config.output.format.value} output")
+            sharded = None
+        if sharded is not None and incremental is not None:
+            logger.warning("Incremental updates are disabled when the output is split into parts")
+            incremental = None
+
+        if sharded is not None:
+            progress.update(format_task, total=1, completed=0)
+            stats = sharded.generate(repo_path, files, stats_collector, repo_info.get('branch', 'unknown'))
+            logger.debug(f"File read I/O: {walker.get_io_stats()}")
+            progress.update(walk_task, total=1, completed=1)
+            progress.update(stats_task, total=1, completed=1)
+            progress.update(format_task, completed=1)
+        elif incremental is not None:
+            progress.update(format_task, total=1, completed=0)
+            stats = incremental.generate(repo_path, files, stats_collector, repo_info.get('branch', 'unknown'))
+            progress.update(walk_task, total=1, completed=1)
+            progress.update(stats_task, total=1, completed=1)
+            progress.update(format_task, completed=1)
+        else:
+            # Stream files from the walker so reading starts while traversal runs
+            def documented_files():
+                for file, content in walker.read_files(files, workers=config.general.read_workers):
+                    if content is not None or not config.general.stats_in_output:
+                        stats_collector.process_file(file, content, walker.get_size(file), walker.get_tokens(file))
+                        yield file, content
+                    progress.update(walk_task, advance=1)
+
+            def collect_stats() -> Dict:
+                logger.debug(f"File read I/O: {walker.get_io_stats()}")
+                progress.update(stats_task, total=1, completed=0)
+                stats = stats_collector.get_stats(repo_info.get('branch', 'unknown'), repo_path)
+                progress.update(stats_task, completed=1)
+                return stats
+
+            # Sectioned formats are written as files are read, holding one
+            # file's content at a time; others need every file in memory
+            progress.update(format_task, total=1, completed=0)
+            if formatter.section_layout is not None:
+                formatter.write_stream(repo_path, documented_files(), collect_stats, config.output_file)
+                stats = stats_collector.get_stats(repo_info.get('branch', 'unknown'), repo_path)
+            else:
+                processed_files = list(documented_files())
+                stats = collect_stats()
+                formatter.generate_output(
+                    repo_path,
+                    processed_files,
+                    stats,
+                    config.output_file
+                )
+            progress.update(format_task, completed=1)
         
         # Print summary
         console.print("\n[bold green]Documentation generated successfully![/bold green]")
-        console.print(f"[green]Output file: {config.output_file}[/green]")
+        if sharded is not None:
+            console.print(f"[green]Output parts: {len(sharded.parts)}, indexed in {sharded.get_index_path()}[/green]")
+        else:
+            console.print(f"[green]Output file: {config.output_file}[/green]")
+
+        if incremental is not None:
+            counts = incremental.get_counts()
+            console.print(
+                f"[green]Incremental update: {counts['added']} added, {counts['changed']} changed, "
+                f"{counts['deleted']} deleted, {counts['unchanged']} unchanged[/green]"
+            )
+
+        cache_stats = walker.get_cache_stats()
+        if cache_stats is not None:
+            console.print(
+                f"[green]Content cache: {cache_stats['hits']} hits, "
+                f"{cache_stats['misses']} misses ({cache_stats['hit_rate']}% hit rate)[/green]"
+            )
         
         # Print quick stats summary
         if config.general.stats_in_output:
@@ -358,7 +526,13 @@ def process_repository(
             console.print(f"  • Total Files: {stats['total_files']}")
             console.print(f"  • Text Files: {stats['text_files']} ({stats['text_files_percentage']}%)")
             console.print(f"  • Repository Size: {stats['repo_size']}")
+            console.print(f"  • Estimated Tokens: {stats['total_tokens']}")
             console.print(f"  • Current Branch: {stats['branch']}")
+            walk_stats = walker.get_walk_stats()
+            console.print(
+                f"  • Pruned: {walk_stats['pruned_dirs']} directories, "
+                f"{walk_stats['excluded_files']} files excluded"
+            )
             
             if stats['file_types']:
                 console.print("\n[blue]Top File Types:[/blue]")
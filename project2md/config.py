@@ -8,12 +8,15 @@ import logging
 import re
 import pathspec
 
+from .tokens import TokenizerError, get_tokenizer
+
 logger = logging.getLogger(__name__)
 
 class OutputFormat(Enum):
     MARKDOWN = "markdown"
     JSON = "json"
     YAML = "yaml"
+    JSONL = "jsonl"
 
     @classmethod
     def from_string(cls, value: str) -> 'OutputFormat':
@@ -333,10 +336,15 @@ class GeneralConfig:
     max_file_size: str = "1MB"
     stats_in_output: bool = True
     collapse_empty_dirs: bool = True
+    read_workers: int = 4
+    encoding_sample_size: str = "64KB"
+    check_dirty: bool = False
     max_file_size_bytes: int = field(init=False)
+    encoding_sample_bytes: int = field(init=False)
 
     def __post_init__(self):
         self.max_file_size_bytes = self._parse_size(self.max_file_size)
+        self.encoding_sample_bytes = self._parse_size(self.encoding_sample_size)
 
     @staticmethod
     def _parse_size(size_str: str) -> int:
@@ -351,25 +359,89 @@ class GeneralConfig:
             raise ValueError(f"Invalid size unit: {unit}")
         return int(number) * units[unit]
 
+@dataclass
+class CacheConfig:
+    enabled: bool = False
+    dir: str = "~/.cache/project2md"
+    max_size: str = "512MB"
+    mirrors: bool = False
+    mirror_max_size: str = "5GB"
+    max_size_bytes: int = field(init=False)
+    mirror_max_size_bytes: int = field(init=False)
+
+    def __post_init__(self):
+        self.max_size_bytes = GeneralConfig._parse_size(self.max_size)
+        self.mirror_max_size_bytes = GeneralConfig._parse_size(self.mirror_max_size)
+
 @dataclass
 class OutputConfig:
     format: OutputFormat = OutputFormat.MARKDOWN
     stats: bool = True
+    incremental: bool = False
+    diff_tree: str = "changed"  # tree section of --diff runs: "changed" or "full"
+    max_part_size: Optional[str] = None  # split the output into parts of at most this size
+    max_part_tokens: Optional[int] = None  # ... or of at most this many estimated tokens
+    tokenizer: str = "approximate"  # token counter: "approximate" or "tiktoken[:<encoding>]"
+
+    DIFF_TREE_MODES = ("changed", "full")
+
+    @property
+    def max_part_size_bytes(self) -> Optional[int]:
+        """Size budget of one output part in bytes, or None if it is not limited by size."""
+        if self.max_part_size is None:
+            return None
+        return GeneralConfig._parse_size(self.max_part_size)
 
     def validate(self):
         if not isinstance(self.format, OutputFormat):
             raise ConfigError("Invalid output format")
+        if self.diff_tree not in self.DIFF_TREE_MODES:
+            raise ConfigError(f"diff_tree must be one of: {', '.join(self.DIFF_TREE_MODES)}")
+        if self.max_part_size is not None:
+            try:
+                max_part_size_bytes = self.max_part_size_bytes
+            except ValueError as e:
+                raise ConfigError(f"Invalid max_part_size: {e}")
+            if max_part_size_bytes < 1:
+                raise ConfigError("max_part_size must be greater than 0")
+        if self.max_part_tokens is not None and self.max_part_tokens < 1:
+            raise ConfigError("max_part_tokens must be greater than 0")
+        try:
+            # Loads the tokenizer once, so a missing optional package is reported here too
+            get_tokenizer(self.tokenizer)
+        except TokenizerError as e:
+            raise ConfigError(str(e))
 
     @classmethod
     def from_dict(cls, data: dict) -> 'OutputConfig':
         config = cls()
         if 'format' in data:
             config.format = OutputFormat.from_string(data['format'])
+        if 'incremental' in data:
+            config.incremental = bool(data['incremental'])
+        if 'diff_tree' in data:
+            config.diff_tree = str(data['diff_tree']).lower()
+        if data.get('max_part_size') is not None:
+            config.max_part_size = str(data['max_part_size'])
+        if data.get('max_part_tokens') is not None:
+            config.max_part_tokens = int(data['max_part_tokens'])
+        if data.get('tokenizer'):
+            config.tokenizer = str(data['tokenizer'])
         return config
 
     def merge_cli_args(self, args: dict):
         if 'format' in args:
             self.format = OutputFormat.from_string(args['format'])
+        if args.get('incremental'):
+            self.incremental = True
+        if args.get('diff_tree'):
+            self.diff_tree = args['diff_tree'].lower()
+        if args.get('max_part_size'):
+            self.max_part_size = args['max_part_size']
+        if args.get('max_part_tokens'):
+            self.max_part_tokens = args['max_part_tokens']
+        if args.get('tokenizer'):
+            self.tokenizer = args['tokenizer']
 
 @dataclass
 class PathPatterns:
@@ -380,12 +452,15 @@ class PathPatterns:
 class Config:
     general: GeneralConfig = field(default_factory=GeneralConfig)
     output: OutputConfig = field(default_factory=OutputConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
     include: PathPatterns = field(default_factory=PathPatterns)
     exclude: PathPatterns = field(default_factory=PathPatterns)
     repo_url: Optional[str] = None
     target_dir: Path = Path.cwd()
     output_file: Path = Path('project_summary.md')
-    branch: str = "main"  # Add this line
+    branch: Optional[str] = None  # None: the remote's default branch, or the current one locally
+    no_checkout: bool = False  # Read the branch's tree from the object database
+    diff: Optional[str] = None  # "base..head" or "base...head": only process changed files
 
     DEFAULT_INCLUDES = {
         'files': [
@@ -452,6 +527,7 @@ class Config:
         try:
             general_data = data.get('general', {})
             output_data = data.get('output', {})
+            cache_data = data.get('cache', {})
             include_data = data.get('include', {})
             exclude_data = data.get('exclude', {})
 
@@ -459,11 +535,22 @@ class Config:
                 max_depth=general_data.get('max_depth', 10),
                 max_file_size=general_data.get('max_file_size', '1MB'),
                 stats_in_output=general_data.get('stats_in_output', True),
-                collapse_empty_dirs=general_data.get('collapse_empty_dirs', True)
+                collapse_empty_dirs=general_data.get('collapse_empty_dirs', True),
+                read_workers=general_data.get('read_workers', 4),
+                encoding_sample_size=general_data.get('encoding_sample_size', '64KB'),
+                check_dirty=general_data.get('check_dirty', False)
             )
 
             output = OutputConfig.from_dict(output_data)
 
+            cache = CacheConfig(
+                enabled=cache_data.get('enabled', False),
+                dir=cache_data.get('dir', '~/.cache/project2md'),
+                max_size=cache_data.get('max_size', '512MB'),
+                mirrors=cache_data.get('mirrors', False),
+                mirror_max_size=cache_data.get('mirror_max_size', '5GB')
+            )
+
             include = PathPatterns(
                 files=include_data.get('files', []),
                 dirs=include_data.get('dirs', [])
@@ -477,6 +564,7 @@ class Config:
             return cls(
                 general=general,
                 output=output,
+                cache=cache,
                 include=include,
                 exclude=exclude
             )
@@ -494,11 +582,26 @@ class Config:
                 'max_depth': 10,
                 'max_file_size': '1MB',
                 'stats_in_output': True,
-                'collapse_empty_dirs': True
+                'collapse_empty_dirs': True,
+                'read_workers': 4,
+                'encoding_sample_size': '64KB',
+                'check_dirty': False
             },
             'output': {
                 'format': 'markdown',
-                'stats': True
+                'stats': True,
+                'incremental': False,
+                'diff_tree': 'changed',
+                'max_part_size': None,
+                'max_part_tokens': None,
+                'tokenizer': 'approximate'
+            },
+            'cache': {
+                'enabled': False,
+                'dir': '~/.cache/project2md',
+                'max_size': '512MB',
+                'mirrors': False,
+                'mirror_max_size': '5GB'
             },
             'exclude': DEFAULT_EXCLUDE_PATTERNS,
             'include': {
@@ -510,22 +613,6 @@ class Config:
         with open(path, 'w') as f:
             yaml.safe_dump(config_dict, f, default_flow_style=False)
             
-    def _load_gitignore_patterns(self, repo_path: Path) -> None:
-        """Load patterns from .gitignore file if it exists."""
-        gitignore_path = repo_path / '.gitignore'
-        if not gitignore_path.exists():
-            return
-            
-        with open(gitignore_path) as f:
-            gitignore_patterns = []
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    gitignore_patterns.append(line)
-                    
-        # Add patterns from .gitignore to exclude patterns
-        self.exclude.files.extend(gitignore_patterns)
-        
     def apply_smart_defaults(self) -> None:
         """Apply smart defaults if no patterns are configured."""
         if not self.exclude.files and not self.exclude.dirs:
@@ -554,10 +641,43 @@ class Config:
         if cli_args.get('branch'):
             self.branch = cli_args['branch']
 
+        if cli_args.get('no_checkout'):
+            self.no_checkout = True
+
+        if cli_args.get('diff'):
+            self.diff = cli_args['diff']
+
+        if cli_args.get('read_workers'):
+            self.general.read_workers = cli_args['read_workers']
+
+        if cli_args.get('check_dirty'):
+            self.general.check_dirty = True
+
+        if cli_args.get('cache') is not None:
+            self.cache.enabled = cli_args['cache']
+
+        if cli_args.get('mirror_cache') is not None:
+            self.cache.mirrors = cli_args['mirror_cache']
+
         if 'format' in cli_args:
             # Ensure format is properly set as enum
             self.output.format = OutputFormat(cli_args['format'].lower())
 
+        if cli_args.get('incremental'):
+            self.output.incremental = True
+
+        if cli_args.get('diff_tree'):
+            self.output.diff_tree = cli_args['diff_tree'].lower()
+
+        if cli_args.get('max_part_size'):
+            self.output.max_part_size = cli_args['max_part_size']
+
+        if cli_args.get('max_part_tokens'):
+            self.output.max_part_tokens = cli_args['max_part_tokens']
+
+        if cli_args.get('tokenizer'):
+            self.output.tokenizer = cli_args['tokenizer']
+
     def validate(self) -> None:
         """Validate configuration settings."""
         if self.general.max_depth < 1:
@@ -566,6 +686,20 @@ class Config:
         if self.general.max_file_size_bytes < 1:
             raise ConfigError("max_file_size must be greater than 0")
 
+        if self.general.read_workers < 1:
+            raise ConfigError("read_workers must be greater than 0")
+
+        if self.general.encoding_sample_bytes < 1:
+            raise ConfigError("encoding_sample_size must be greater than 0")
+
+        if self.cache.max_size_bytes < 1:
+            raise ConfigError("cache max_size must be greater than 0")
+
+        if self.cache.mirror_max_size_bytes < 1:
+            raise ConfigError("cache mirror_max_size must be greater than 0")
+
+        self.output.validate()
+
         # Validate target directory
         if not self.target_dir.exists() and self.repo_url:
             self.target_dir.mkdir(parents=True, exist_ok=True)
@@ -603,11 +737,26 @@ class Config:
                 'max_depth': self.general.max_depth,
                 'max_file_size': self.general.max_file_size,
                 'stats_in_output': self.general.stats_in_output,
-                'collapse_empty_dirs': self.general.collapse_empty_dirs
+                'collapse_empty_dirs': self.general.collapse_empty_dirs,
+                'read_workers': self.general.read_workers,
+                'encoding_sample_size': self.general.encoding_sample_size,
+                'check_dirty': self.general.check_dirty
             },
             'output': {
                 'format': self.output.format.value,
-                'stats': self.output.stats
+                'stats': self.output.stats,
+                'incremental': self.output.incremental,
+                'diff_tree': self.output.diff_tree,
+                'max_part_size': self.output.max_part_size,
+                'max_part_tokens': self.output.max_part_tokens,
+                'tokenizer': self.output.tokenizer
+            },
+            'cache': {
+                'enabled': self.cache.enabled,
+                'dir': self.cache.dir,
+                'max_size': self.cache.max_size,
+                'mirrors': self.cache.mirrors,
+                'mirror_max_size': self.cache.mirror_max_size
             },
             'include': {
                 'files': self.include.files,
@@ -0,0 +1,159 @@
+# project2md/encoding.py
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import codecs
+import logging
+import threading
+
+try:
+    from chardet import UniversalDetector
+except ImportError:  # chardet < 5
+    from chardet.universaldetector import UniversalDetector
+
+logger = logging.getLogger(__name__)
+
+# Checked in order: the UTF-32 LE BOM starts with the UTF-16 LE BOM
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+@lru_cache(maxsize=None)
+def _is_single_byte(encoding: str) -> bool:
+    """Check whether an encoding maps every byte to one character on its own."""
+    try:
+        return len(bytes(range(256)).decode(encoding, 'replace')) == 256
+    except LookupError:
+        return False
+
+class EncodingDetector:
+    """
+    Decodes file contents, detecting the encoding from a bounded sample.
+
+    Detection runs in stages, cheapest first: byte order marks, an ASCII
+    and UTF-8 fast path, an encoding already seen in the same directory or
+    for the same extension, and finally chardet's UniversalDetector fed
+    incrementally with at most sample_size bytes.
+
+    Single-byte encodings such as Latin-1 decode almost any bytes, so a
+    successful decode says nothing about whether they are right. They are
+    only reused within a directory; multi-byte encodings, whose strict
+    decode rejects most foreign text, are also reused per extension.
+    """
+
+    FEED_SIZE = 4096
+
+    def __init__(self, sample_size: int = 64 * 1024, min_confidence: float = 0.7):
+        self.sample_size = sample_size
+        self.min_confidence = min_confidence
+        self._remembered: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def decode(self, data: bytes, file_path: Optional[Path] = None) -> Optional[str]:
+        """
+        Decode a buffer to text.
+
+        Args:
+            data: Raw file contents
+            file_path: Path of the file, used to reuse detected encodings
+
+        Returns:
+            Decoded text, or None if no encoding could be determined
+        """
+        return self.decode_with_encoding(data, file_path)[0]
+
+    def decode_with_encoding(
+        self,
+        data: bytes,
+        file_path: Optional[Path] = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Decode a buffer to text and report the encoding that was used.
+
+        Returns:
+            Tuple of (text, encoding); both are None if decoding failed
+        """
+        # Byte order marks are unambiguous
+        for bom, encoding in _BOMS:
+            if data.startswith(bom):
+                return self._decode_as(data, encoding)
+
+        # Fast paths: ASCII is a subset of UTF-8, and UTF-8 is the default
+        if data.isascii():
+            return data.decode('ascii'), 'ascii'
+        text = self._try_decode(data, 'utf-8')
+        if text is not None:
+            return text, 'utf-8'
+
+        # Files next to each other or of the same type share a convention
+        keys = self._remember_keys(file_path)
+        for key in keys:
+            encoding = self._remembered.get(key)
+            if encoding:
+                text = self._try_decode(data, encoding)
+                if text is not None:
+                    return text, encoding
+
+        encoding = self.detect(data)
+        if not encoding:
+            return None, None
+        text = self._try_decode(data, encoding)
+        if text is None:
+            return None, None
+        if keys:
+            if _is_single_byte(encoding):
+                keys = tuple(key for key in keys if key[0] == 'dir')
+            with self._lock:
+                for key in keys:
+                    self._remembered[key] = encoding
+        return text, encoding
+
+    def detect(self, data: bytes) -> Optional[str]:
+        """
+        Detect the encoding of a buffer from at most sample_size bytes.
+
+        The sample is fed to UniversalDetector in small blocks and feeding
+        stops as soon as the detector is confident.
+        """
+        detector = UniversalDetector()
+        limit = min(len(data), self.sample_size)
+        view = memoryview(data)
+        for start in range(0, limit, self.FEED_SIZE):
+            detector.feed(bytes(view[start:min(start + self.FEED_SIZE, limit)]))
+            if detector.done:
+                break
+        result = detector.close() or {}
+
+        encoding = result.get('encoding')
+        if not encoding or (result.get('confidence') or 0) < self.min_confidence:
+            logger.debug(f"No confident encoding detected: {result}")
+            return None
+        return encoding
+
+    @staticmethod
+    def _try_decode(data: bytes, encoding: str) -> Optional[str]:
+        """Decode strictly, returning None on failure."""
+        try:
+            return data.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            return None
+
+    @classmethod
+    def _decode_as(cls, data: bytes, encoding: str) -> Tuple[Optional[str], Optional[str]]:
+        """Decode with a known encoding, returning (None, None) on failure."""
+        text = cls._try_decode(data, encoding)
+        return (text, encoding) if text is not None else (None, None)
+
+    @staticmethod
+    def _remember_keys(file_path: Optional[Path]) -> Tuple[Tuple[str, str], ...]:
+        """Keys under which a detected encoding is remembered for a file."""
+        if file_path is None:
+            return ()
+        keys = [('dir', str(file_path.parent))]
+        if file_path.suffix:
+            keys.append(('ext', file_path.suffix.lower()))
+        return tuple(keys)
@@ -1,5 +1,6 @@
 from .base import BaseFormatter, FormatterError
 from .json_formatter import JSONFormatter
+from .jsonl_formatter import JSONLinesFormatter
 from .yaml_formatter import YAMLFormatter
 from .markdown_formatter import MarkdownFormatter
 from .factory import get_formatter
@@ -8,6 +9,7 @@ __all__ = [
     'BaseFormatter',
     'FormatterError',
     'JSONFormatter',
+    'JSONLinesFormatter',
     'YAMLFormatter',
     'MarkdownFormatter',
     'get_formatter'
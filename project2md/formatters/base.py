@@ -1,18 +1,41 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional
+from typing import BinaryIO, Callable, Iterable, List, NamedTuple, Tuple, Dict, Optional, Union
+import tempfile
+
+# Buffer size of the output and spool files of streamed documents
+_WRITE_BUFFER = 1 << 20
+
+# Names that are not valid UTF-8 are decoded with surrogate escapes, as
+# os.fsdecode does; they are written as backslash escapes such as \udce9
+ENCODING_ERRORS = 'backslashreplace'
 
 class FormatterError(Exception):
     """Custom exception for formatting errors."""
     pass
 
+class SectionLayout(NamedTuple):
+    """Text placed around the per-file sections of a document."""
+    opening: str    # between the header and the first section
+    separator: str  # between two sections
+    closing: str    # between the last section and the footer
+    empty: str      # between the header and the footer when there are no sections
+
 class BaseFormatter(ABC):
     """Base class for all formatters."""
+
+    # Formatters whose output is a header, one section per file and a
+    # footer set this, which lets incremental runs splice file sections
+    section_layout: Optional[SectionLayout] = None
     
     def __init__(self, config):
         self.config = config
         self._readme_content = None
         self._tree_cache = None
+        # Paths shown in the tree section instead of the documented files
+        self.tree_files: Optional[List[Path]] = None
+        # Looks up the estimated token count of a file for its section
+        self.token_counter: Optional[Callable[[Path], Optional[int]]] = None
     
     @abstractmethod
     def generate_output(
@@ -25,6 +48,118 @@ class BaseFormatter(ABC):
         """Generate formatted output."""
         pass
 
+    @abstractmethod
+    def render_header(
+        self,
+        repo_path: Path,
+        files: List[Tuple[Path, Optional[str]]],
+        stats: Dict
+    ) -> str:
+        """Render everything before the first file section."""
+        pass
+
+    @abstractmethod
+    def render_file(self, repo_path: Path, file_path: Path, content: Optional[str]) -> Optional[str]:
+        """Render the section for one file, or None if it gets no section."""
+        pass
+
+    @abstractmethod
+    def render_footer(self) -> str:
+        """Render everything after the last file section."""
+        pass
+
+    def write_sections(
+        self,
+        out: BinaryIO,
+        header: str,
+        sections: Iterable[Union[str, bytes]],
+        footer: str
+    ) -> List[Tuple[int, int]]:
+        """
+        Write a document laid out as described by section_layout.
+
+        Sections may be given as text or as already encoded UTF-8 bytes.
+
+        Returns:
+            (offset, length) in bytes of every section, in order
+        """
+        layout = self.section_layout
+        ranges = []
+        position = out.write(header.encode('utf-8', ENCODING_ERRORS))
+        for section in sections:
+            gap = layout.separator if ranges else layout.opening
+            position += out.write(gap.encode('utf-8'))
+            data = section.encode('utf-8', ENCODING_ERRORS) if isinstance(section, str) else section
+            ranges.append((position, len(data)))
+            position += out.write(data)
+        out.write((layout.closing if ranges else layout.empty).encode('utf-8'))
+        out.write(footer.encode('utf-8', ENCODING_ERRORS))
+        return ranges
+
+    def _write_document(
+        self,
+        repo_path: Path,
+        files: List[Tuple[Path, Optional[str]]],
+        stats: Dict,
+        output_path: Path
+    ) -> None:
+        """Render all sections of a document and write it to output_path."""
+        header = self.render_header(repo_path, files, stats)
+        sections = (
+            section for section in (
+                self.render_file(repo_path, file_path, content) for file_path, content in files
+            )
+            if section is not None
+        )
+        with open(output_path, 'wb') as out:
+            self.write_sections(out, header, sections, self.render_footer())
+
+    def write_stream(
+        self,
+        repo_path: Path,
+        files: Iterable[Tuple[Path, Optional[str]]],
+        get_stats: Callable[[], Dict],
+        output_path: Path
+    ) -> List[Tuple[int, int]]:
+        """
+        Write a document while its files are still being read.
+
+        Only one file's content is held at a time. The header needs the
+        complete file list and statistics, so file sections are rendered
+        into a temporary spool file next to the output as files arrive,
+        and copied after the header once the stream is exhausted.
+
+        Args:
+            repo_path: Repository root
+            files: (path, content) pairs, consumed lazily
+            get_stats: Called once all files are consumed to get the statistics
+            output_path: File to write
+
+        Returns:
+            (offset, length) in bytes of every section in the output, in order
+        """
+        listed: List[Tuple[Path, Optional[str]]] = []
+        lengths: List[int] = []
+        with tempfile.TemporaryFile(dir=output_path.parent, buffering=_WRITE_BUFFER) as spool:
+            for file_path, content in files:
+                # The header only shows the README's content; other files are listed by path
+                is_readme = file_path.name.lower() == "readme.md"
+                listed.append((file_path, content if is_readme else None))
+                section = self.render_file(repo_path, file_path, content)
+                if section is not None:
+                    lengths.append(spool.write(section.encode('utf-8', ENCODING_ERRORS)))
+
+            header = self.render_header(repo_path, listed, get_stats())
+            spool.seek(0)
+            with open(output_path, 'wb', buffering=_WRITE_BUFFER) as out:
+                return self.write_sections(
+                    out, header, (spool.read(length) for length in lengths), self.render_footer()
+                )
+
+    def _get_tokens(self, file_path: Path) -> Optional[int]:
+        """Get the estimated token count of a file, if a token counter is set and knows it."""
+        return self.token_counter(file_path) if self.token_counter is not None else None
+
     def _find_readme_content(self, files: List[Tuple[Path, Optional[str]]]) -> Optional[str]:
         """Find README content in files."""
         for file_path, content in files:
@@ -44,8 +179,9 @@ class BaseFormatter(ABC):
                 self.is_file = False
 
         # Build tree structure
+        paths = self.tree_files if self.tree_files is not None else [file_path for file_path, _ in files]
         root = Node(repo_path.name)
-        for file_path, _ in files:
+        for file_path in paths:
             current = root
             parts = file_path.relative_to(repo_path).parts
             
@@ -2,6 +2,7 @@ from typing import Union
 from .base import BaseFormatter
 from .markdown_formatter import MarkdownFormatter
 from .json_formatter import JSONFormatter
+from .jsonl_formatter import JSONLinesFormatter
 from .yaml_formatter import YAMLFormatter
 from ..config import Config, OutputFormat
 
@@ -10,6 +11,7 @@ def get_formatter(config: Config) -> BaseFormatter:
     format_map = {
         OutputFormat.MARKDOWN: MarkdownFormatter,
         OutputFormat.JSON: JSONFormatter,
+        OutputFormat.JSONL: JSONLinesFormatter,
         OutputFormat.YAML: YAMLFormatter,
     }
     
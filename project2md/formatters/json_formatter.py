@@ -3,15 +3,22 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Tuple, Dict, Optional
 
-from .base import BaseFormatter, FormatterError
+from .base import BaseFormatter, FormatterError, SectionLayout
 from ..config import Config
 
+# Encodes one value at a time; file contents are encoded exactly once
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
 class JSONFormatter(BaseFormatter):
     """JSON output formatter with safe encoding."""
 
     def __init__(self, config: Config):
         super().__init__(config)  # Call parent init
     
+    # Matches json.dumps(indent=2) of the whole document: file entries are
+    # objects nested two levels deep in the "files" array
+    section_layout = SectionLayout(opening="\n", separator=",\n", closing="\n  ", empty="")
+
     def generate_output(
         self,
         repo_path: Path,
@@ -21,40 +28,60 @@ class JSONFormatter(BaseFormatter):
     ) -> None:
         """Generate JSON formatted output."""
         try:
-            output = {
-                "metadata": {
-                    "generated_at": datetime.now().isoformat(),
-                    "generator": "project2md",
-                    "version": "1.2.0"
-                },
-                "project": {
-                    "readme": self._find_readme_content(files),
-                    "structure": self._generate_tree(repo_path, files),
-                    "statistics": stats
-                },
-                "files": [
-                    {
-                        "path": str(f.relative_to(repo_path)),
-                        "content": content,
-                        "type": self._get_file_type(f)
-                    }
-                    for f, content in files
-                    if content is not None
-                ]
-            }
-
-            # Validate JSON before writing
-            json.dumps(output)  # Test serialization
-            
-            # Write with proper formatting
-            output_path.write_text(
-                json.dumps(output, indent=2, ensure_ascii=False),
-                encoding='utf-8'
-            )
-
+            self._write_document(repo_path, files, stats, output_path)
         except Exception as e:
             raise FormatterError(f"Failed to generate JSON output: {str(e)}")
 
+    def render_header(
+        self,
+        repo_path: Path,
+        files: List[Tuple[Path, Optional[str]]],
+        stats: Dict
+    ) -> str:
+        """Render the document up to the opening bracket of the files array."""
+        output = {
+            "metadata": self._metadata(),
+            "project": self._project(repo_path, files, stats),
+            "files": []
+        }
+        text = json.dumps(output, indent=2, ensure_ascii=False)
+        return text[:-len(']\n}')]
+
+    def render_file(self, repo_path: Path, file_path: Path, content: Optional[str]) -> Optional[str]:
+        """Render one entry of the files array."""
+        if content is None:
+            return None
+        tokens = self._get_tokens(file_path)
+        # Laid out as json.dumps(indent=2) would, without re-indenting the content
+        return (
+            '    {\n'
+            f'      "path": {_encode(str(file_path.relative_to(repo_path)))},\n'
+            f'      "content": {_encode(content)},\n'
+            f'      "type": {_encode(self._get_file_type(file_path))}'
+            + (f',\n      "tokens": {tokens}\n' if tokens is not None else '\n')
+            + '    }'
+        )
+
+    def render_footer(self) -> str:
+        """Close the files array and the document."""
+        return ']\n}'
+
+    def _metadata(self) -> Dict:
+        """Describe the generator run."""
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "generator": "project2md",
+            "version": "1.2.0"
+        }
+
+    def _project(self, repo_path: Path, files: List[Tuple[Path, Optional[str]]], stats: Dict) -> Dict:
+        """Describe the project: README, tree and statistics."""
+        return {
+            "readme": self._find_readme_content(files),
+            "structure": self._generate_tree(repo_path, files),
+            "statistics": stats
+        }
+
     def _get_file_type(self, file_path: Path) -> str:
         """Determine file type based on extension."""
         return file_path.suffix.lower().lstrip('.') or 'unknown'
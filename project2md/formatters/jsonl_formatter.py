@@ -0,0 +1,69 @@
+import json
+from pathlib import Path
+from typing import List, Tuple, Dict, Optional
+
+from .base import FormatterError, SectionLayout
+from .json_formatter import JSONFormatter
+from ..config import Config
+
+class JSONLinesFormatter(JSONFormatter):
+    """
+    JSON Lines output formatter.
+
+    The first line is a header record with the metadata, README, tree and
+    statistics; every following line is the record of one file. Each line
+    is a complete JSON document, so readers can process records in
+    parallel or resume after the last line they handled.
+    """
+
+    def __init__(self, config: Config):
+        super().__init__(config)  # Call parent init
+
+    # Every record ends with its own newline
+    section_layout = SectionLayout(opening="", separator="", closing="", empty="")
+
+    def generate_output(
+        self,
+        repo_path: Path,
+        files: List[Tuple[Path, Optional[str]]],
+        stats: Dict,
+        output_path: Path
+    ) -> None:
+        """Generate JSON Lines formatted output."""
+        try:
+            self._write_document(repo_path, files, stats, output_path)
+        except Exception as e:
+            raise FormatterError(f"Failed to generate JSON Lines output: {str(e)}")
+
+    def render_header(
+        self,
+        repo_path: Path,
+        files: List[Tuple[Path, Optional[str]]],
+        stats: Dict
+    ) -> str:
+        """Render the header record."""
+        record = {
+            "record": "header",
+            "metadata": self._metadata(),
+            "project": self._project(repo_path, files, stats)
+        }
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    def render_file(self, repo_path: Path, file_path: Path, content: Optional[str]) -> Optional[str]:
+        """Render the record of one file."""
+        if content is None:
+            return None
+        record = {
+            "record": "file",
+            "path": str(file_path.relative_to(repo_path)),
+            "type": self._get_file_type(file_path),
+            "content": content
+        }
+        tokens = self._get_tokens(file_path)
+        if tokens is not None:
+            record["tokens"] = tokens
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    def render_footer(self) -> str:
+        """JSON Lines has nothing after the last record."""
+        return ""
@@ -4,7 +4,7 @@ import logging
 from datetime import datetime
 from textwrap import dedent
 
-from .base import BaseFormatter, FormatterError
+from .base import BaseFormatter, FormatterError, SectionLayout
 from ..config import Config
 
 logger = logging.getLogger(__name__)
@@ -18,6 +18,8 @@ class MarkdownFormatter(BaseFormatter):
         self._readme_content: Optional[str] = None
         self._tree_cache: Optional[str] = None
 
+    section_layout = SectionLayout(opening="\n", separator="\n", closing="\n", empty="\n")
+
     def generate_output(
         self,
         repo_path: Path,
@@ -27,19 +29,18 @@ class MarkdownFormatter(BaseFormatter):
     ) -> None:
         """Generate the Markdown documentation file."""
         try:
-            content = self._generate_markdown(repo_path, files, stats)
-            output_path.write_text(content, encoding='utf-8')
+            self._write_document(repo_path, files, stats, output_path)
             logger.info(f"Documentation written to {output_path}")
         except Exception as e:
             raise FormatterError(f"Failed to generate output: {str(e)}")
 
-    def _generate_markdown(
+    def render_header(
         self,
         repo_path: Path,
         files: List[Tuple[Path, Optional[str]]],
         stats: Dict
     ) -> str:
-        """Generate Markdown formatted output."""
+        """Render the overview, README, tree and statistics sections."""
         sections = []
         
         # Project Overview
@@ -58,26 +59,27 @@ class MarkdownFormatter(BaseFormatter):
         if self.config.output.stats:
             sections.append(self._format_stats(stats))
 
-        # Add file contents
         sections.append("## File Contents\n")
-        for file_path, content in files:
-            if content is not None and file_path.name.lower() != "readme.md":
-                rel_path = file_path.relative_to(repo_path)
-                lang_tag = self._get_language_tag(file_path)
-                
-                # Use four backticks for markdown files to handle nested markdown content
-                if lang_tag == 'markdown':
-                    sections.append(f"### filepath {rel_path}\n\n````{lang_tag}\n{content}\n````\n")
-                else:
-                    sections.append(f"### filepath {rel_path}\n\n```{lang_tag}\n{content}\n```\n")
-
-        # Add generation metadata
-        sections.append("---\nGenerated by project2md on {}\n".format(
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        ))
-
         return "\n".join(sections)
 
+    def render_file(self, repo_path: Path, file_path: Path, content: Optional[str]) -> Optional[str]:
+        """Render the section for one file; the README is part of the header."""
+        if content is None or file_path.name.lower() == "readme.md":
+            return None
+        rel_path = file_path.relative_to(repo_path)
+        lang_tag = self._get_language_tag(file_path)
+        
+        # Use four backticks for markdown files to handle nested markdown content
+        if lang_tag == 'markdown':
+            return f"### filepath {rel_path}\n\n````{lang_tag}\n{content}\n````\n"
+        return f"### filepath {rel_path}\n\n```{lang_tag}\n{content}\n```\n"
+
+    def render_footer(self) -> str:
+        """Render the generation metadata."""
+        return "---\nGenerated by project2md on {}\n".format(
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
+
     def _format_stats(self, stats: Dict) -> str:
         """Format statistics as Markdown."""
         file_types_str = "\n  ".join(
@@ -88,7 +90,7 @@ class MarkdownFormatter(BaseFormatter):
         format_stats.pop('file_types', None)
         format_stats['file_types_list'] = file_types_str
         
-        return dedent("""
+        text = dedent("""
             ## Project Statistics
 
             - Total Files: {total_files}
@@ -100,6 +102,17 @@ class MarkdownFormatter(BaseFormatter):
               {file_types_list}
             """).format(**format_stats)
 
+        if stats.get('total_tokens'):
+            lines = [f"- Estimated Tokens: {stats['total_tokens']}"]
+            if stats.get('tokens_by_language'):
+                lines.append("- Estimated Tokens by Language:")
+                lines.extend(f"  - {language}: {tokens}" for language, tokens in stats['tokens_by_language'].items())
+            if stats.get('most_tokens'):
+                lines.append("- Files With the Most Tokens:")
+                lines.extend(f"  - {path}: {tokens}" for path, tokens in stats['most_tokens'].items())
+            text += "\n".join(lines) + "\n"
+        return text
+
     @staticmethod
     def _get_language_tag(file_path: Path) -> str:
         """Determine the language tag for syntax highlighting."""
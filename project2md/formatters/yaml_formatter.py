@@ -1,17 +1,32 @@
 from datetime import datetime
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional
+from typing import Any, List, Tuple, Dict, Optional
 import yaml
 
-from .base import BaseFormatter, FormatterError
+from .base import BaseFormatter, FormatterError, SectionLayout
 from ..config import Config
 
+try:
+    # libyaml's emitter is many times faster than the pure Python one
+    from yaml import CSafeDumper as _SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _SafeDumper
+
 class YAMLFormatter(BaseFormatter):
-    """YAML output formatter with safe encoding."""
+    """
+    YAML output formatter with safe encoding.
+
+    The output is a multi-document stream: a header document with the
+    metadata, README, tree and statistics, then one document per file, so
+    it can be written and read one file at a time.
+    """
 
     def __init__(self, config: Config):
         super().__init__(config)  # Call parent init
-    
+
+    # Every document starts with its own "---" marker
+    section_layout = SectionLayout(opening="", separator="", closing="", empty="")
+
     def generate_output(
         self,
         repo_path: Path,
@@ -21,41 +36,59 @@ class YAMLFormatter(BaseFormatter):
     ) -> None:
         """Generate YAML formatted output."""
         try:
-            output = {
-                "metadata": {
-                    "generated_at": datetime.now().isoformat(),
-                    "generator": "project2md",
-                    "version": "1.2.0"
-                },
-                "project": {
-                    "readme": self._find_readme_content(files),
-                    "structure": self._generate_tree(repo_path, files),
-                    "statistics": stats
-                },
-                "files": [
-                    {
-                        "path": str(f.relative_to(repo_path)),
-                        "content": content,
-                        "type": self._get_file_type(f)
-                    }
-                    for f, content in files
-                    if content is not None
-                ]
+            self._write_document(repo_path, files, stats, output_path)
+        except Exception as e:
+            raise FormatterError(f"Failed to generate YAML output: {str(e)}")
+
+    def render_header(
+        self,
+        repo_path: Path,
+        files: List[Tuple[Path, Optional[str]]],
+        stats: Dict
+    ) -> str:
+        """Render the header document."""
+        return self._dump({
+            "metadata": {
+                "generated_at": datetime.now().isoformat(),
+                "generator": "project2md",
+                "version": "1.2.0"
+            },
+            "project": {
+                "readme": self._find_readme_content(files),
+                "structure": self._generate_tree(repo_path, files),
+                "statistics": stats
             }
+        })
 
-            # Use safe_dump to prevent arbitrary code execution
-            output_path.write_text(
-                yaml.safe_dump(
-                    output,
-                    default_flow_style=False,
-                    allow_unicode=True,
-                    sort_keys=False
-                ),
-                encoding='utf-8'
-            )
+    def render_file(self, repo_path: Path, file_path: Path, content: Optional[str]) -> Optional[str]:
+        """Render the document of one file."""
+        if content is None:
+            return None
+        document = {
+            "path": str(file_path.relative_to(repo_path)),
+            "content": content,
+            "type": self._get_file_type(file_path)
+        }
+        tokens = self._get_tokens(file_path)
+        if tokens is not None:
+            document["tokens"] = tokens
+        return self._dump(document)
 
-        except Exception as e:
-            raise FormatterError(f"Failed to generate YAML output: {str(e)}")
+    def render_footer(self) -> str:
+        """The stream ends with the last document."""
+        return ""
+
+    @staticmethod
+    def _dump(document: Dict[str, Any]) -> str:
+        """Serialize one document, starting with its "---" marker."""
+        # The safe dumper prevents arbitrary objects from being serialized
+        options = dict(default_flow_style=False, allow_unicode=True, sort_keys=False, explicit_start=True)
+        try:
+            return yaml.dump(document, Dumper=_SafeDumper, **options)
+        except UnicodeEncodeError:
+            # libyaml cannot encode the surrogate escapes of names that are
+            # not valid UTF-8; the Python emitter writes them as \u escapes
+            return yaml.dump(document, Dumper=yaml.SafeDumper, **options)
 
     def _get_file_type(self, file_path: Path) -> str:
         """Determine file type based on extension."""
@@ -1,6 +1,6 @@
 # project2md/git.py
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, NamedTuple, Tuple
 import git
 from git.exc import GitCommandError, InvalidGitRepositoryError, NoSuchPathError
 import logging
@@ -8,8 +8,12 @@ from rich.progress import Progress
 import tempfile
 import shutil
 import os
+import re
 
+from .blobs import BlobReader
 from .config import Config
+from .gitmeta import GitMetadata, GitMetadataError
+from .mirror import MirrorCache, MirrorCheckout, MirrorError
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +21,24 @@ class GitError(Exception):
     """Custom exception for Git-related errors."""
     pass
 
+class TrackedFile(NamedTuple):
+    """A file entry from the git index, with the stat data git recorded for it."""
+    path: str
+    oid: str
+    mode: int
+    size: int
+    mtime_ns: int
+    ctime_ns: int
+    dev: int
+    ino: int
+    skip_worktree: bool = False
+    # Modified in the same instant the index was written, so matching stat
+    # data does not prove that the working tree copy is unchanged
+    racy: bool = True
+
+# Index entry modes that do not correspond to a regular file in the worktree
+_GITLINK_MODE = 0o160000
+
 class GitHandler:
     """Handles Git repository operations including cloning and validation."""
     
@@ -25,6 +47,17 @@ class GitHandler:
         self.progress = progress
         self._repo: Optional[git.Repo] = None
         self._temp_dir: Optional[Path] = None
+        self._mirror_checkout: Optional[MirrorCheckout] = None
+        # Set when files are read from this commit's tree rather than the working tree
+        self._tree_ref: Optional[str] = None
+        # Commit id _tree_ref resolved to when it was verified
+        self._tree_commit: Optional[str] = None
+        # Size limit of the blob filter used when cloning, if any
+        self._blob_filter_limit: Optional[int] = None
+        self._blob_reader: Optional[BlobReader] = None
+        # "base..head" with both sides resolved, in --diff mode
+        self._diff_range: Optional[str] = None
+        self._metadata: Optional[GitMetadata] = None
 
     def __enter__(self):
         """Context manager entry."""
@@ -63,6 +96,8 @@ class GitHandler:
 
     def _clone_repository(self) -> Path:
         """Clone a remote repository to a temporary directory."""
+        if self.config.cache.mirrors:
+            return self._checkout_from_mirror()
         try:
             logger.info(f"Cloning repository from {self.config.repo_url}")
             
@@ -70,15 +105,24 @@ class GitHandler:
             self._temp_dir = Path(tempfile.mkdtemp(prefix='project2md_'))
             logger.debug(f"Created temporary directory: {self._temp_dir}")
             
-            # Clone the repository with specific branch
+            # Clone only what the output can contain, see _clone_options
+            options = self._clone_options()
             self._repo = git.Repo.clone_from(
                 self.config.repo_url,
                 self._temp_dir,
                 progress=self._progress_printer,
-                branch=self.config.branch
+                **options
             )
+            if 'filter' in options:
+                self._blob_filter_limit = self.config.general.max_file_size_bytes + 1
+            if self.config.diff:
+                self._tree_ref = self._verify_diff()
+            elif self.config.no_checkout:
+                self._tree_ref = 'HEAD'
+            elif options.get('no_checkout'):
+                self._sparse_checkout()
             
-            logger.info(f"Repository cloned successfully on branch {self.config.branch}")
+            logger.info(f"Repository cloned successfully on branch {self.config.branch or self._repo.active_branch}")
             return self._temp_dir
 
         except GitCommandError as e:
@@ -90,8 +134,151 @@ class GitHandler:
             self._cleanup_temp_dir()
             raise GitError(f"Failed to clone repository: {str(e)}")
 
+    def _clone_options(self) -> dict:
+        """
+        Derive clone options from the config.
+
+        Only the tip of the branch is fetched. When files that cannot be
+        read never show up in the output (general.stats_in_output), blobs
+        over the size limit are filtered out as well, and the checkout is
+        left to _sparse_checkout. With config.no_checkout nothing is
+        checked out at all.
+        """
+        options = {'depth': 1, 'single_branch': True}
+        if self.config.diff:
+            # Both sides of the diff and their merge base must be available
+            options = {}
+        if self.config.branch:
+            options['branch'] = self.config.branch
+        if self.config.general.stats_in_output:
+            # blob:limit omits blobs of at least the given size
+            options['filter'] = f"blob:limit={self.config.general.max_file_size_bytes + 1}"
+            options['no_checkout'] = True
+        if self.config.no_checkout or self.config.diff:
+            options['no_checkout'] = True
+        return options
+
+    def _sparse_checkout(self) -> None:
+        """
+        Check out only the files the walker will select.
+
+        The selection is made by running the walker over the commit tree,
+        so include/exclude patterns, pruning and the depth limit all apply.
+        A cone covering the selected files' directories is used when it
+        does not contain blobs the filter left out (checking those out
+        would download them); otherwise the files are listed one by one.
+        """
+        root = self._temp_dir.resolve()
+        try:
+            tree = self._parse_ls_tree(os.fsdecode(
+                self._repo.git.ls_tree('-r', '-z', 'HEAD', stdout_as_string=False)
+            ))
+            missing = self._missing_objects()
+
+            from .walker import FileSystemWalker
+            walker = FileSystemWalker(self.config, self.progress)
+            available = [entry for entry in tree if entry.oid not in missing]
+            selected = [
+                path.relative_to(root).as_posix()
+                for path in walker.iter_files(root, available)
+            ]
+
+            cone = self._cone_dirs(selected)
+            if any(entry.oid in missing and self._in_cone(entry.path, cone) for entry in tree):
+                mode, patterns = '--no-cone', ['/' + self._escape_pattern(path) for path in selected]
+            else:
+                mode, patterns = '--cone', sorted(cone)
+            logger.info(
+                f"Sparse checkout of {len(selected)} of {len(tree)} files "
+                f"({len(missing)} blobs over the size limit not downloaded)"
+            )
+            with tempfile.TemporaryFile('w+') as spec:
+                spec.write(''.join(pattern + '\n' for pattern in patterns))
+                spec.seek(0)
+                self._repo.git.execute(
+                    ['git', 'sparse-checkout', 'set', mode, '--stdin'],
+                    istream=spec
+                )
+        except Exception as e:
+            logger.warning(f"Sparse checkout failed, checking out all files: {e}")
+            self._repo.git.sparse_checkout('disable')
+        self._repo.git.checkout(self.config.branch or self._repo.active_branch.name)
+
+    def _missing_objects(self) -> set:
+        """Get the ids of objects a partial clone left out."""
+        output = self._repo.git.rev_list('--objects', '--missing=print', 'HEAD')
+        return {line[1:] for line in output.splitlines() if line.startswith('?')}
+
+    @staticmethod
+    def _cone_dirs(paths: List[str]) -> set:
+        """Get the smallest set of directories whose cone contains all paths."""
+        dirs = sorted({path.rpartition('/')[0] for path in paths} - {''})
+        cone = set()
+        for directory in dirs:
+            parts = directory.split('/')
+            if not any('/'.join(parts[:i]) in cone for i in range(1, len(parts))):
+                cone.add(directory)
+        return cone
+
+    @staticmethod
+    def _in_cone(path: str, cone: set) -> bool:
+        """Check whether a cone mode sparse checkout of the given directories includes a path."""
+        parent = path.rpartition('/')[0]
+        if not parent:
+            return True  # files in the root are always included
+        parts = parent.split('/')
+        if any('/'.join(parts[:i]) in cone for i in range(1, len(parts) + 1)):
+            return True
+        # Files directly inside the parents of a cone directory are included too
+        prefix = parent + '/'
+        return any(directory.startswith(prefix) for directory in cone)
+
+    @staticmethod
+    def _escape_pattern(path: str) -> str:
+        """Escape a path so that it matches literally as a sparse-checkout pattern."""
+        escaped = re.sub(r'([\\*?\[\]!#])', r'\\\1', path)
+        if escaped.endswith(' '):
+            escaped = escaped[:-1] + '\\ '
+        return escaped
+
+    def _checkout_from_mirror(self) -> Path:
+        """Check out the repository from the local mirror cache, updating it first."""
+        try:
+            self._temp_dir = Path(tempfile.mkdtemp(prefix='project2md_'))
+            mirrors = MirrorCache(Path(self.config.cache.dir), self.config.cache.mirror_max_size_bytes)
+            self._mirror_checkout = mirrors.checkout(
+                self.config.repo_url,
+                self.config.branch,
+                self._temp_dir,
+                progress=self._progress_printer,
+                checkout=not (self.config.no_checkout or self.config.diff)
+            )
+            self._repo = git.Repo(self._temp_dir)
+            if self.config.diff:
+                self._tree_ref = self._verify_diff()
+            elif self.config.no_checkout:
+                self._tree_ref = 'HEAD'  # the worktree is detached at the branch
+            mirrors.evict(keep=self.config.repo_url)
+            return self._temp_dir
+        except MirrorError as e:
+            self._cleanup_temp_dir()
+            raise GitError(str(e))
+        except Exception as e:
+            self._cleanup_temp_dir()
+            raise GitError(f"Failed to check out repository from mirror: {str(e)}")
+
     def _cleanup_temp_dir(self) -> None:
         """Clean up temporary directory if it exists."""
+        # Reader processes have the repository open
+        if self._blob_reader is not None:
+            self._blob_reader.close()
+            self._blob_reader = None
+        if self._mirror_checkout is not None:
+            try:
+                self._mirror_checkout.release()
+            except Exception as e:
+                logger.warning(f"Failed to release mirror checkout: {e}")
+            self._mirror_checkout = None
         if self._temp_dir and self._temp_dir.exists():
             try:
                 shutil.rmtree(self._temp_dir)
@@ -113,22 +300,25 @@ class GitHandler:
             
             if force:
                 logger.info("Force flag used - processing directory without Git validation")
+                if self.config.diff:
+                    raise GitError("--diff needs a Git repository and cannot be used with --force")
+                if self.config.no_checkout:
+                    logger.warning("--no-checkout is ignored with --force, reading the working tree")
                 return path
             
             try:
                 self._repo = git.Repo(path)
                 logger.info("Valid Git repository found")
-                
-                # Only attempt branch switching if explicitly requested
-                if self.config.branch != "main" and self.config.branch != self.get_current_branch():
-                    try:
-                        if self.config.branch in [b.name for b in self._repo.refs]:
-                            self._repo.git.checkout(self.config.branch)
-                            logger.info(f"Switched to branch: {self.config.branch}")
-                        else:
-                            raise GitError(f"Branch '{self.config.branch}' not found")
-                    except GitCommandError as e:
-                        raise GitError(f"Failed to switch to branch '{self.config.branch}': {str(e)}")
+
+                # A requested branch, tag or commit is read from its tree, so
+                # the user's checkout is never switched
+                self._tree_ref = None
+                self._tree_commit = None
+                ref = self._requested_ref()
+                if self.config.diff:
+                    self._tree_ref = self._verify_diff()
+                elif ref is not None or self.config.no_checkout:
+                    self._tree_ref = self._verify_ref(ref or 'HEAD')
                         
             except InvalidGitRepositoryError:
                 logger.info("Not a Git repository - processing as regular directory")
@@ -147,34 +337,395 @@ class GitHandler:
                 raise
             raise GitError(f"Failed to validate local repository: {str(e)}")
 
+    def _requested_ref(self) -> Optional[str]:
+        """Get the branch, tag or commit requested instead of the current branch, if any."""
+        if self.config.branch and self.config.branch != self.get_current_branch():
+            return self.config.branch
+        return None
+
+    def _verify_ref(self, ref: str) -> str:
+        """
+        Check that a ref names a commit whose tree can be read.
+
+        The commit id it resolves to is kept for get_repo_info.
+
+        Returns:
+            The ref, unchanged
+
+        Raises:
+            GitError: If the ref does not exist
+        """
+        try:
+            self._tree_commit = self._repo.git.rev_parse('--verify', '--quiet', f"{ref}^{{commit}}")
+        except GitCommandError:
+            if ref == 'HEAD':
+                raise GitError("Repository has no commits to read")
+            raise GitError(f"Branch '{ref}' not found")
+        logger.info(f"Reading files from {ref} without checking it out")
+        return ref
+
+    @staticmethod
+    def _parse_diff_spec(spec: str) -> Tuple[str, str, str]:
+        """
+        Split a "base..head" or "base...head" range.
+
+        As in git, an omitted side means HEAD.
+
+        Returns:
+            Tuple of (base, separator, head)
+        """
+        for separator in ('...', '..'):
+            base, found, head = spec.partition(separator)
+            if found:
+                break
+        else:
+            raise GitError(f"Invalid --diff range '{spec}', expected base..head or base...head")
+        return base or 'HEAD', separator, head or 'HEAD'
+
+    def _verify_diff(self) -> str:
+        """
+        Check both sides of the --diff range.
+
+        In clones, branches other than the cloned one only exist as
+        remote-tracking branches and are looked up under origin/.
+
+        Returns:
+            The head side, whose tree the changed files are read from
+        """
+        base, separator, head = self._parse_diff_spec(self.config.diff)
+        base, _ = self._resolve_ref(base)
+        head, self._tree_commit = self._resolve_ref(head)
+        self._diff_range = f"{base}{separator}{head}"
+        logger.info(f"Reading files changed in {self._diff_range}")
+        return head
+
+    def _resolve_ref(self, ref: str) -> Tuple[str, str]:
+        """
+        Get a name for ref that resolves in this repository, falling back to origin/<ref>.
+
+        Returns:
+            Tuple of (name, commit id)
+        """
+        for candidate in (ref, f"origin/{ref}"):
+            try:
+                commit = self._repo.git.rev_parse('--verify', '--quiet', f"{candidate}^{{commit}}")
+                return candidate, commit
+            except GitCommandError:
+                continue
+        raise GitError(f"Ref '{ref}' not found")
+
+    def list_changed_files(self) -> Optional[List[TrackedFile]]:
+        """
+        List the files added or modified in the --diff range.
+
+        The changed paths and their new blob ids come from one `git diff
+        --raw` call on the two commits, and blob sizes from one pipelined
+        `git cat-file --batch-check`, so the cost depends on the size of
+        the diff, not of the repository. Deleted files are left out.
+
+        Returns:
+            Changed files as of the head commit, or None if not in --diff mode
+
+        Raises:
+            GitError: If the diff cannot be computed
+        """
+        if not self._repo or self._diff_range is None:
+            return None
+        try:
+            output = self._repo.git.diff(
+                '--raw', '-z', '--no-abbrev', '--no-renames', '--no-ext-diff',
+                '--no-textconv', '--no-color', '--ignore-submodules', self._diff_range, '--',
+                stdout_as_string=False
+            )
+        except GitCommandError as e:
+            raise GitError(f"Failed to diff {self._diff_range}: {e}")
+        # Paths are decoded like the file system's, as in list_tracked_files
+        entries = self._parse_diff_raw(os.fsdecode(output))
+        if self._blob_filter_limit is None:
+            sizes = dict(self.get_blob_reader().get_sizes(entry.oid for entry in entries))
+        else:
+            # Asking for the size of a blob the filter left out would download it
+            present = self._blob_sizes()
+            sizes = {entry.oid: present.get(entry.oid, self._blob_filter_limit) for entry in entries}
+        changed = [entry._replace(size=sizes.get(entry.oid) or 0) for entry in entries]
+        logger.info(f"{len(changed)} files added or modified in {self._diff_range}")
+        return changed
+
+    @staticmethod
+    def _parse_diff_raw(output: str) -> List[TrackedFile]:
+        """
+        Parse `git diff --raw -z --no-abbrev` output into head-side file entries.
+
+        Each record is ":<old mode> <new mode> <old oid> <new oid> <status>"
+        followed by the path. Deleted files and submodules are skipped.
+        """
+        entries = []
+        fields = output.split('\0')
+        for info, path in zip(fields[0::2], fields[1::2]):
+            try:
+                _, new_mode, _, new_oid, status = info.lstrip(':').split(' ')
+                mode = int(new_mode, 8)
+            except ValueError:
+                logger.warning(f"Unexpected diff entry {info!r}")
+                continue
+            if status.startswith('D') or mode == _GITLINK_MODE:
+                continue
+            entries.append(TrackedFile(
+                path=path,
+                oid=new_oid,
+                mode=mode,
+                size=0,
+                mtime_ns=0,
+                ctime_ns=0,
+                dev=0,
+                ino=0
+            ))
+        return entries
+
+    def list_tree_files(self) -> Optional[List[TrackedFile]]:
+        """
+        List the files of the commit tree being read, when nothing is checked out.
+
+        Uses a single `git ls-tree -r -l` call, so entries carry blob sizes
+        but no stat data. Their contents are read with read_blob.
+
+        Returns:
+            Files of the tree, or None when the working tree is used
+
+        Raises:
+            GitError: If the tree cannot be listed
+        """
+        if not self._repo or self._tree_ref is None:
+            return None
+        try:
+            if self._blob_filter_limit is None:
+                return self._parse_ls_tree(os.fsdecode(
+                    self._repo.git.ls_tree('-r', '-z', '-l', self._tree_ref, stdout_as_string=False)
+                ))
+            # ls-tree -l would download every blob the filter left out just
+            # to report its size, so sizes come from the objects present.
+            # Missing blobs are known to be at least the filter limit.
+            entries = self._parse_ls_tree(os.fsdecode(
+                self._repo.git.ls_tree('-r', '-z', self._tree_ref, stdout_as_string=False)
+            ))
+            sizes = self._blob_sizes()
+            return [entry._replace(size=sizes.get(entry.oid, self._blob_filter_limit)) for entry in entries]
+        except GitCommandError as e:
+            raise GitError(f"Failed to list files of {self._tree_ref}: {e}")
+
+    def _blob_sizes(self) -> dict:
+        """Get the size of every blob present in the repository with one call."""
+        output = self._repo.git.cat_file(
+            '--batch-all-objects', '--unordered',
+            '--batch-check=%(objectname) %(objecttype) %(objectsize)'
+        )
+        sizes = {}
+        for line in output.splitlines():
+            oid, kind, size = line.split(' ')
+            if kind == 'blob':
+                sizes[oid] = int(size)
+        return sizes
+
+    def get_blob_reader(self) -> Optional[BlobReader]:
+        """Get the reader for blobs of the repository, or None if no Git repository is in use."""
+        if not self._repo:
+            return None
+        if self._blob_reader is None:
+            self._blob_reader = BlobReader(Path(self._repo.git_dir))
+        return self._blob_reader
+
+    def list_tracked_files(self) -> Optional[List[TrackedFile]]:
+        """
+        List the files tracked in the index, without walking the working tree.
+
+        Uses a single `git ls-files` call, which reads the index (any index
+        version) and reports each entry's blob id and recorded stat data.
+        Submodules and unmerged duplicates are skipped.
+
+        Returns:
+            Tracked files, or None if no Git repository is in use
+        """
+        if not self._repo:
+            return None
+        try:
+            index_mtime_ns = os.stat(os.path.join(self._repo.git_dir, 'index')).st_mtime_ns
+        except OSError:
+            index_mtime_ns = None
+        try:
+            output = self._repo.git.ls_files('-z', '--stage', '--debug', '-t', stdout_as_string=False)
+        except GitCommandError as e:
+            logger.warning(f"Failed to list tracked files: {e}")
+            return None
+        # Paths are bytes that need not be valid UTF-8; decode them as the
+        # OS does, so that they map back to the same file names
+        return self._parse_ls_files(os.fsdecode(output), index_mtime_ns)
+
+    @staticmethod
+    def _parse_ls_files(output: str, index_mtime_ns: Optional[int] = None) -> List[TrackedFile]:
+        """
+        Parse `git ls-files -z --stage --debug -t` output.
+
+        As in git, entries modified no earlier than the index file itself
+        are marked racy; without the index mtime all entries are.
+        """
+        # Each record is "<tag> <mode> <oid> <stage>\t<path>\0" followed by
+        # five newline-terminated debug lines with the recorded stat data.
+        tracked = []
+        seen = set()
+        chunks = output.split('\0')
+        header = chunks[0]
+        for chunk in chunks[1:]:
+            lines = chunk.split('\n', 5)
+            next_header = lines[5] if len(lines) > 5 else ''
+            try:
+                info, path = header.split('\t', 1)
+                tag, mode, oid, _stage = info.split(' ')
+                mode = int(mode, 8)
+                if mode == _GITLINK_MODE or path in seen:
+                    continue
+                seen.add(path)
+                fields = {}
+                for line in lines[:5]:
+                    for item in line.strip().split('\t'):
+                        key, _, value = item.partition(': ')
+                        fields[key] = value
+                mtime_ns = GitHandler._parse_index_time(fields['mtime'])
+                tracked.append(TrackedFile(
+                    path=path,
+                    oid=oid,
+                    mode=mode,
+                    size=int(fields['size']),
+                    mtime_ns=mtime_ns,
+                    ctime_ns=GitHandler._parse_index_time(fields['ctime']),
+                    dev=int(fields['dev']),
+                    ino=int(fields['ino']),
+                    skip_worktree=tag == 'S',
+                    racy=index_mtime_ns is None or mtime_ns >= index_mtime_ns
+                ))
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Unexpected ls-files entry {header!r}: {e}")
+            finally:
+                header = next_header
+        return tracked
+
+    @staticmethod
+    def _parse_ls_tree(output: str) -> List[TrackedFile]:
+        """
+        Parse `git ls-tree -r -z [-l]` output into file entries.
+
+        Tree entries carry no stat data, so size is 0 unless -l was used
+        and mtime_ns is always 0. Submodules are skipped.
+        """
+        entries = []
+        for record in output.split('\0'):
+            if not record:
+                continue
+            info, _, path = record.partition('\t')
+            fields = info.split()
+            if len(fields) < 3 or fields[1] != 'blob':
+                continue
+            size = int(fields[3]) if len(fields) > 3 and fields[3].isdigit() else 0
+            entries.append(TrackedFile(
+                path=path,
+                oid=fields[2],
+                mode=int(fields[0], 8),
+                size=size,
+                mtime_ns=0,
+                ctime_ns=0,
+                dev=0,
+                ino=0
+            ))
+        return entries
+
+    @staticmethod
+    def _parse_index_time(value: str) -> int:
+        """Convert an index timestamp ("sec:nsec") to nanoseconds."""
+        seconds, _, nanoseconds = value.partition(':')
+        return int(seconds) * 1_000_000_000 + int(nanoseconds or 0)
+
+    def _get_metadata(self) -> GitMetadata:
+        """Get the reader for the repository's HEAD, refs and config."""
+        if self._metadata is None:
+            self._metadata = GitMetadata(Path(self._repo.git_dir))
+        return self._metadata
+
     def get_current_branch(self) -> str:
         """Get the name of the current branch."""
         if not self._repo:
             return "unknown"
+        if self._tree_ref not in (None, 'HEAD'):
+            return self._tree_ref
         try:
-            return self._repo.active_branch.name
-        except TypeError:  # HEAD might be detached
-            return "detached-head"
-        except Exception as e:
+            branch = self._get_metadata().current_branch()
+        except GitMetadataError as e:
             logger.warning(f"Failed to get current branch: {e}")
             return "unknown"
+        if branch is None:  # HEAD might be detached
+            # Mirror checkouts are detached at the requested branch
+            if self._mirror_checkout is not None:
+                return self._mirror_checkout.ref
+            return "detached-head"
+        return branch
 
     def get_repo_info(self) -> dict:
-        """Get repository information for documentation."""
+        """
+        Get repository information for documentation.
+
+        Everything but the dirty check is read from the git directory
+        without starting git. The dirty check only runs when
+        general.check_dirty is set; otherwise has_uncommitted_changes is None.
+        """
         if not self._repo:
             return {
                 "branch": "unknown",
                 "is_git_repo": False
             }
+
+        metadata = self._get_metadata()
+        try:
+            # A requested ref may be a short name or a commit id, so use
+            # the commit id git resolved it to when it was verified
+            head_commit = self._tree_commit or metadata.head_commit()
+            remotes = metadata.remotes()
+        except GitMetadataError as e:
+            logger.warning(f"Failed to read repository metadata: {e}")
+            head_commit, remotes = None, []
         
         return {
             "branch": self.get_current_branch(),
             "is_git_repo": True,
-            "has_uncommitted_changes": self._repo.is_dirty(),
-            "remotes": [remote.name for remote in self._repo.remotes],
+            "head_commit": head_commit,
+            "has_uncommitted_changes": self._has_uncommitted_changes(),
+            "remotes": remotes,
             "root_path": str(self._repo.working_dir)
         }
 
+    def _has_uncommitted_changes(self) -> Optional[bool]:
+        """
+        Check for staged and unstaged changes, if general.check_dirty asks for it.
+
+        The index is compared with HEAD (`git diff-index --cached`), and the
+        working tree with the index by the stat data the index records
+        (`git diff-files`), so no file content is read. A file whose stat
+        changed but whose content did not counts as changed.
+
+        Returns:
+            Whether the index or working tree differs from HEAD, or None if not checked
+        """
+        if self._tree_ref is not None:
+            return False  # a commit tree that is read directly has no uncommitted changes
+        if not self.config.general.check_dirty:
+            return None
+        try:
+            self._repo.git.diff_index('--cached', '--quiet', 'HEAD', '--')
+            self._repo.git.diff_files('--quiet', '--')
+            return False
+        except GitCommandError as e:
+            if e.status == 1:
+                return True
+            logger.warning(f"Failed to check for uncommitted changes: {e}")
+            return None
+
     def _progress_printer(self, op_code: int, cur_count: int, max_count: int, message: str) -> None:
         """Callback for Git clone progress."""
         if max_count:
@@ -0,0 +1,118 @@
+# project2md/gitmeta.py
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Symbolic refs are followed at most this many times, as in git
+_MAX_SYMREF_DEPTH = 5
+_SHA_RE = re.compile(r'^[0-9a-f]{40}(?:[0-9a-f]{24})?$')
+_REMOTE_SECTION_RE = re.compile(r'^\s*\[\s*remote\s+"((?:[^"\\]|\\.)*)"\s*\]')
+
+class GitMetadataError(Exception):
+    """Custom exception for errors reading repository metadata."""
+    pass
+
+class GitMetadata:
+    """
+    Reads repository metadata straight from the files in the git directory.
+
+    HEAD, loose refs, packed-refs and the config file are parsed directly,
+    so looking up the branch, the HEAD commit or the remotes never starts
+    a git process. Linked worktrees keep HEAD in their own git directory
+    and everything else in the common directory named by `commondir`.
+    """
+
+    def __init__(self, git_dir: Path):
+        self.git_dir = Path(git_dir)
+        self.common_dir = self.git_dir
+        try:
+            common = (self.git_dir / 'commondir').read_text(encoding='utf-8').strip()
+            self.common_dir = (self.git_dir / common).resolve()
+        except OSError:
+            pass
+        self._packed_refs: Optional[Dict[str, str]] = None
+
+    def head_ref(self) -> Optional[str]:
+        """Get the ref HEAD points to, e.g. refs/heads/main, or None if HEAD is detached."""
+        head = self._read(self.git_dir / 'HEAD')
+        if head is None:
+            raise GitMetadataError(f"No HEAD in {self.git_dir}")
+        if head.startswith('ref:'):
+            return head[len('ref:'):].strip()
+        return None
+
+    def current_branch(self) -> Optional[str]:
+        """Get the name of the checked out branch, or None if HEAD is detached."""
+        ref = self.head_ref()
+        if ref is None:
+            return None
+        return ref[len('refs/heads/'):] if ref.startswith('refs/heads/') else ref
+
+    def head_commit(self) -> Optional[str]:
+        """Get the commit id HEAD resolves to, or None on an unborn branch."""
+        return self.resolve('HEAD')
+
+    def resolve(self, ref: str) -> Optional[str]:
+        """
+        Resolve a full ref name (or HEAD) to an object id.
+
+        Returns:
+            The object id, or None if the ref does not exist
+        """
+        for _ in range(_MAX_SYMREF_DEPTH):
+            value = self._read_ref(ref)
+            if value is None:
+                return None
+            if not value.startswith('ref:'):
+                return value if _SHA_RE.match(value) else None
+            ref = value[len('ref:'):].strip()
+        raise GitMetadataError(f"Too many levels of symbolic refs for {ref}")
+
+    def remotes(self) -> List[str]:
+        """Get the names of the remotes configured in the repository's config file."""
+        config = self._read(self.common_dir / 'config', strip=False)
+        if config is None:
+            return []
+        names = []
+        for line in config.splitlines():
+            match = _REMOTE_SECTION_RE.match(line)
+            if match:
+                name = re.sub(r'\\(.)', r'\1', match.group(1))
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def _read_ref(self, ref: str) -> Optional[str]:
+        """Read a ref from its loose file or from packed-refs."""
+        # HEAD and other pseudo refs belong to the worktree, refs/ to the common dir
+        base = self.common_dir if ref.startswith('refs/') else self.git_dir
+        value = self._read(base / ref)
+        if value is not None:
+            return value
+        return self._get_packed_refs().get(ref)
+
+    def _get_packed_refs(self) -> Dict[str, str]:
+        """Parse packed-refs once, skipping its header and peeled tag lines."""
+        if self._packed_refs is None:
+            self._packed_refs = {}
+            content = self._read(self.common_dir / 'packed-refs', strip=False)
+            for line in (content or '').splitlines():
+                if not line or line[0] in '#^':
+                    continue
+                oid, _, name = line.partition(' ')
+                self._packed_refs[name.strip()] = oid
+        return self._packed_refs
+
+    @staticmethod
+    def _read(path: Path, strip: bool = True) -> Optional[str]:
+        """Read a small text file, or return None if it does not exist."""
+        try:
+            content = path.read_text(encoding='utf-8')
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            return None
+        except OSError as e:
+            raise GitMetadataError(f"Failed to read {path}: {e}")
+        return content.strip() if strip else content
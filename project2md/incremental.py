@@ -0,0 +1,258 @@
+# project2md/incremental.py
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+from collections import Counter
+
+from .formatters.base import BaseFormatter
+from .stats import StatsCollector
+from .walker import FileSystemWalker
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+class ManifestEntry(NamedTuple):
+    """What the manifest records about one file of the previous run."""
+    size: int
+    mtime_ns: int
+    inode: int
+    sha256: Optional[str]
+    is_text: bool
+    offset: Optional[int] = None  # byte range of the file's section in the output
+    length: Optional[int] = None
+    tokens: Optional[int] = None  # estimated token count of the content
+
+def manifest_path(output_path: Path) -> Path:
+    """Get the path of the manifest kept next to an output file."""
+    return output_path.with_name(output_path.name + '.manifest.json')
+
+class IncrementalGenerator:
+    """
+    Regenerates an output file, re-reading only files that changed.
+
+    A manifest next to the output records the stat, content hash and
+    section byte range of every file. Files whose size, mtime_ns and inode
+    are unchanged are not read again: their sections are copied from the
+    previous output, and the tree and statistics are rebuilt from the
+    manifest. Added and changed files are read and rendered as usual.
+    """
+
+    def __init__(self, config, walker: FileSystemWalker, formatter: BaseFormatter):
+        self.config = config
+        self.walker = walker
+        self.formatter = formatter
+        self.counts = Counter()
+
+    @property
+    def supported(self) -> bool:
+        """Whether the formatter's output can be spliced section by section."""
+        return self.formatter.section_layout is not None
+
+    def generate(
+        self,
+        repo_path: Path,
+        files: Iterable[Path],
+        stats_collector: StatsCollector,
+        branch: str = "unknown"
+    ) -> Dict:
+        """
+        Write the output for the given files, reusing the previous run where possible.
+
+        Args:
+            repo_path: Repository root
+            files: Files to document, in output order
+            stats_collector: Collector to fill from manifest entries and new reads
+            branch: Current branch name for the statistics
+
+        Returns:
+            The collected statistics
+        """
+        output_path = Path(self.config.output_file)
+        fingerprint = self._fingerprint(repo_path)
+        previous = self._load_manifest(output_path, fingerprint)
+        self.counts = Counter()
+
+        # Only files whose stat differs from the manifest are read again
+        candidates: List[Tuple[Path, str, os.stat_result]] = []
+        to_read: List[Path] = []
+        for file_path in files:
+            file_stat = self.walker.get_stat(file_path)
+            if file_stat is None:
+                try:
+                    file_stat = os.stat(file_path)
+                except OSError as e:
+                    logger.warning(f"Error accessing {file_path}: {e}")
+                    continue
+            rel_path = file_path.relative_to(repo_path).as_posix()
+            candidates.append((file_path, rel_path, file_stat))
+            old = previous.get(rel_path)
+            if old is None or (old.size, old.mtime_ns, old.inode) != self._identity(file_stat):
+                to_read.append(file_path)
+        contents = dict(self.walker.read_files(to_read, workers=self.config.general.read_workers))
+
+        entries: Dict[str, ManifestEntry] = {}
+        documented: List[Tuple[Path, str]] = []
+        for file_path, rel_path, file_stat in candidates:
+            old = previous.get(rel_path)
+            if file_path in contents:
+                content = contents[file_path]
+                digest = hashlib.sha256(content.encode('utf-8')).hexdigest() if content is not None else None
+                entry = ManifestEntry(
+                    *self._identity(file_stat), digest, content is not None,
+                    tokens=self.walker.get_tokens(file_path)
+                )
+                if old is None:
+                    self.counts['added'] += 1
+                elif old.sha256 != digest or old.is_text != entry.is_text:
+                    self.counts['changed'] += 1
+                else:
+                    self.counts['unchanged'] += 1
+            else:
+                entry = old._replace(offset=None, length=None)
+                self.counts['unchanged'] += 1
+            entries[rel_path] = entry
+
+            if entry.is_text or not self.config.general.stats_in_output:
+                stats_collector.process_entry(file_path, entry.size, entry.is_text, entry.tokens)
+                documented.append((file_path, rel_path))
+        self.counts['deleted'] = len(previous.keys() - entries.keys())
+        stats = stats_collector.get_stats(branch, repo_path)
+
+        header_files = [
+            (file_path, self._header_content(file_path, entries[rel_path], contents))
+            for file_path, rel_path in documented
+        ]
+        header = self.formatter.render_header(repo_path, header_files, stats)
+
+        section_paths: List[str] = []
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        old_output = open(output_path, 'rb') if previous else None
+        try:
+            with open(tmp_path, 'wb') as out:
+                ranges = self.formatter.write_sections(
+                    out,
+                    header,
+                    self._sections(repo_path, documented, previous, contents, old_output, section_paths),
+                    self.formatter.render_footer()
+                )
+        finally:
+            if old_output is not None:
+                old_output.close()
+        os.replace(tmp_path, output_path)
+
+        for rel_path, (offset, length) in zip(section_paths, ranges):
+            entries[rel_path] = entries[rel_path]._replace(offset=offset, length=length)
+        self._save_manifest(output_path, fingerprint, entries)
+
+        logger.info(
+            f"Incremental update: {self.counts['added']} added, {self.counts['changed']} changed, "
+            f"{self.counts['deleted']} deleted, {self.counts['unchanged']} unchanged"
+        )
+        return stats
+
+    def get_counts(self) -> Dict[str, int]:
+        """Get the number of added, changed, deleted and unchanged files of the last run."""
+        return {key: self.counts[key] for key in ('added', 'changed', 'deleted', 'unchanged')}
+
+    def _sections(
+        self,
+        repo_path: Path,
+        documented: List[Tuple[Path, str]],
+        previous: Dict[str, ManifestEntry],
+        contents: Dict[Path, Optional[str]],
+        old_output,
+        section_paths: List[str]
+    ) -> Iterator:
+        """Yield file sections, copying unchanged ones from the previous output."""
+        for file_path, rel_path in documented:
+            if file_path in contents:
+                section = self.formatter.render_file(repo_path, file_path, contents[file_path])
+            else:
+                old = previous[rel_path]
+                if old.offset is None:
+                    continue
+                old_output.seek(old.offset)
+                section = old_output.read(old.length)
+            if section is not None:
+                section_paths.append(rel_path)
+                yield section
+
+    def _header_content(
+        self,
+        file_path: Path,
+        entry: ManifestEntry,
+        contents: Dict[Path, Optional[str]]
+    ) -> Optional[str]:
+        """Get the content the header needs for a file: only READMEs are shown there."""
+        if file_path in contents:
+            return contents[file_path]
+        if entry.is_text and file_path.name.lower() == "readme.md":
+            return self.walker.read_file(file_path)
+        return None
+
+    def _fingerprint(self, repo_path: Path) -> str:
+        """Hash the settings that affect the output; a change forces a full rebuild."""
+        settings = {
+            "version": MANIFEST_VERSION,
+            "formatter": type(self.formatter).__name__,
+            "repo_path": str(repo_path),
+            "include": self.config.include.files + self.config.include.dirs,
+            "exclude": self.config.exclude.files + self.config.exclude.dirs,
+            "max_file_size": self.config.general.max_file_size_bytes,
+            "stats_in_output": self.config.general.stats_in_output,
+            "stats": self.config.output.stats,
+            "tokenizer": self.config.output.tokenizer,
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _load_manifest(self, output_path: Path, fingerprint: str) -> Dict[str, ManifestEntry]:
+        """Load the previous manifest, or return nothing if it cannot be used."""
+        path = manifest_path(output_path)
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            output_stat = os.stat(output_path)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring manifest {path}: {e}")
+            return {}
+
+        if data.get('version') != MANIFEST_VERSION or data.get('fingerprint') != fingerprint:
+            logger.info("Settings changed since the last run, regenerating all files")
+            return {}
+        # Byte ranges are only valid for the exact file the manifest describes
+        if (data.get('output_size'), data.get('output_mtime_ns')) != (output_stat.st_size, output_stat.st_mtime_ns):
+            logger.info(f"{output_path} was modified since the last run, regenerating all files")
+            return {}
+
+        try:
+            return {rel_path: ManifestEntry(*fields) for rel_path, fields in data['files'].items()}
+        except (KeyError, TypeError) as e:
+            logger.warning(f"Ignoring manifest {path}: {e}")
+            return {}
+
+    def _save_manifest(self, output_path: Path, fingerprint: str, entries: Dict[str, ManifestEntry]) -> None:
+        """Write the manifest describing the output just written."""
+        output_stat = os.stat(output_path)
+        data = {
+            "version": MANIFEST_VERSION,
+            "fingerprint": fingerprint,
+            "output_size": output_stat.st_size,
+            "output_mtime_ns": output_stat.st_mtime_ns,
+            "files": {rel_path: list(entry) for rel_path, entry in entries.items()},
+        }
+        path = manifest_path(output_path)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _identity(file_stat: os.stat_result) -> Tuple[int, int, int]:
+        """Stat fields that must be unchanged for a file to be reused."""
+        return file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino
@@ -0,0 +1,152 @@
+# project2md/matcher.py
+from typing import Iterable, List, Optional, Set, Tuple
+import logging
+import re
+import pathspec
+
+logger = logging.getLogger(__name__)
+
+_GLOB_CHARS = re.compile(r'[*?\[\\]')
+_NAMED_GROUP = re.compile(r'\(\?P<\w+>')
+
+class _PatternGroup:
+    """
+    A set of gitwildmatch patterns that all have the same include value.
+
+    Plain extensions, literal names and directory names are stored in sets.
+    The remaining globs are combined into one regular expression.
+    """
+
+    def __init__(self):
+        self.extensions: Set[str] = set()
+        self.names: Set[str] = set()
+        self.dir_names: Set[str] = set()
+        self.regexes: List[str] = []
+        self._combined: Optional[re.Pattern] = None
+
+    def add(self, body: str, pattern: pathspec.Pattern) -> None:
+        """Add a pattern, given its text without a leading '!'."""
+        kind, value = _classify(body)
+        if kind == 'extension':
+            self.extensions.add(value)
+        elif kind == 'name':
+            self.names.add(value)
+        elif kind == 'dir_name':
+            self.dir_names.add(value)
+        else:
+            # Named groups would clash once the expressions are combined
+            self.regexes.append(_NAMED_GROUP.sub('(?:', pattern.regex.pattern))
+
+    def compile(self) -> None:
+        """Combine the glob patterns into a single expression."""
+        if self.regexes:
+            self._combined = re.compile('|'.join(f'(?:{regex})' for regex in self.regexes))
+
+    def matches(self, rel_path: str, parts: List[str], dir_parts: List[str]) -> bool:
+        """Check whether any pattern in the group matches the path."""
+        if self.names and not self.names.isdisjoint(parts):
+            return True
+        if self.dir_names and not self.dir_names.isdisjoint(dir_parts):
+            return True
+        if self.extensions:
+            for part in parts:
+                dot = part.find('.')
+                while dot != -1:
+                    if part[dot:] in self.extensions:
+                        return True
+                    dot = part.find('.', dot + 1)
+        if self._combined is not None:
+            return self._combined.match(rel_path) is not None
+        return False
+
+def _classify(body: str) -> Tuple[str, str]:
+    """Work out whether a pattern can be matched with a set lookup."""
+    if body != body.strip():
+        return 'regex', body
+
+    # "**/x" matches like "x" when x itself has no slash
+    name = body[3:] if body.startswith('**/') else body
+
+    # "*.ext" and "**/*.ext": a path component ending in ".ext"
+    if name.startswith('*.') and not _GLOB_CHARS.search(name[2:]) and '/' not in name:
+        return 'extension', name[1:]
+
+    # "name/", "**/name/" and "**/name/**": a directory component
+    if name.endswith('/**') and body.startswith('**/'):
+        name = name[:-2]
+    if name.endswith('/'):
+        dir_name = name[:-1]
+        if dir_name and '/' not in dir_name and not _GLOB_CHARS.search(dir_name):
+            return 'dir_name', dir_name
+        return 'regex', body
+
+    # "name" and "**/name": any path component
+    if name and '/' not in name and not _GLOB_CHARS.search(name):
+        return 'name', name
+
+    return 'regex', body
+
+class PathMatcher:
+    """
+    Compiled matcher for a list of gitwildmatch patterns.
+
+    Gives the same answers as pathspec.PathSpec.match_file, including the
+    last-match-wins handling of negated patterns. Patterns after the last
+    negation are folded into one group, since any match there decides the
+    result. Patterns up to the last negation are checked one by one,
+    newest first, as order matters for them.
+
+    Paths are POSIX paths relative to the root; directories end with '/'.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        factory = pathspec.util.lookup_pattern('gitwildmatch')
+        compiled: List[Tuple[str, pathspec.Pattern]] = []
+        for line in patterns:
+            pattern = factory(line)
+            if pattern.include is None:
+                continue
+            body = line[1:] if line.startswith('!') else line
+            compiled.append((body, pattern))
+
+        self.pattern_count = len(compiled)
+        last_negation = max(
+            (i for i, (_, pattern) in enumerate(compiled) if not pattern.include),
+            default=-1
+        )
+        self.has_negations = last_negation >= 0
+
+        # Ordered checks for the patterns up to and including the last negation
+        self._ordered: List[Tuple[bool, _PatternGroup]] = []
+        for body, pattern in reversed(compiled[:last_negation + 1]):
+            group = _PatternGroup()
+            group.add(body, pattern)
+            group.compile()
+            self._ordered.append((pattern.include, group))
+
+        self._tail = _PatternGroup()
+        for body, pattern in compiled[last_negation + 1:]:
+            self._tail.add(body, pattern)
+        self._tail.compile()
+
+    def check(self, rel_path: str) -> Optional[bool]:
+        """
+        Get the include value of the last pattern matching a path.
+
+        Returns:
+            True or False from the deciding pattern, None if none matches
+        """
+        is_dir = rel_path.endswith('/')
+        parts = rel_path.rstrip('/').split('/')
+        dir_parts = parts if is_dir else parts[:-1]
+
+        if self._tail.matches(rel_path, parts, dir_parts):
+            return True
+        for include, group in self._ordered:
+            if group.matches(rel_path, parts, dir_parts):
+                return include
+        return None
+
+    def match_file(self, rel_path: str) -> bool:
+        """Check whether a path is selected by the patterns."""
+        return bool(self.check(rel_path))
@@ -0,0 +1,244 @@
+# project2md/mirror.py
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, IO, Iterator, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import re
+import shutil
+import git
+from git.exc import GitCommandError
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class MirrorError(Exception):
+    """Custom exception for mirror cache errors."""
+    pass
+
+class MirrorCheckout:
+    """A worktree checked out from a cached mirror, valid until released."""
+
+    def __init__(self, cache: 'MirrorCache', url: str, ref: str, path: Path, use_lock: IO):
+        self.cache = cache
+        self.url = url
+        self.ref = ref
+        self.path = path
+        self._use_lock = use_lock
+
+    def release(self) -> None:
+        """Remove the worktree and let the mirror be evicted again."""
+        if self._use_lock is None:
+            return
+        try:
+            self.cache._remove_worktree(self.url, self.path)
+        finally:
+            self._use_lock.close()
+            self._use_lock = None
+
+class MirrorCache:
+    """
+    Bare mirrors of remote repositories, kept between runs.
+
+    The first checkout of a URL creates a mirror with `git clone --mirror`;
+    later ones only fetch new objects. Each checkout is a detached worktree
+    of the requested ref. Two lock files per mirror make concurrent runs
+    safe: "update" is held exclusively while the mirror or its worktree
+    list changes, and "use" is held shared while a worktree is in use, so
+    eviction skips mirrors that are busy. Mirrors beyond max_size bytes
+    on disk are evicted least recently used first.
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int):
+        self.root = Path(cache_dir).expanduser() / 'mirrors'
+        self.max_size = max_size
+
+    def key(self, url: str) -> str:
+        """Get the name under which a URL is cached."""
+        name = url.rstrip('/').rsplit('/', 1)[-1]
+        if name.endswith('.git'):
+            name = name[:-4]
+        name = re.sub(r'[^A-Za-z0-9._-]+', '_', name)[:40] or 'repo'
+        return f"{name}-{hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]}"
+
+    def mirror_path(self, url: str) -> Path:
+        """Get the path of the mirror for a URL."""
+        return self.root / f"{self.key(url)}.git"
+
+    def checkout(
+        self,
+        url: str,
+        ref: Optional[str],
+        dest: Path,
+        progress: Optional[Callable] = None,
+        checkout: bool = True
+    ) -> MirrorCheckout:
+        """
+        Update the mirror of a URL and check out a ref as a worktree.
+
+        Args:
+            url: Repository URL
+            ref: Branch, tag or commit to check out; None for the remote's default branch
+            dest: Empty directory for the worktree
+            progress: GitPython progress callback used while cloning
+            checkout: If False, the worktree's HEAD is set but no files are written
+
+        Returns:
+            Checkout to release once the worktree is no longer needed
+        """
+        use_lock = self._open_lock(url, 'use')
+        try:
+            self._flock(use_lock, shared=True)
+            with self._locked(url, 'update'):
+                repo = self._update(url, progress)
+                if ref is None:
+                    # A mirror's HEAD names the remote's default branch
+                    ref = repo.git.symbolic_ref('--short', 'HEAD')
+                try:
+                    commit = repo.git.rev_parse('--verify', '--quiet', f"{ref}^{{commit}}")
+                except GitCommandError:
+                    raise MirrorError(f"Branch '{ref}' not found in repository")
+                options = ['--detach'] if checkout else ['--detach', '--no-checkout']
+                repo.git.worktree('add', *options, str(dest), commit)
+            os.utime(use_lock.name)
+        except GitCommandError as e:
+            use_lock.close()
+            raise MirrorError(f"Git mirror checkout failed: {e}")
+        except BaseException:
+            use_lock.close()
+            raise
+        logger.info(f"Checked out {ref} from mirror {self.mirror_path(url)}")
+        return MirrorCheckout(self, url, ref, dest, use_lock)
+
+    def evict(self, keep: Optional[str] = None) -> List[Path]:
+        """
+        Remove least recently used mirrors until the cache fits max_size.
+
+        Mirrors that are in use, and the mirror of `keep`, are left alone.
+
+        Returns:
+            Paths of the removed mirrors
+        """
+        mirrors = self._list_mirrors()
+        total = sum(size for _, _, size in mirrors)
+        keep_path = self.mirror_path(keep) if keep else None
+        removed = []
+        for path, _, size in mirrors:
+            if total <= self.max_size:
+                break
+            if path == keep_path:
+                continue
+            key = path.name[:-len('.git')]
+            use_lock = self._open_lock_by_key(key, 'use')
+            try:
+                if not self._flock(use_lock, blocking=False):
+                    continue
+                with self._locked_by_key(key, 'update'):
+                    shutil.rmtree(path, ignore_errors=True)
+            finally:
+                use_lock.close()
+            logger.info(f"Evicted mirror {path}")
+            removed.append(path)
+            total -= size
+        return removed
+
+    def _update(self, url: str, progress: Optional[Callable]) -> git.Repo:
+        """Create or fetch the mirror of a URL. The update lock must be held."""
+        path = self.mirror_path(url)
+        if (path / 'HEAD').exists():
+            repo = git.Repo(path)
+            try:
+                repo.git.fetch('--prune', 'origin')
+                logger.info(f"Fetched {url} into mirror {path}")
+            except GitCommandError as e:
+                logger.warning(f"Failed to fetch {url}, using cached mirror: {e}")
+            return repo
+
+        tmp_path = path.with_name(path.name + '.tmp')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        logger.info(f"Creating mirror of {url} in {path}")
+        git.Repo.clone_from(url, tmp_path, mirror=True, progress=progress)
+        os.rename(tmp_path, path)
+        return git.Repo(path)
+
+    def _remove_worktree(self, url: str, worktree: Path) -> None:
+        """Remove a worktree and its administrative files from the mirror."""
+        with self._locked(url, 'update'):
+            path = self.mirror_path(url)
+            try:
+                git.Repo(path).git.worktree('remove', '--force', str(worktree))
+            except Exception as e:
+                logger.debug(f"git worktree remove failed, pruning instead: {e}")
+                shutil.rmtree(worktree, ignore_errors=True)
+                try:
+                    git.Repo(path).git.worktree('prune')
+                except Exception as e:
+                    logger.warning(f"Failed to prune worktrees of {path}: {e}")
+
+    def _list_mirrors(self) -> List[Tuple[Path, float, int]]:
+        """List (path, last used, disk usage) of all mirrors, oldest first."""
+        mirrors = []
+        if not self.root.is_dir():
+            return mirrors
+        for path in self.root.glob('*.git'):
+            lock_path = self.root / f"{path.name[:-len('.git')]}.use.lock"
+            try:
+                last_used = os.stat(lock_path).st_mtime
+            except OSError:
+                last_used = 0.0
+            mirrors.append((path, last_used, self._disk_usage(path)))
+        mirrors.sort(key=lambda mirror: mirror[1])
+        return mirrors
+
+    @staticmethod
+    def _disk_usage(path: Path) -> int:
+        """Get the disk space used by a directory tree in bytes."""
+        total = 0
+        for dir_path, _, file_names in os.walk(path):
+            for name in file_names:
+                try:
+                    total += os.lstat(os.path.join(dir_path, name)).st_blocks * 512
+                except (OSError, AttributeError):
+                    pass
+        return total
+
+    def _open_lock(self, url: str, kind: str) -> IO:
+        """Open the lock file of the mirror of a URL."""
+        return self._open_lock_by_key(self.key(url), kind)
+
+    def _open_lock_by_key(self, key: str, kind: str) -> IO:
+        """Open the lock file of a mirror; kind is 'update' or 'use'."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        return open(self.root / f"{key}.{kind}.lock", 'a')
+
+    @contextmanager
+    def _locked(self, url: str, kind: str) -> Iterator[None]:
+        """Hold the lock of the mirror of a URL exclusively."""
+        with self._locked_by_key(self.key(url), kind):
+            yield
+
+    @contextmanager
+    def _locked_by_key(self, key: str, kind: str) -> Iterator[None]:
+        """Hold a mirror's lock exclusively."""
+        with self._open_lock_by_key(key, kind) as lock_file:
+            self._flock(lock_file)
+            yield
+
+    @staticmethod
+    def _flock(lock_file: IO, shared: bool = False, blocking: bool = True) -> bool:
+        """Lock an open lock file, returning False if it is busy and blocking is off."""
+        if fcntl is None:
+            return True
+        operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        if not blocking:
+            operation |= fcntl.LOCK_NB
+        try:
+            fcntl.flock(lock_file.fileno(), operation)
+        except BlockingIOError:
+            return False
+        return True
@@ -0,0 +1,242 @@
+# project2md/sharding.py
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import json
+import logging
+import os
+import re
+
+from .formatters.base import ENCODING_ERRORS, BaseFormatter
+from .stats import StatsCollector
+from .walker import FileSystemWalker
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Rough size of a token in source text, used to turn token budgets into bytes
+BYTES_PER_TOKEN = 4
+# Estimated bytes a file adds around its content: section heading, fences
+# or keys, and its line in the part's tree
+_SECTION_OVERHEAD = 64
+# Estimated bytes of a part's overview, statistics and footer
+_HEADER_OVERHEAD = 2048
+
+class ShardError(Exception):
+    """Custom exception for output sharding errors."""
+    pass
+
+class PartResult(NamedTuple):
+    """What was written to one part."""
+    path: Path
+    size: int
+    files: List[str]  # relative paths of the files with a section in the part
+    stats: StatsCollector
+
+def part_budget(output_config) -> Optional[int]:
+    """Get the byte budget of one output part, or None if the output is not split."""
+    budgets = []
+    if output_config.max_part_size is not None:
+        budgets.append(output_config.max_part_size_bytes)
+    if output_config.max_part_tokens is not None:
+        budgets.append(output_config.max_part_tokens * BYTES_PER_TOKEN)
+    return min(budgets) if budgets else None
+
+def part_path(output_path: Path, number: int, count: int) -> Path:
+    """Get the path of part `number` (from 1) of `count`, e.g. summary.part001.md."""
+    width = max(3, len(str(count)))
+    return output_path.with_name(f"{output_path.stem}.part{number:0{width}d}{output_path.suffix}")
+
+def part_pattern(output_path: Path) -> str:
+    """Get a regular expression matching the path of any part, whatever its number."""
+    stem = re.escape(output_path.with_name(output_path.stem).as_posix())
+    return rf"{stem}\.part\d+{re.escape(output_path.suffix)}"
+
+def index_path(output_path: Path) -> Path:
+    """Get the path of the index that maps files to parts."""
+    return output_path.with_name(f"{output_path.stem}.index.json")
+
+def plan_parts(repo_path: Path, files: Iterable[Tuple[Path, int]], budget: int) -> List[List[Path]]:
+    """
+    Group files, in order, into parts whose estimated size fits the budget.
+
+    Sizes come from stat data, so the plan is made before any file is read.
+    Files are never split: one that does not fit any part gets a part of
+    its own.
+
+    Args:
+        repo_path: Repository root
+        files: (path, size in bytes) of every file to document
+        budget: Byte budget of one part
+
+    Returns:
+        The files of each part
+    """
+    parts: List[List[Path]] = []
+    current: List[Path] = []
+    used = _HEADER_OVERHEAD
+    for file_path, size in files:
+        estimate = size + _SECTION_OVERHEAD + len(file_path.relative_to(repo_path).as_posix())
+        if file_path.name.lower() == "readme.md":
+            estimate += size  # the README is shown in the header as well
+        if current and used + estimate > budget:
+            parts.append(current)
+            current = []
+            used = _HEADER_OVERHEAD
+        current.append(file_path)
+        used += estimate
+    if current or not parts:
+        parts.append(current)
+    return parts
+
+class ShardedGenerator:
+    """
+    Writes the output as numbered parts that each fit a size budget.
+
+    Every part is a complete document of the configured format covering
+    its own files, with a tree and statistics of those files. Parts are
+    planned from file sizes up front and written concurrently. An index
+    next to the output maps every documented file to its part.
+    """
+
+    def __init__(self, config, walker: FileSystemWalker, formatter: BaseFormatter):
+        self.config = config
+        self.walker = walker
+        self.formatter = formatter
+        self.budget = part_budget(config.output)
+        self.parts: List[PartResult] = []
+
+    @property
+    def supported(self) -> bool:
+        """Whether the formatter's output can be streamed part by part."""
+        return self.formatter.section_layout is not None
+
+    def generate(
+        self,
+        repo_path: Path,
+        files: Iterable[Path],
+        stats_collector: StatsCollector,
+        branch: str = "unknown"
+    ) -> Dict:
+        """
+        Write the parts and the index for the given files.
+
+        Args:
+            repo_path: Repository root
+            files: Files to document, in output order
+            stats_collector: Collector the statistics of all parts are merged into
+            branch: Current branch name for the statistics
+
+        Returns:
+            The statistics of all parts
+        """
+        if self.budget is None:
+            raise ShardError("No part size or token budget is configured")
+        output_path = Path(self.config.output_file)
+
+        sized: List[Tuple[Path, int]] = []
+        for file_path in files:
+            size = self.walker.get_size(file_path)
+            if size is None:
+                try:
+                    size = os.stat(file_path).st_size
+                except OSError as e:
+                    logger.warning(f"Error accessing {file_path}: {e}")
+                    continue
+            sized.append((file_path, size))
+        plan = plan_parts(repo_path, sized, self.budget)
+        paths = [part_path(output_path, number, len(plan)) for number in range(1, len(plan) + 1)]
+        logger.info(f"Writing {len(plan)} parts of at most {self.budget} bytes")
+
+        workers = max(1, min(self.config.general.read_workers, len(plan)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='project2md-part') as executor:
+            futures = [
+                executor.submit(self._write_part, repo_path, part_files, path, branch)
+                for part_files, path in zip(plan, paths)
+            ]
+            self.parts = [future.result() for future in futures]
+
+        for part in self.parts:
+            stats_collector.merge(part.stats)
+            if part.size > self.budget:
+                logger.warning(
+                    f"{part.path.name} is {part.size} bytes, over the budget of {self.budget} bytes"
+                    + (" (a single file larger than the budget)" if len(part.files) == 1 else "")
+                )
+        stats = stats_collector.get_stats(branch, repo_path)
+
+        self._remove_stale_parts(output_path, paths)
+        self._save_index(output_path, stats)
+        return stats
+
+    def get_index_path(self) -> Path:
+        """Get the path of the index written by generate."""
+        return index_path(Path(self.config.output_file))
+
+    def _write_part(self, repo_path: Path, files: List[Path], path: Path, branch: str) -> PartResult:
+        """Read the files of one part and write it as a complete document."""
+        # Formatters cache the tree they render, so every part needs its own
+        formatter = type(self.formatter)(self.config)
+        formatter.tree_files = self.formatter.tree_files
+        formatter.token_counter = self.formatter.token_counter
+        collector = StatsCollector()
+        documented: List[str] = []
+
+        def part_files():
+            for file_path, content in self.walker.read_files(files):
+                if content is not None or not self.config.general.stats_in_output:
+                    collector.process_file(
+                        file_path, content, self.walker.get_size(file_path), self.walker.get_tokens(file_path)
+                    )
+                    if content is not None:
+                        documented.append(file_path.relative_to(repo_path).as_posix())
+                    yield file_path, content
+
+        formatter.write_stream(repo_path, part_files(), lambda: collector.get_stats(branch, repo_path), path)
+        return PartResult(path, os.stat(path).st_size, documented, collector)
+
+    def _remove_stale_parts(self, output_path: Path, paths: List[Path]) -> None:
+        """Delete parts listed by the previous index that this run did not write."""
+        try:
+            with open(index_path(output_path), encoding='utf-8') as f:
+                previous = [part['file'] for part in json.load(f).get('parts', [])]
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring previous index {index_path(output_path)}: {e}")
+            return
+        current = {path.name for path in paths}
+        for name in previous:
+            if name in current or Path(name).name != name:
+                continue
+            try:
+                (output_path.parent / name).unlink()
+                logger.debug(f"Removed stale part {name}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to remove stale part {name}: {e}")
+
+    def _save_index(self, output_path: Path, stats: Dict) -> None:
+        """Write the index mapping every documented file to its part."""
+        data = {
+            "version": INDEX_VERSION,
+            "format": self.config.output.format.value,
+            "budget_bytes": self.budget,
+            "parts": [
+                {"file": part.path.name, "size": part.size, "files": len(part.files)}
+                for part in self.parts
+            ],
+            "files": {
+                rel_path: part.path.name
+                for part in self.parts
+                for rel_path in part.files
+            },
+            "statistics": stats,
+        }
+        path = index_path(output_path)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8', errors=ENCODING_ERRORS) as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
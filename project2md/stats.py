@@ -17,28 +17,57 @@ class StatsCollector:
         self._total_size = 0
         self._file_types = Counter()
         self._languages = Counter()
+        self._total_tokens = 0
+        self._language_tokens = Counter()
         self._processed_paths: Set[Path] = set()
         
         # Track largest files
         self._largest_files: Dict[Path, int] = {}
         self._max_largest_files = 5
+        self._most_tokens: Dict[Path, int] = {}
 
-    def process_file(self, file_path: Path, content: Optional[str]) -> None:
+    def process_file(
+        self,
+        file_path: Path,
+        content: Optional[str],
+        size: Optional[int] = None,
+        tokens: Optional[int] = None
+    ) -> None:
         """
         Process a file and update statistics.
         
         Args:
             file_path: Path to the file
             content: File content if text file, None if binary
+            size: File size in bytes if already known (avoids a stat call)
+            tokens: Estimated token count of the content, if known
+        """
+        if file_path in self._processed_paths:
+            return
+
+        # Get file size
+        if size is None:
+            size = file_path.stat().st_size
+        self.process_entry(file_path, size, content is not None, tokens)
+
+    def process_entry(self, file_path: Path, size: int, is_text: bool, tokens: Optional[int] = None) -> None:
+        """
+        Update statistics from what is already known about a file.
+
+        Everything collected only depends on the path, the size and whether
+        the file is text, so files need not be read again to be counted.
+
+        Args:
+            file_path: Path to the file
+            size: File size in bytes
+            is_text: Whether the file was read as text
+            tokens: Estimated token count of the content, if known
         """
         if file_path in self._processed_paths:
             return
             
         self._processed_paths.add(file_path)
         self._total_files += 1
-        
-        # Get file size
-        size = file_path.stat().st_size
         self._total_size += size
         
         # Track largest files
@@ -49,18 +78,22 @@ class StatsCollector:
         self._file_types[extension] += 1
         
         # Determine if text or binary
-        if content is not None:
+        if is_text:
             self._text_files += 1
-            self._update_language_stats(file_path, content)
+            self._update_language_stats(file_path)
+            if tokens is not None:
+                self._update_token_stats(file_path, tokens)
         else:
             self._binary_files += 1
 
-    def get_stats(self, branch: str = "unknown") -> Dict:
+    def get_stats(self, branch: str = "unknown", repo_path: Optional[Path] = None) -> Dict:
         """
         Get collected statistics.
         
         Args:
             branch: Current git branch name
+            repo_path: Repository root; when given, most_tokens is keyed by
+                POSIX paths relative to it
             
         Returns:
             Dictionary containing all collected statistics
@@ -80,6 +113,12 @@ class StatsCollector:
                     key=lambda x: x[1],
                     reverse=True
                 )
+            },
+            "total_tokens": self._total_tokens,
+            "tokens_by_language": dict(self._language_tokens.most_common()),
+            "most_tokens": {
+                path.relative_to(repo_path).as_posix() if repo_path is not None else str(path): tokens
+                for path, tokens in sorted(self._most_tokens.items(), key=lambda x: x[1], reverse=True)
             }
         }
         
@@ -108,8 +147,27 @@ class StatsCollector:
             smallest = min(self._largest_files.items(), key=lambda x: x[1])[0]
             del self._largest_files[smallest]
 
-    def _update_language_stats(self, file_path: Path, content: str) -> None:
-        """Update programming language statistics based on file content."""
+    def _update_token_stats(self, file_path: Path, tokens: int) -> None:
+        """Update token totals and the files with the most tokens."""
+        self._total_tokens += tokens
+        self._language_tokens[self._get_language(file_path) or 'Other'] += tokens
+        self._update_most_tokens(file_path, tokens)
+
+    def _update_most_tokens(self, file_path: Path, tokens: int) -> None:
+        """Update tracking of the files with the most tokens."""
+        self._most_tokens[file_path] = tokens
+        if len(self._most_tokens) > self._max_largest_files:
+            del self._most_tokens[min(self._most_tokens.items(), key=lambda x: x[1])[0]]
+
+    def _update_language_stats(self, file_path: Path) -> None:
+        """Update programming language statistics based on the file extension."""
+        language = self._get_language(file_path)
+        if language is not None:
+            self._languages[language] += 1
+
+    @staticmethod
+    def _get_language(file_path: Path) -> Optional[str]:
+        """Get the language of a file from its extension, or None if unknown."""
         extension = file_path.suffix.lower()
         
         # Map extensions to languages
@@ -135,22 +193,22 @@ class StatsCollector:
         }
         
         if extension in language_map:
-            self._languages[language_map[extension]] += 1
-            return
+            return language_map[extension]
             
         # Special cases
         if extension == '.md':
-            self._languages['Markdown'] += 1
+            return 'Markdown'
         elif extension == '.json':
-            self._languages['JSON'] += 1
+            return 'JSON'
         elif extension == '.xml':
-            self._languages['XML'] += 1
+            return 'XML'
         elif extension == '.yml' or extension == '.yaml':
-            self._languages['YAML'] += 1
+            return 'YAML'
         elif extension == '.html':
-            self._languages['HTML'] += 1
+            return 'HTML'
         elif extension == '.css':
-            self._languages['CSS'] += 1
+            return 'CSS'
+        return None
 
     def merge(self, other: 'StatsCollector') -> None:
         """Merge statistics from another collector."""
@@ -160,8 +218,12 @@ class StatsCollector:
         self._total_size += other._total_size
         self._file_types.update(other._file_types)
         self._languages.update(other._languages)
+        self._total_tokens += other._total_tokens
+        self._language_tokens.update(other._language_tokens)
         self._processed_paths.update(other._processed_paths)
         
         # Merge largest files
         for path, size in other._largest_files.items():
-            self._update_largest_files(path, size)
\ No newline at end of file
+            self._update_largest_files(path, size)
+        for path, tokens in other._most_tokens.items():
+            self._update_most_tokens(path, tokens)
\ No newline at end of file
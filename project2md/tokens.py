@@ -0,0 +1,134 @@
+# project2md/tokens.py
+from abc import ABC, abstractmethod
+from typing import Callable, Dict
+import logging
+import re
+import string
+
+logger = logging.getLogger(__name__)
+
+# Byte classes of the approximate estimator: word characters, punctuation,
+# line breaks, non-ASCII bytes and everything else. Underscores count as
+# punctuation because tokenizers usually split identifiers at them.
+_WORD_BYTES = frozenset((string.ascii_letters + string.digits).encode('ascii'))
+_PUNCT_BYTES = frozenset(string.punctuation.encode('ascii'))
+
+def _byte_class(b: int) -> int:
+    if b in _WORD_BYTES:
+        return ord('a')
+    if b in _PUNCT_BYTES:
+        return ord('p')
+    if b == ord('\n'):
+        return ord('n')
+    if b >= 128:
+        return ord('h')
+    return ord(' ')
+
+_CLASS_TABLE = bytes(_byte_class(b) for b in range(256))
+# Maps word class bytes to b'a' and all others to b' ', so word starts are b' a'
+_WORD_TABLE = bytes(ord('a') if b == ord('a') else ord(' ') for b in range(256))
+
+# Words up to this many bytes are a single token ...
+_BYTES_PER_SHORT_WORD = 6
+# ... longer ones cost one more token for every this many bytes beyond that
+_BYTES_PER_WORD_TOKEN = 4
+# UTF-8 bytes per token of non-ASCII text (CJK characters are three bytes)
+_BYTES_PER_HIGH_TOKEN = 3
+# Words long enough to cost more than one token
+_LONG_WORD = re.compile(rb'[A-Za-z0-9]{%d,}' % (_BYTES_PER_SHORT_WORD + _BYTES_PER_WORD_TOKEN))
+
+class TokenizerError(Exception):
+    """Custom exception for tokenizer errors."""
+    pass
+
+class Tokenizer(ABC):
+    """Counts the tokens a language model sees for a text."""
+
+    # Stored with cached counts, which are only reused for the same name
+    name: str = ""
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Count the tokens of a text."""
+        pass
+
+class ApproximateTokenizer(Tokenizer):
+    """
+    Estimates token counts from byte classes, without a vocabulary.
+
+    Bytes are mapped to classes with one bytes.translate call and the
+    classes are tallied with bytes.count, so no Python code runs per
+    character; only words long enough to cost extra tokens are visited,
+    found with a regular expression. Each word costs one token, plus one
+    for every four bytes beyond its sixth; punctuation, line breaks and
+    every three bytes of non-ASCII text cost one token each. Spaces are
+    assumed to merge with the following word. The result is an estimate,
+    not the count of any particular model's tokenizer.
+    """
+
+    name = "approximate"
+
+    def count(self, text: str) -> int:
+        """Estimate the tokens of a text."""
+        return estimate_tokens(text.encode('utf-8', 'replace'))
+
+class TiktokenTokenizer(Tokenizer):
+    """Exact counts from a tiktoken encoding; needs the optional tiktoken package."""
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        try:
+            import tiktoken
+        except ImportError:
+            raise TokenizerError("The tiktoken tokenizer needs the tiktoken package (pip install tiktoken)")
+        try:
+            self._encoding = tiktoken.get_encoding(encoding)
+        except Exception as e:
+            raise TokenizerError(f"Failed to load tiktoken encoding {encoding}: {e}")
+        self.name = f"tiktoken:{encoding}"
+
+    def count(self, text: str) -> int:
+        """Count the tokens of a text."""
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+def estimate_tokens(data: bytes) -> int:
+    """Estimate the tokens of UTF-8 encoded text from its byte classes."""
+    if not data:
+        return 0
+    classes = data.translate(_CLASS_TABLE)
+    words_only = classes.translate(_WORD_TABLE)
+    words = words_only.count(b' a') + (words_only[:1] == b'a')
+    long_word_tokens = sum(
+        (len(word) - _BYTES_PER_SHORT_WORD) // _BYTES_PER_WORD_TOKEN for word in _LONG_WORD.findall(data)
+    )
+    return (
+        words
+        + long_word_tokens
+        + classes.count(b'p')
+        + classes.count(b'n')
+        + -(-classes.count(b'h') // _BYTES_PER_HIGH_TOKEN)
+    )
+
+_TOKENIZERS: Dict[str, Callable[[], Tokenizer]] = {
+    "approximate": ApproximateTokenizer,
+    "tiktoken": TiktokenTokenizer,
+}
+
+def register_tokenizer(name: str, factory: Callable[[], Tokenizer]) -> None:
+    """Make a tokenizer available under a name for output.tokenizer."""
+    _TOKENIZERS[name] = factory
+
+def get_tokenizer(name: str) -> Tokenizer:
+    """
+    Create the tokenizer configured by name.
+
+    Args:
+        name: A registered name, or "tiktoken:<encoding>" for a tiktoken encoding
+
+    Returns:
+        The tokenizer
+    """
+    base, _, argument = name.partition(':')
+    factory = _TOKENIZERS.get(base)
+    if factory is None:
+        raise TokenizerError(f"Unknown tokenizer: {name} (available: {', '.join(sorted(_TOKENIZERS))})")
+    return factory(argument) if argument else factory()
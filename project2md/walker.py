@@ -1,14 +1,62 @@
 # project2md/walker.py
 from pathlib import Path
-from typing import List, Set, Optional, Dict
+from typing import List, Optional, Dict, Iterable, Iterator, Tuple
+from operator import attrgetter
+import codecs
 import logging
+import os
+import re
+import stat
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from rich.progress import Progress
-import chardet
-import fnmatch
-import pathspec
+
+from .blobs import BlobReader
+from .cache import CacheEntry, ContentCache
+from .encoding import EncodingDetector
+from .git import TrackedFile
+from .matcher import PathMatcher
+from .tokens import get_tokenizer
 
 logger = logging.getLogger(__name__)
 
+_BINARY_SIGNATURES = (
+    b'\xff\xd8\xff',  # JPEG
+    b'\x89PNG\r\n\x1a\n',  # PNG
+    b'GIF87a',  # GIF
+    b'GIF89a',  # GIF
+    b'%PDF',  # PDF
+    b'PK\x03\x04',  # ZIP
+    b'\x7fELF',  # ELF
+)
+
+_TEXT_BOMS = (
+    codecs.BOM_UTF8,
+    codecs.BOM_UTF32_LE,
+    codecs.BOM_UTF32_BE,
+    codecs.BOM_UTF16_LE,
+    codecs.BOM_UTF16_BE,
+)
+
+# C0 controls that do not occur in text (everything but \b \t \n \f \r ESC) and DEL
+_CONTROL_BYTES = bytes(b for b in range(32) if b not in (8, 9, 10, 12, 13, 27)) + b'\x7f'
+_HIGH_BYTES = bytes(range(128, 256))
+
+
+def _is_utf8(chunk: bytes) -> bool:
+    """Check if a block is valid UTF-8, allowing a sequence cut off at the end."""
+    try:
+        chunk.decode('utf-8')
+        return True
+    except UnicodeDecodeError as e:
+        return e.reason == 'unexpected end of data' and e.start >= len(chunk) - 3
+
+
+# Compiled .gitignore specs from the root down, keyed by their directory prefix
+IgnoreSpecs = Tuple[Tuple[str, PathMatcher], ...]
+
+
 class WalkerError(Exception):
     """Custom exception for file system walker errors."""
     pass
@@ -24,17 +72,61 @@ class FileSystemWalker:
         '.ear', '.class', '.mo', '.pkl', '.pyd'
     }
 
-    def __init__(self, config, progress: Progress):
+    # Size of the leading block used to classify text vs binary content
+    SNIFF_SIZE = 8192
+
+    def __init__(self, config, progress: Progress, cache: Optional[ContentCache] = None):
         self.config = config
         self.progress = progress
-        self._gitignore_spec = None
+        self._cache = cache
+        self._root_path: Optional[Path] = None
         self._include_spec = None
         self._exclude_spec = None
+        self._prune_enabled = True
+        self._output_spec: Optional[re.Pattern] = None
+        self.pruned_dirs = 0
+        self.excluded_files = 0
+        self._file_stats: Dict[Path, os.stat_result] = {}
+        self._tracked_files: Dict[Path, TrackedFile] = {}
+        self._blob_reader: Optional[BlobReader] = None
+        self._encoding_detector = EncodingDetector(config.general.encoding_sample_bytes)
+        self._tokenizer = get_tokenizer(config.output.tokenizer)
+        self._token_counts: Dict[Path, int] = {}
+        self._io_counts = Counter()
+        self._io_lock = threading.Lock()
 
-    def collect_files(self, root_path: Path) -> List[Path]:
+    def collect_files(
+        self,
+        root_path: Path,
+        tracked_files: Optional[Iterable[TrackedFile]] = None,
+        blob_reader: Optional[BlobReader] = None
+    ) -> List[Path]:
         """
         Walk through the repository and collect files based on configuration.
         """
+        return list(self.iter_files(root_path, tracked_files, blob_reader))
+
+    def iter_files(
+        self,
+        root_path: Path,
+        tracked_files: Optional[Iterable[TrackedFile]] = None,
+        blob_reader: Optional[BlobReader] = None
+    ) -> Iterator[Path]:
+        """
+        Walk through the repository and yield files as they are found.
+
+        Each directory is sorted as it is listed, so files come out in the
+        same order as sorting the full list, without building it first.
+
+        Args:
+            root_path: Directory to process
+            tracked_files: Entries from the git index. When given, they are
+                used as the file list instead of walking the working tree.
+            blob_reader: Reader for the repository's objects. When given,
+                tracked_files are the entries of a commit tree and their
+                blobs are read instead of files; the paths below root_path
+                need not exist on disk.
+        """
         try:
             root_path = Path(root_path).resolve()
             
@@ -50,21 +142,48 @@ class FileSystemWalker:
 
             # Initialize pattern matching
             self._setup_patterns(root_path)
+            self._root_path = root_path
+            self.pruned_dirs = 0
+            self.excluded_files = 0
+            self._file_stats = {}
+            self._tracked_files = {}
+            self._blob_reader = blob_reader if tracked_files is not None else None
             
             # Debug log patterns
             logger.debug(f"Include patterns: {self.config.include.files + self.config.include.dirs}")
             logger.debug(f"Exclude patterns: {self.config.exclude.files + self.config.exclude.dirs}")
             
-            files = []
-            for path in self._collect_files_recursive(root_path):
-                if self._should_process_path(path, root_path):
+            if tracked_files is None:
+                candidates = self._scan_tree(root_path)
+            else:
+                candidates = self._scan_index(root_path, tracked_files)
+
+            collected = 0
+            for path, rel_path, entry in candidates:
+                if self._output_spec is not None and self._output_spec.fullmatch(path.as_posix()):
+                    logger.debug(f"Excluding output file: {path}")
+                    self.excluded_files += 1
+                    continue
+                if self._matches_patterns(rel_path):
                     logger.debug(f"Including file: {path}")
-                    files.append(path)
+                    if tracked_files is None:
+                        try:
+                            self._file_stats[path] = entry.stat()
+                        except OSError as e:
+                            logger.warning(f"Error accessing {path}: {e}")
+                            continue
+                    else:
+                        self._tracked_files[path] = entry
+                    collected += 1
+                    yield path
                 else:
                     logger.debug(f"Excluding file: {path}")
+                    self.excluded_files += 1
             
-            logger.info(f"Collected {len(files)} files to process")
-            return sorted(files)
+            logger.info(
+                f"Collected {collected} files to process "
+                f"({self.pruned_dirs} directories pruned, {self.excluded_files} files excluded)"
+            )
             
         except FileNotFoundError as e:
             raise WalkerError(f"Error collecting files: {str(e)}")
@@ -73,30 +192,203 @@ class FileSystemWalker:
         except Exception as e:
             raise WalkerError(f"Error collecting files: Unexpected error - {str(e)}")
 
-    def _collect_files_recursive(self, current_path: Path, depth: int = 0) -> List[Path]:
-        """Recursively collect all files from directory."""
-        if depth > self.config.general.max_depth:
-            return []
+    def exclude_outputs(self, patterns: Iterable[str]) -> None:
+        """
+        Skip files written by this run, wherever the output was placed.
+
+        Args:
+            patterns: Regular expressions matched against the whole
+                absolute POSIX path of each file
+        """
+        patterns = list(patterns)
+        self._output_spec = re.compile('|'.join(f'(?:{p})' for p in patterns)) if patterns else None
+
+    def get_walk_stats(self) -> Dict[str, int]:
+        """Get counters describing the last traversal."""
+        return {
+            "pruned_dirs": self.pruned_dirs,
+            "excluded_files": self.excluded_files,
+        }
+
+    def get_cache_stats(self) -> Optional[Dict[str, float]]:
+        """Get content cache hit statistics, or None if no cache is in use."""
+        return self._cache.get_stats() if self._cache is not None else None
+
+    def get_stat(self, file_path: Path) -> Optional[os.stat_result]:
+        """Get the stat result recorded for a file during traversal, if any."""
+        return self._file_stats.get(file_path)
+
+    def get_tokens(self, file_path: Path) -> Optional[int]:
+        """Get the token count of a file read as text, if it has been read."""
+        return self._token_counts.get(file_path)
+
+    def get_size(self, file_path: Path) -> Optional[int]:
+        """Get the size recorded for a file during traversal, if any."""
+        file_stat = self._file_stats.get(file_path)
+        if file_stat is not None:
+            return file_stat.st_size
+        tracked = self._tracked_files.get(file_path)
+        # Entries written without stat data (e.g. by GitPython) have no size,
+        # tree entries always carry the blob size
+        if tracked is not None and (tracked.mtime_ns or self._blob_reader is not None):
+            return tracked.size
+        return None
+
+    def _scan_index(
+        self,
+        root_path: Path,
+        tracked_files: Iterable[TrackedFile]
+    ) -> Iterator[Tuple[Path, str, TrackedFile]]:
+        """
+        Enumerate files from git index entries instead of the working tree.
+
+        Entries are sorted by path components to match the order of the
+        filesystem walk. Depth limits and directory pruning are applied to
+        each entry's parent directories, and every directory is checked once.
+
+        Yields:
+            Tuples of (absolute path, POSIX path relative to root, index entry)
+        """
+        max_depth = self.config.general.max_depth
+        pruned: Dict[str, bool] = {}
+
+        def is_pruned(rel_dir: str) -> bool:
+            if rel_dir not in pruned:
+                parent, _, name = rel_dir.rpartition('/')
+                if parent and is_pruned(parent):
+                    pruned[rel_dir] = True
+                else:
+                    pruned[rel_dir] = self._should_prune_dir(rel_dir, name)
+                    if pruned[rel_dir]:
+                        logger.debug(f"Pruning directory: {rel_dir}")
+                        self.pruned_dirs += 1
+            return pruned[rel_dir]
+
+        for entry in sorted(tracked_files, key=lambda e: e.path.split('/')):
+            if entry.skip_worktree:
+                continue
+            rel_dir = entry.path.rpartition('/')[0]
+            if rel_dir and (rel_dir.count('/') >= max_depth or is_pruned(rel_dir)):
+                continue
+            yield root_path.joinpath(entry.path), entry.path, entry
+
+    def _scan_tree(self, root_path: Path) -> Iterator[Tuple[Path, str, os.DirEntry]]:
+        """
+        Walk the tree with os.scandir using an explicit stack.
+
+        Entries are visited depth-first in name order. File and directory
+        checks use the type information cached on each DirEntry, so listing
+        a directory costs a single scandir call and no per-entry stat.
+
+        Each directory's .gitignore is compiled once when the directory is
+        listed and stacked on top of its parents' specs. Ignored directories
+        are pruned before they are listed.
+
+        Yields:
+            Tuples of (absolute path, POSIX path relative to root, DirEntry)
+        """
+        max_depth = self.config.general.max_depth
+        stack: List[Tuple[Iterator[os.DirEntry], str, int, IgnoreSpecs]] = []
+
+        entries = self._list_dir(str(root_path))
+        if entries is not None:
+            ignore_specs = self._push_gitignore(str(root_path), "", entries, ())
+            stack.append((iter(entries), "", 0, ignore_specs))
+
+        while stack:
+            entries, rel_prefix, depth, ignore_specs = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                stack.pop()
+                continue
+
+            rel_path = rel_prefix + entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if depth >= max_depth:
+                        continue
+                    if (self._should_prune_dir(rel_path, entry.name)
+                            or self._is_gitignored(rel_path + "/", ignore_specs)):
+                        logger.debug(f"Pruning directory: {entry.path}")
+                        self.pruned_dirs += 1
+                        continue
+                    children = self._list_dir(entry.path)
+                    if children is not None:
+                        child_prefix = rel_path + "/"
+                        child_specs = self._push_gitignore(entry.path, child_prefix, children, ignore_specs)
+                        stack.append((iter(children), child_prefix, depth + 1, child_specs))
+                elif entry.is_file():
+                    if self._is_gitignored(rel_path, ignore_specs):
+                        logger.debug(f"Ignoring file: {entry.path}")
+                        self.excluded_files += 1
+                        continue
+                    yield Path(entry.path), rel_path, entry
+            except OSError as e:
+                logger.warning(f"Error accessing {entry.path}: {e}")
+
+    @staticmethod
+    def _push_gitignore(
+        dir_path: str,
+        rel_prefix: str,
+        entries: List[os.DirEntry],
+        parent_specs: IgnoreSpecs
+    ) -> IgnoreSpecs:
+        """Stack the directory's .gitignore, if it has one, on its parents' specs."""
+        for entry in entries:
+            if entry.name == '.gitignore':
+                break
+        else:
+            return parent_specs
 
-        files = []
         try:
-            for item in current_path.iterdir():
-                if item.is_file():
-                    files.append(item)
-                elif item.is_dir() and not item.is_symlink():
-                    files.extend(self._collect_files_recursive(item, depth + 1))
-            return files
+            with open(os.path.join(dir_path, '.gitignore'), encoding='utf-8', errors='replace') as f:
+                spec = PathMatcher(f.read().splitlines())
         except Exception as e:
-            logger.warning(f"Error accessing {current_path}: {e}")
-            return files
+            logger.warning(f"Error reading {dir_path}/.gitignore: {e}")
+            return parent_specs
+        if not spec.pattern_count:
+            return parent_specs
+        return parent_specs + ((rel_prefix, spec),)
+
+    @staticmethod
+    def _is_gitignored(rel_path: str, ignore_specs: IgnoreSpecs) -> bool:
+        """
+        Check a path against stacked .gitignore specs.
+
+        As in git, the deepest .gitignore with a matching pattern decides,
+        and within a file the last matching pattern wins, so negations work.
+        Directory paths must end with a slash.
+        """
+        for rel_prefix, spec in reversed(ignore_specs):
+            sub_path = rel_path[len(rel_prefix):]
+            ignored = spec.check(sub_path)
+            if ignored is not None:
+                return ignored
+        return False
+
+    @staticmethod
+    def _list_dir(dir_path: str) -> Optional[List[os.DirEntry]]:
+        """List a directory with a single scandir call, sorted by name."""
+        try:
+            with os.scandir(dir_path) as it:
+                return sorted(it, key=attrgetter('name'))
+        except Exception as e:
+            logger.warning(f"Error accessing {dir_path}: {e}")
+            return None
 
     def _should_process_path(self, path: Path, root_path: Path) -> bool:
         """Determine if a path should be processed based on patterns and rules."""
         try:
-            rel_path = str(path.relative_to(root_path))
-            
+            return self._matches_patterns(path.relative_to(root_path).as_posix())
+        except Exception as e:
+            logger.error(f"Error checking path {path}: {e}")
+            return False
+
+    def _matches_patterns(self, rel_path: str) -> bool:
+        """Check a root-relative POSIX path against the include/exclude rules."""
+        try:
             # Always exclude .git directory
-            if '.git' in path.parts:
+            if '.git' in rel_path.split('/'):
                 return False
 
             # Check if path matches exclude patterns
@@ -110,94 +402,421 @@ class FileSystemWalker:
             return True
             
         except Exception as e:
-            logger.error(f"Error checking path {path}: {e}")
+            logger.error(f"Error checking path {rel_path}: {e}")
+            return False
+
+    def _should_prune_dir(self, rel_path: str, name: str) -> bool:
+        """Determine if a directory can be skipped without listing its contents."""
+        if name == '.git':
+            return True
+        if not self._prune_enabled or not self._exclude_spec:
+            return False
+        try:
+            return bool(self._exclude_spec.match_file(rel_path + '/'))
+        except Exception as e:
+            logger.error(f"Error checking directory {rel_path}: {e}")
             return False
 
     @staticmethod
     def _is_binary(chunk: bytes) -> bool:
-        """Detect if content appears to be binary."""
+        """
+        Detect if content appears to be binary.
+
+        All byte-class counting uses bytes.translate, so the cost per block
+        stays in C. High bytes only count as suspicious if the block is not
+        valid UTF-8; a multibyte sequence cut off at the end of the block
+        is still accepted.
+        """
+        if not chunk:
+            return False
+
+        # UTF-16/32 text contains null bytes but announces itself with a BOM
+        if chunk.startswith(_TEXT_BOMS):
+            return False
+
         # First check for null bytes
         if b'\x00' in chunk:
             return True
 
         # Then check other binary signatures
-        signatures = [
-            b'\xff\xd8\xff',  # JPEG
-            b'\x89PNG\r\n\x1a\n',  # PNG
-            b'GIF89a',  # GIF
-            b'BM',  # BMP
-            b'%PDF',  # PDF
-            b'PK\x03\x04',  # ZIP
-        ]
-        
-        if any(chunk.startswith(sig) for sig in signatures):
+        if chunk.startswith(_BINARY_SIGNATURES):
             return True
 
-        # Count control characters and high ASCII
-        control_chars = sum(1 for byte in chunk if byte < 32 and byte not in [9, 10, 13])  # tab, LF, CR
-        high_chars = sum(1 for byte in chunk if byte > 127)
-        
-        # If more than 30% non-printable characters, consider it binary
+        # Count control characters; text practically never contains them
         size = len(chunk)
-        if size == 0:
+        control_chars = size - len(chunk.translate(None, _CONTROL_BYTES))
+        if not control_chars:
             return False
-            
+        if control_chars / size > 0.1:
+            return True
+
+        # High bytes add to the evidence unless the block is valid UTF-8.
+        # Legacy encodings (Latin-1, Shift-JIS, ...) are mostly high bytes
+        # but free of control characters, so they never get this far.
+        high_chars = 0
+        if not chunk.isascii() and not _is_utf8(chunk):
+            high_chars = size - len(chunk.translate(None, _HIGH_BYTES))
+
+        # If more than 30% non-printable characters, consider it binary
         return (control_chars + high_chars) / size > 0.3
 
     def _setup_patterns(self, root_path: Path) -> None:
-        """Set up pattern matching for includes/excludes and gitignore."""
-        # Set up gitignore patterns
-        gitignore_path = root_path / '.gitignore'
-        if gitignore_path.exists():
-            with open(gitignore_path) as f:
-                self._gitignore_spec = pathspec.PathSpec.from_lines('gitwildmatch', f)
-        
+        """Set up pattern matching for includes/excludes."""
         # Set up include/exclude patterns
         if self.config.include.files or self.config.include.dirs:
-            self._include_spec = pathspec.PathSpec.from_lines('gitwildmatch', 
+            self._include_spec = PathMatcher(
                 self.config.include.files + self.config.include.dirs)
         
         if self.config.exclude.files or self.config.exclude.dirs:
-            self._exclude_spec = pathspec.PathSpec.from_lines('gitwildmatch', 
+            self._exclude_spec = PathMatcher(
                 self.config.exclude.files + self.config.exclude.dirs)
+            # A negated pattern may re-include files below an excluded
+            # directory, so only prune when every pattern is an exclusion.
+            self._prune_enabled = not self._exclude_spec.has_negations
 
     def read_file(self, file_path: Path) -> Optional[str]:
         """Read and return file content if it's a text file."""
         try:
-            if not self._should_read_file(file_path):
+            if file_path.suffix.lower() in self.BINARY_EXTENSIONS:
                 return None
 
-            # Check file size before reading
-            if file_path.stat().st_size > self.config.general.max_file_size_bytes:
-                logger.warning(f"Skipping {file_path}: exceeds size limit")
+            if self._blob_reader is not None:
+                tracked = self._tracked_files.get(file_path)
+                if tracked is not None:
+                    return self._read_blob(file_path, tracked)
+
+            # Skip empty and oversized files using the stat from traversal
+            file_stat = self._file_stats.get(file_path)
+            if file_stat is not None and not self._is_readable_size(file_path, file_stat.st_size):
                 return None
 
-            # Try reading as text
-            try:
-                return file_path.read_text(encoding='utf-8')
-            except UnicodeDecodeError:
-                # Fall back to detection
-                content = file_path.read_bytes()
-                detection = chardet.detect(content)
-                if detection['confidence'] >= 0.7:
-                    try:
-                        return content.decode(detection['encoding'])
-                    except UnicodeDecodeError:
-                        pass
-            return None
+            cache_key = None
+            if self._cache is not None:
+                if file_stat is None:
+                    file_stat = os.stat(file_path)
+                    self._count_io('stat')
+                    if not self._is_readable_size(file_path, file_stat.st_size):
+                        return None
+                cache_key = self._cache_key(file_path, file_stat)
+                if cache_key is not None:
+                    entry = self._cache_get(cache_key, file_stat)
+                    if entry is not None:
+                        counted = self._count_tokens(entry)
+                        if counted is not entry:
+                            self._cache_put(cache_key, file_stat, file_stat, counted)
+                        return self._use_entry(file_path, counted)
+
+            data, read_stat, is_binary = self._read_bytes(file_path)
+            if data is None:
+                if is_binary and cache_key is not None:
+                    self._cache_put(cache_key, file_stat, read_stat, CacheEntry(None, None, True))
+                return None
+            text, encoding = self._decode_content(data, file_path)
+            entry = self._count_tokens(CacheEntry(text, encoding, False))
+            if cache_key is not None:
+                self._cache_put(cache_key, file_stat, read_stat, entry)
+            return self._use_entry(file_path, entry)
                 
         except Exception as e:
             logger.warning(f"Error reading {file_path}: {e}")
             return None
 
-    def _should_read_file(self, path: Path) -> bool:
-        """Determine if a file should be read."""
+    def _read_blob(self, file_path: Path, tracked: TrackedFile) -> Optional[str]:
+        """Read a file of a commit tree from the object database."""
+        oid, entry = self._plan_blob_read(file_path, tracked)
+        if oid is None:
+            return self._use_blob_entry(file_path, tracked, entry) if entry is not None else None
+        data = self._blob_reader.read(oid)
+        if data is None:
+            logger.warning(f"Skipping {file_path}: blob {oid} not found")
+            return None
+        return self._decode_blob(file_path, tracked, data)
+
+    def _plan_blob_read(
+        self,
+        file_path: Path,
+        tracked: TrackedFile
+    ) -> Tuple[Optional[str], Optional[CacheEntry]]:
+        """
+        Decide how to get the content of a file of a commit tree.
+
+        Blob contents never change, so cache entries are keyed by blob id
+        without any stat check. Sizes come from the tree listing, so
+        oversized blobs are skipped before they are requested.
+
+        Returns:
+            (blob id to read, None), (None, cached entry), or (None, None)
+            if the file is skipped
+        """
+        # Symlinks are stored as blobs holding the target path
+        if not stat.S_ISREG(tracked.mode):
+            return None, None
+        if file_path.suffix.lower() in self.BINARY_EXTENSIONS:
+            return None, None
+        if not self._is_readable_size(file_path, tracked.size):
+            return None, None
+        if self._cache is not None:
+            entry = self._cache.get_blob(tracked.oid)
+            if entry is not None:
+                return None, entry
+        return tracked.oid, None
+
+    def _decode_blob(self, file_path: Path, tracked: TrackedFile, data: bytes) -> Optional[str]:
+        """Classify and decode the content of a blob, storing the result in the cache."""
+        self._count_io('blobs')
+        is_binary = self._is_binary(data[:self.SNIFF_SIZE])
+        if is_binary:
+            logger.debug(f"Skipping {file_path}: binary content")
+            self._count_io('binary')
+            text, encoding = None, None
+        else:
+            text, encoding = self._decode_content(data, file_path)
+        entry = self._count_tokens(CacheEntry(text, encoding, is_binary))
+        if self._cache is not None:
+            self._cache.put_blob(tracked.oid, len(data), entry)
+        return self._use_entry(file_path, entry)
+
+    def _use_blob_entry(self, file_path: Path, tracked: TrackedFile, entry: CacheEntry) -> Optional[str]:
+        """Use a cached blob entry, storing its token count if it had none yet."""
+        counted = self._count_tokens(entry)
+        if counted is not entry:
+            self._cache.put_blob(tracked.oid, tracked.size, counted)
+        return self._use_entry(file_path, counted)
+
+    def _count_tokens(self, entry: CacheEntry) -> CacheEntry:
+        """
+        Add the token count of an entry's text, unless it was counted before.
+
+        Returns:
+            The entry itself if it needs no counting, otherwise a counted copy
+        """
+        if entry.text is None or (entry.tokens is not None and entry.tokenizer == self._tokenizer.name):
+            return entry
+        return entry._replace(tokens=self._tokenizer.count(entry.text), tokenizer=self._tokenizer.name)
+
+    def _use_entry(self, file_path: Path, entry: CacheEntry) -> Optional[str]:
+        """Record the token count of a file read as text and return its text."""
+        if entry.tokens is not None:
+            self._token_counts[file_path] = entry.tokens
+        return entry.text
+
+    def _read_blob_files(self, files: Iterable[Path]) -> Iterator[Tuple[Path, Optional[str]]]:
+        """
+        Read files of a commit tree through one pipelined blob stream.
+
+        Cache lookups and skip decisions are made as requests are sent, so
+        only blobs that are actually needed are transferred. Contents are
+        decoded in order as they arrive.
+        """
+        def requests():
+            for file_path in files:
+                tracked = self._tracked_files[file_path]
+                oid, entry = self._plan_blob_read(file_path, tracked)
+                yield (file_path, tracked, entry), oid
+
+        for (file_path, tracked, entry), data in self._blob_reader.read_many(requests()):
+            if data is None:
+                yield file_path, self._use_blob_entry(file_path, tracked, entry) if entry is not None else None
+                continue
+            try:
+                yield file_path, self._decode_blob(file_path, tracked, data)
+            except Exception as e:
+                logger.warning(f"Error reading {file_path}: {e}")
+                yield file_path, None
+
+    def _cache_key(self, file_path: Path, file_stat: os.stat_result) -> Optional[Tuple[str, str]]:
+        """
+        Get the content cache key for a file.
+
+        Tracked files whose working tree copy is known to match the index
+        are keyed by blob id; other files by their path below the root.
+
+        Returns:
+            ('blob', oid), ('path', relative path), or None if not cacheable
+        """
+        tracked = self._tracked_files.get(file_path)
+        if tracked is not None and self._matches_index(tracked, file_stat):
+            return 'blob', tracked.oid
+        if self._root_path is None:
+            return None
         try:
-            return (
-                path.exists() and
-                path.is_file() and
-                path.suffix.lower() not in self.BINARY_EXTENSIONS and
-                path.stat().st_size > 0
-            )
-        except Exception:
-            return False
\ No newline at end of file
+            return 'path', file_path.relative_to(self._root_path).as_posix()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _matches_index(tracked: TrackedFile, file_stat: os.stat_result) -> bool:
+        """
+        Check whether a file is unchanged since it was added to the index.
+
+        Like git's own check, this compares the stat data recorded in the
+        index with the file, so modified files are found without reading
+        them. Racy entries and entries without stat data never match.
+        """
+        return (
+            stat.S_ISREG(tracked.mode)
+            and not tracked.racy
+            and not tracked.skip_worktree
+            and tracked.mtime_ns != 0
+            and tracked.size == file_stat.st_size
+            and tracked.mtime_ns == file_stat.st_mtime_ns
+            and tracked.ctime_ns == file_stat.st_ctime_ns
+            and tracked.ino == file_stat.st_ino
+        )
+
+    def _cache_get(self, cache_key: Tuple[str, str], file_stat: os.stat_result) -> Optional[CacheEntry]:
+        """Look up a file in the content cache."""
+        kind, key = cache_key
+        if kind == 'blob':
+            return self._cache.get_blob(key)
+        return self._cache.get(self._root_path, key, file_stat)
+
+    def _cache_put(
+        self,
+        cache_key: Tuple[str, str],
+        file_stat: os.stat_result,
+        read_stat: os.stat_result,
+        entry: CacheEntry
+    ) -> None:
+        """Store the result of reading a file in the content cache."""
+        kind, key = cache_key
+        if kind == 'blob':
+            # Only trust the blob id if the file did not change before it was opened
+            if ContentCache.identity(read_stat) == ContentCache.identity(file_stat):
+                self._cache.put_blob(key, read_stat.st_size, entry)
+        else:
+            self._cache.put(self._root_path, key, read_stat, entry)
+
+    def _read_bytes(self, file_path: Path) -> Tuple[Optional[bytes], Optional[os.stat_result], bool]:
+        """
+        Read a regular file with one open, one fstat and one bulk read.
+
+        Returns:
+            Tuple of (data, stat of the open file, binary verdict). data is
+            None if the file was skipped.
+        """
+        with open(file_path, 'rb', buffering=0) as f:
+            self._count_io('open')
+            self._count_io('files')
+            file_stat = os.fstat(f.fileno())
+            self._count_io('fstat')
+            if not stat.S_ISREG(file_stat.st_mode):
+                return None, file_stat, False
+            if not self._is_readable_size(file_path, file_stat.st_size):
+                return None, file_stat, False
+
+            # The first read is capped at SNIFF_SIZE so binary files are
+            # rejected after one small read. Small files are read whole by it.
+            # Ask for one byte more than expected so a file that grew since
+            # the fstat is still read completely in the common case.
+            chunks = []
+            received = 0
+            while True:
+                want = file_stat.st_size + 1 - received
+                chunk = f.read(min(want, self.SNIFF_SIZE) if not chunks else want)
+                self._count_io('read')
+                if not chunk:
+                    break
+                if not chunks and self._is_binary(chunk):
+                    logger.debug(f"Skipping {file_path}: binary content")
+                    self._count_io('binary')
+                    return None, file_stat, True
+                chunks.append(chunk)
+                received += len(chunk)
+                if received >= file_stat.st_size:
+                    break
+
+        data = b''.join(chunks)
+        if len(data) > self.config.general.max_file_size_bytes:
+            logger.warning(f"Skipping {file_path}: exceeds size limit")
+            return None, file_stat, False
+        return data, file_stat, False
+
+    def _is_readable_size(self, file_path: Path, size: int) -> bool:
+        """Check a file size against the empty-file and size-limit rules."""
+        if size == 0:
+            return False
+        if size > self.config.general.max_file_size_bytes:
+            logger.warning(f"Skipping {file_path}: exceeds size limit")
+            return False
+        return True
+
+    def _decode_content(
+        self,
+        data: bytes,
+        file_path: Optional[Path] = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Decode a file buffer, returning the text and the encoding used."""
+        text, encoding = self._encoding_detector.decode_with_encoding(data, file_path)
+        if text is None:
+            return None, None
+
+        # Match the universal newline handling of text-mode reads
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text, encoding
+
+    def _count_io(self, operation: str) -> None:
+        """Record a file I/O operation for get_io_stats."""
+        with self._io_lock:
+            self._io_counts[operation] += 1
+
+    def get_io_stats(self) -> Dict[str, float]:
+        """
+        Get the file I/O operations performed by read_file so far.
+
+        Returns:
+            Dictionary with the number of files and blobs read and rejected
+            as binary, the open/fstat/read calls issued, the stat calls made
+            for cache lookups and the average per file
+        """
+        with self._io_lock:
+            counts = dict(self._io_counts)
+        files = counts.get('files', 0)
+        syscalls = sum(counts.get(op, 0) for op in ('open', 'fstat', 'read'))
+        return {
+            "files_read": files,
+            "blobs_read": counts.get('blobs', 0),
+            "binary_skipped": counts.get('binary', 0),
+            "open": counts.get('open', 0),
+            "fstat": counts.get('fstat', 0),
+            "read": counts.get('read', 0),
+            "stat": counts.get('stat', 0),
+            "syscalls_per_file": round(syscalls / files, 2) if files else 0.0,
+        }
+
+    def read_files(
+        self,
+        files: Iterable[Path],
+        workers: int = 1,
+        max_in_flight: Optional[int] = None
+    ) -> Iterator[Tuple[Path, Optional[str]]]:
+        """
+        Read files concurrently and yield (path, content) in input order.
+
+        At most max_in_flight reads (default: twice the worker count) are
+        pending or waiting to be consumed at any time, which bounds the
+        number of decoded contents held in memory.
+
+        Files of a commit tree are instead streamed from the blob reader,
+        which keeps a single `git cat-file` process busy.
+        """
+        if self._blob_reader is not None:
+            yield from self._read_blob_files(files)
+            return
+        if workers <= 1:
+            for file_path in files:
+                yield file_path, self.read_file(file_path)
+            return
+
+        max_in_flight = max(max_in_flight or workers * 2, 1)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='project2md-read') as executor:
+            pending = deque()
+            for file_path in files:
+                pending.append((file_path, executor.submit(self.read_file, file_path)))
+                if len(pending) >= max_in_flight:
+                    path, future = pending.popleft()
+                    yield path, future.result()
+            while pending:
+                path, future = pending.popleft()
+                yield path, future.result()
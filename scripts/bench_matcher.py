@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark: PathSpec-based path filtering vs. the compiled PathMatcher.
+
+Runs the include/exclude check that FileSystemWalker._should_process_path
+performs on a set of synthetic paths, once with pathspec.PathSpec (the
+previous implementation) and once with project2md.matcher.PathMatcher.
+
+Usage (with project2md installed, e.g. pip install -e .):
+    python scripts/bench_matcher.py [number_of_paths]
+"""
+import random
+import sys
+import time
+import warnings
+
+import pathspec
+
+from project2md.config import DEFAULT_INCLUDE_PATTERNS, DEFAULT_EXCLUDE_PATTERNS
+from project2md.matcher import PathMatcher
+
+DIRS = ['src', 'lib', 'app', 'core', 'utils', 'tests', 'docs', 'node_modules', 'build', 'api']
+NAMES = ['main', 'index', 'utils', 'config', 'README', 'test_app', 'setup', 'server']
+EXTS = ['.py', '.js', '.ts', '.md', '.json', '.png', '.pyc', '.lock', '.txt', '.go', '.bin']
+
+def make_paths(count, seed=42):
+    rng = random.Random(seed)
+    return [
+        '/'.join(rng.choice(DIRS) for _ in range(rng.randint(0, 5)))
+        + '/' + rng.choice(NAMES) + rng.choice(EXTS)
+        for _ in range(count)
+    ]
+
+def should_process(rel_path, include, exclude):
+    if '.git' in rel_path.split('/'):
+        return False
+    if exclude.match_file(rel_path):
+        return False
+    return bool(include.match_file(rel_path))
+
+def bench(label, paths, include, exclude):
+    start = time.perf_counter()
+    selected = [p for p in paths if should_process(p, include, exclude)]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed * 1000:9.1f} ms  "
+          f"{elapsed / len(paths) * 1e6:7.2f} us/path  {len(selected)} selected")
+    return selected
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    include_patterns = DEFAULT_INCLUDE_PATTERNS['files'] + DEFAULT_INCLUDE_PATTERNS['dirs']
+    exclude_patterns = DEFAULT_EXCLUDE_PATTERNS['files'] + DEFAULT_EXCLUDE_PATTERNS['dirs']
+    paths = make_paths(count)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        old = bench('PathSpec', paths,
+                    pathspec.PathSpec.from_lines('gitwildmatch', include_patterns),
+                    pathspec.PathSpec.from_lines('gitwildmatch', exclude_patterns))
+        new = bench('PathMatcher', paths,
+                    PathMatcher(include_patterns), PathMatcher(exclude_patterns))
+
+    if old != new:
+        sys.exit("Results differ between PathSpec and PathMatcher")
+
+if __name__ == '__main__':
+    main()
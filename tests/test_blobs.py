@@ -0,0 +1,84 @@
+# tests/test_blobs.py
+import threading
+import pytest
+import git
+
+from project2md.blobs import BlobReader, BlobReaderError
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    for name, data in {"a.txt": b"alpha\n", "b.bin": b"\x00" * 5000, "c.txt": b"gamma"}.items():
+        (tmp_path / name).write_bytes(data)
+    repo.index.add(["a.txt", "b.bin", "c.txt"])
+    repo.index.commit("Initial commit")
+    return repo
+
+@pytest.fixture
+def reader(repo):
+    reader = BlobReader(repo.git_dir)
+    yield reader
+    reader.close()
+
+def _oid(repo, path):
+    return repo.git.rev_parse(f"HEAD:{path}")
+
+def test_read_single_blobs(repo, reader):
+    assert reader.read(_oid(repo, "a.txt")) == b"alpha\n"
+    assert reader.read(_oid(repo, "c.txt")) == b"gamma"
+    assert reader.read("0" * 40) is None
+    # Trees are not blobs
+    assert reader.read(repo.git.rev_parse("HEAD^{tree}")) is None
+
+def test_read_many_keeps_order_and_passes_through(repo, reader):
+    a, b, c = (_oid(repo, path) for path in ("a.txt", "b.bin", "c.txt"))
+    requests = [("a", a), ("skip", None), ("b", b), ("missing", "0" * 40), ("c", c)] * 200
+
+    results = list(reader.read_many(requests))
+
+    assert [key for key, _ in results] == [key for key, _ in requests]
+    assert results[:5] == [("a", b"alpha\n"), ("skip", None), ("b", b"\x00" * 5000), ("missing", None), ("c", b"gamma")]
+
+def test_read_many_skips_oversized_blobs(repo, reader):
+    requests = [(path, _oid(repo, path)) for path in ("a.txt", "b.bin", "c.txt")]
+
+    assert dict(reader.read_many(requests, max_size=1000)) == {"a.txt": b"alpha\n", "b.bin": None, "c.txt": b"gamma"}
+
+def test_get_sizes(repo, reader):
+    oids = [_oid(repo, "b.bin"), "0" * 40]
+
+    assert list(reader.get_sizes(oids)) == [(oids[0], 5000), ("0" * 40, None)]
+
+def test_read_many_stops_early(repo, reader):
+    stream = reader.read_many(("a", _oid(repo, "a.txt")) for _ in range(100000))
+
+    assert next(stream) == ("a", b"alpha\n")
+    stream.close()
+
+def test_read_many_answers_before_the_next_request(repo, reader):
+    answered = threading.Event()
+
+    def requests():
+        yield "a", _oid(repo, "a.txt")
+        # A request source that waits on the consumer must not stall the stream
+        assert answered.wait(timeout=5), "first blob was not answered"
+        yield "c", _oid(repo, "c.txt")
+
+    stream = reader.read_many(requests())
+    assert next(stream) == ("a", b"alpha\n")
+    answered.set()
+    assert list(stream) == [("c", b"gamma")]
+
+def test_errors_from_requests_are_raised(repo, reader):
+    def requests():
+        yield "a", _oid(repo, "a.txt")
+        raise ValueError("broken request source")
+
+    with pytest.raises(ValueError, match="broken request source"):
+        list(reader.read_many(requests()))
+
+def test_missing_repository(tmp_path):
+    reader = BlobReader(tmp_path / "missing.git")
+
+    with pytest.raises(BlobReaderError):
+        reader.read("0" * 40)
@@ -0,0 +1,262 @@
+# tests/test_cache.py
+import os
+import sqlite3
+import subprocess
+import pytest
+from unittest.mock import Mock, patch
+
+from project2md.cache import CacheEntry, ContentCache
+from project2md.config import Config
+from project2md.git import GitHandler
+from project2md.walker import FileSystemWalker
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ContentCache(tmp_path / "cache", max_size=1024 * 1024)
+    yield cache
+    cache.close()
+
+def test_entry_requires_matching_stat(cache, tmp_path):
+    test_file = tmp_path / "a.txt"
+    test_file.write_text("hello")
+    file_stat = os.stat(test_file)
+
+    cache.put(tmp_path, "a.txt", file_stat, CacheEntry("hello", "ascii", False))
+    assert cache.get(tmp_path, "a.txt", file_stat) == CacheEntry("hello", "ascii", False)
+    assert cache.get(tmp_path / "other", "a.txt", file_stat) is None
+
+    test_file.write_text("hello, world")
+    assert cache.get(tmp_path, "a.txt", os.stat(test_file)) is None
+    assert cache.get_stats() == {"hits": 1, "misses": 2, "hit_rate": 33.3}
+
+def test_entries_persist_across_instances(tmp_path):
+    test_file = tmp_path / "a.txt"
+    test_file.write_text("hello")
+    file_stat = os.stat(test_file)
+
+    cache = ContentCache(tmp_path / "cache", max_size=1024)
+    cache.put(tmp_path, "a.txt", file_stat, CacheEntry("hello", "ascii", False))
+    cache.close()
+
+    cache = ContentCache(tmp_path / "cache", max_size=1024)
+    assert cache.get(tmp_path, "a.txt", file_stat).text == "hello"
+    cache.close()
+
+def test_evicts_least_recently_used(tmp_path):
+    test_file = tmp_path / "four.txt"
+    test_file.write_text("four")
+    file_stat = os.stat(test_file)
+
+    cache = ContentCache(tmp_path / "cache", max_size=10)
+    with patch('project2md.cache.time.time', side_effect=[1.0, 2.0, 3.0, 4.0]):
+        cache.put(tmp_path, "old.txt", file_stat, CacheEntry("old!", "ascii", False))
+        cache.put(tmp_path, "mid.txt", file_stat, CacheEntry("mid!", "ascii", False))
+        cache.put(tmp_path, "new.txt", file_stat, CacheEntry("new!", "ascii", False))
+        # Using the oldest entry makes it the most recently used
+        assert cache.get(tmp_path, "old.txt", file_stat) is not None
+
+    assert cache.evict() == 1
+    assert cache.get(tmp_path, "mid.txt", file_stat) is None
+    assert cache.get(tmp_path, "old.txt", file_stat) is not None
+    assert cache.get(tmp_path, "new.txt", file_stat) is not None
+    cache.close()
+
+def test_hits_write_use_times_together(cache, tmp_path):
+    test_file = tmp_path / "a.txt"
+    test_file.write_text("hello")
+    file_stat = os.stat(test_file)
+    cache.put(tmp_path, "a.txt", file_stat, CacheEntry("hello", "ascii", False))
+    cache.put_blob("a" * 40, 5, CacheEntry("hello", "ascii", False))
+    changes = cache._conn.total_changes
+
+    with patch('project2md.cache.time.time', return_value=123.0):
+        assert cache.get(tmp_path, "a.txt", file_stat) is not None
+        assert cache.get_blob("a" * 40) is not None
+    # Lookups do not write to the database
+    assert cache._conn.total_changes == changes
+
+    cache.evict()
+    assert cache._conn.execute('SELECT last_used FROM contents').fetchall() == [(123.0,)]
+    assert cache._conn.execute('SELECT last_used FROM blobs').fetchall() == [(123.0,)]
+
+def test_walker_reuses_cached_contents(cache, tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "main.py").write_text("print('hi')\n")
+    (repo / "data.txt").write_bytes(b"\x00\x01binary")
+
+    def run():
+        walker = FileSystemWalker(Config(), Mock(), cache)
+        contents = dict(walker.read_files(walker.iter_files(repo)))
+        return walker, contents
+
+    walker, first = run()
+    assert walker.get_cache_stats()["hits"] == 0
+    assert walker.get_io_stats()["files_read"] == 2
+
+    walker, second = run()
+    assert second == first
+    assert second[repo / "main.py"] == "print('hi')\n"
+    assert second[repo / "data.txt"] is None
+    assert walker.get_io_stats()["files_read"] == 0
+    assert walker.get_cache_stats()["hits"] == 2
+
+def test_token_counts_are_stored_and_reused(cache, tmp_path):
+    from project2md.tokens import ApproximateTokenizer, register_tokenizer
+
+    calls = []
+
+    class CountingTokenizer(ApproximateTokenizer):
+        name = "counting"
+
+        def count(self, text):
+            calls.append(text)
+            return super().count(text)
+
+    register_tokenizer("counting", CountingTokenizer)
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "main.py").write_text("print('hi')\n")
+
+    def run(tokenizer):
+        config = Config()
+        config.output.tokenizer = tokenizer
+        walker = FileSystemWalker(config, Mock(), cache)
+        dict(walker.read_files(walker.iter_files(repo)))
+        return walker.get_tokens(repo / "main.py")
+
+    tokens = run("counting")
+    assert tokens == 7 and len(calls) == 1
+    assert run("counting") == tokens
+    assert len(calls) == 1
+    # Counts of another tokenizer are not reused, but the cached content is
+    assert run("approximate") == tokens
+    assert run("counting") == tokens
+    assert len(calls) == 2
+
+def test_old_cache_files_gain_token_columns(tmp_path):
+    (tmp_path / "cache").mkdir()
+    conn = sqlite3.connect(str(tmp_path / "cache" / ContentCache.FILENAME))
+    conn.executescript("""
+        CREATE TABLE contents (root TEXT NOT NULL, path TEXT NOT NULL, size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL, text TEXT, encoding TEXT,
+            is_binary INTEGER NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (root, path));
+        CREATE TABLE blobs (oid TEXT PRIMARY KEY, size INTEGER NOT NULL, text TEXT, encoding TEXT,
+            is_binary INTEGER NOT NULL, last_used REAL NOT NULL);
+        INSERT INTO blobs VALUES ('%s', 3, 'old', 'ascii', 0, 1.0);
+    """ % ("a" * 40))
+    conn.commit()
+    conn.close()
+
+    cache = ContentCache(tmp_path / "cache", max_size=1024)
+    assert cache.get_blob("a" * 40) == CacheEntry("old", "ascii", False)
+    entry = CacheEntry("new", "ascii", False, 1, "approximate")
+    cache.put_blob("b" * 40, 3, entry)
+    assert cache.get_blob("b" * 40) == entry
+    cache.close()
+
+def test_blob_entries_are_keyed_by_oid(cache):
+    entry = CacheEntry("shared", "ascii", False)
+    cache.put_blob("a" * 40, 6, entry)
+
+    assert cache.get_blob("a" * 40) == entry
+    assert cache.get_blob("b" * 40) is None
+
+def test_instances_share_a_directory(tmp_path):
+    test_file = tmp_path / "a.txt"
+    test_file.write_text("hello")
+    file_stat = os.stat(test_file)
+
+    first = ContentCache(tmp_path / "cache", max_size=1024)
+    second = ContentCache(tmp_path / "cache", max_size=1024)
+    first.put(tmp_path, "a.txt", file_stat, CacheEntry("hello", "ascii", False))
+    # The first instance's write is committed, so the second can see it and write too
+    assert second.get(tmp_path, "a.txt", file_stat).text == "hello"
+    second.put(tmp_path, "b.txt", file_stat, CacheEntry("other", "ascii", False))
+    assert first.get(tmp_path, "b.txt", file_stat).text == "other"
+    second.close()
+    first.close()
+
+def test_locked_database_skips_writes(tmp_path):
+    test_file = tmp_path / "a.txt"
+    test_file.write_text("hello")
+    file_stat = os.stat(test_file)
+
+    with patch('project2md.cache._BUSY_TIMEOUT', 0.05):
+        cache = ContentCache(tmp_path / "cache", max_size=1024)
+    other = sqlite3.connect(str(cache.path))
+    other.execute('BEGIN EXCLUSIVE')
+    try:
+        cache.put(tmp_path, "a.txt", file_stat, CacheEntry("hello", "ascii", False))
+    finally:
+        other.rollback()
+        other.close()
+    assert cache.get(tmp_path, "a.txt", file_stat) is None
+    cache.close()
+
+def test_database_errors_do_not_lose_files(cache, tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "main.py").write_text("print('hi')\n")
+
+    class BrokenConnection:
+        def __getattr__(self, name):
+            raise sqlite3.OperationalError("database is locked")
+
+    real_conn = cache._conn
+    cache._conn = BrokenConnection()
+    try:
+        walker = FileSystemWalker(Config(), Mock(), cache)
+        contents = dict(walker.read_files(walker.iter_files(repo)))
+    finally:
+        cache._conn = real_conn
+    assert contents == {repo / "main.py": "print('hi')\n"}
+    assert walker.get_cache_stats()["misses"] == 1
+
+def _git(repo, *args):
+    subprocess.run(
+        ['git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *args],
+        cwd=repo, check=True, capture_output=True
+    )
+
+def _settle(repo):
+    """Backdate files and refresh the index so that no entry is racily clean."""
+    past = os.stat(repo).st_mtime_ns - 3600 * 10**9
+    for path in repo.rglob('*'):
+        if '.git' not in path.parts and path.is_file():
+            os.utime(path, ns=(past, past))
+    _git(repo, 'update-index', '--refresh')
+
+def _read_tracked(repo, cache):
+    config = Config()
+    config.target_dir = repo
+    handler = GitHandler(config, Mock())
+    handler._validate_local_repository()
+    walker = FileSystemWalker(config, Mock(), cache)
+    contents = dict(walker.read_files(walker.iter_files(repo, handler.list_tracked_files())))
+    return walker, {path.name: content for path, content in contents.items()}
+
+def test_walker_reuses_blobs_across_clones(cache, tmp_path):
+    origin = tmp_path / "origin"
+    origin.mkdir()
+    (origin / "shared.py").write_text("print('shared')\n")
+    (origin / "other.py").write_text("print('other')\n")
+    _git(origin, 'init', '-q')
+    _git(origin, 'add', '.')
+    _git(origin, 'commit', '-q', '-m', 'Initial commit')
+    _settle(origin)
+
+    walker, first = _read_tracked(origin, cache)
+    assert walker.get_io_stats()["files_read"] == 2
+
+    clone = tmp_path / "clone"
+    _git(tmp_path, 'clone', '-q', str(origin), str(clone))
+    _settle(clone)
+    # Same size, different content: caught by the stat check without reading
+    (clone / "other.py").write_text("print('OTHER')\n")
+
+    walker, second = _read_tracked(clone, cache)
+    assert second["shared.py"] == "print('shared')\n"
+    assert second["other.py"] == "print('OTHER')\n"
+    assert walker.get_io_stats()["files_read"] == 1
+    assert walker.get_cache_stats()["hits"] == 1
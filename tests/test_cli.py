@@ -1,6 +1,8 @@
 from click.testing import CliRunner
 from project2md.cli import cli
 import json
+import os
+import pytest
 import yaml
 from pathlib import Path
 
@@ -58,11 +60,11 @@ def test_process_yaml_format(tmp_path):
     output_file = tmp_path / 'output.yaml'
     assert output_file.exists()
     with open(output_file) as f:
-        data = yaml.safe_load(f)
-        assert "metadata" in data
-        assert "project" in data
+        header, *files = yaml.safe_load_all(f)
+        assert "metadata" in header
+        assert "project" in header
         # Verify the test file was processed
-        assert any(f["path"] == "test.txt" for f in data.get("files", []))
+        assert any(f["path"] == "test.txt" for f in files)
 
 def test_invalid_format(tmp_path):
     """Test CLI with invalid format option."""
@@ -133,3 +135,198 @@ def test_explicit_command_with_files(tmp_path):
     if bin_file_entry:
         # If the bin file was present, ensure it's excluded
         assert bin_file_entry["include"] is False, "Binary file should be excluded."
+
+def test_process_git_repo_uses_tracked_files(tmp_path):
+    """Untracked files in a Git repository are not processed."""
+    from git import Repo
+
+    repo = Repo.init(tmp_path)
+    (tmp_path / "tracked.txt").write_text("Tracked content")
+    repo.index.add(["tracked.txt"])
+    repo.index.commit("Initial commit")
+    (tmp_path / "untracked.txt").write_text("Untracked content")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, [
+        'process',
+        '--root-dir', str(tmp_path),
+        '--format', 'json',
+        '--output', str(tmp_path / 'output.json')
+    ])
+
+    assert result.exit_code == 0
+    data = json.loads((tmp_path / 'output.json').read_text())
+    paths = [f["path"] for f in data["files"]]
+    assert "tracked.txt" in paths
+    assert "untracked.txt" not in paths
+
+def test_process_no_checkout_reads_branch_tree(tmp_path):
+    """--no-checkout documents another branch without touching the working tree."""
+    from git import Repo
+
+    repo = Repo.init(tmp_path)
+    (tmp_path / "main.txt").write_text("Main content")
+    repo.index.add(["main.txt"])
+    repo.index.commit("Initial commit")
+    current = repo.active_branch.name
+    feature = repo.create_head("feature")
+    feature.checkout()
+    (tmp_path / "feature.txt").write_text("Feature content")
+    repo.index.add(["feature.txt"])
+    repo.index.commit("Add feature")
+    repo.heads[current].checkout()
+
+    runner = CliRunner()
+    result = runner.invoke(cli, [
+        'process',
+        '--root-dir', str(tmp_path),
+        '--branch', 'feature',
+        '--no-checkout',
+        '--format', 'json',
+        '--output', str(tmp_path / 'output.json')
+    ])
+
+    assert result.exit_code == 0
+    data = json.loads((tmp_path / 'output.json').read_text())
+    contents = {f["path"]: f["content"] for f in data["files"]}
+    assert contents["feature.txt"] == "Feature content"
+    assert data["project"]["statistics"]["branch"] == "feature"
+    assert repo.active_branch.name == current
+    assert not (tmp_path / "feature.txt").exists()
+
+def test_process_ref_main_from_another_branch(tmp_path):
+    """--ref main is honoured when another branch is checked out."""
+    from git import Repo
+
+    repo = Repo.init(tmp_path, initial_branch="main")
+    (tmp_path / "main.txt").write_text("Main content")
+    repo.index.add(["main.txt"])
+    repo.index.commit("Initial commit")
+    repo.create_head("feature").checkout()
+    (tmp_path / "feature.txt").write_text("Feature content")
+    repo.index.add(["feature.txt"])
+    repo.index.commit("Add feature")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, [
+        'process',
+        '--root-dir', str(tmp_path),
+        '--ref', 'main',
+        '--format', 'json',
+        '--output', str(tmp_path / 'output.json')
+    ])
+
+    assert result.exit_code == 0
+    data = json.loads((tmp_path / 'output.json').read_text())
+    assert {f["path"] for f in data["files"]} == {"main.txt"}
+    assert data["project"]["statistics"]["branch"] == "main"
+    assert repo.active_branch.name == "feature"
+
+@pytest.mark.parametrize("mode", [[], ['--no-checkout'], ['--force']])
+def test_process_file_name_not_utf8(tmp_path, mode):
+    """Files whose names are not valid UTF-8 are documented under an escaped name."""
+    from git import Repo
+
+    root = tmp_path / "repo"
+    root.mkdir()
+    name = os.fsdecode(b"caf\xe9.txt")
+    try:
+        (root / name).write_text("Latin-1 name")
+    except OSError:
+        pytest.skip("file system only allows UTF-8 names")
+    repo = Repo.init(root)
+    # GitPython's index cannot encode the name, so git itself commits it
+    repo.git.add('--all')
+    repo.git.execute([
+        'git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com', 'commit', '-q', '-m', 'Initial commit'
+    ])
+
+    runner = CliRunner()
+    result = runner.invoke(cli, [
+        'process',
+        '--root-dir', str(root),
+        '--format', 'json',
+        '--output', str(tmp_path / 'output.json'),
+        *mode
+    ])
+
+    assert result.exit_code == 0, result.output
+    data = json.loads((tmp_path / 'output.json').read_text())
+    # The escape written for the undecodable byte reads back as the same name
+    assert [(f["path"], f["content"]) for f in data["files"]] == [(name, "Latin-1 name")]
+
+def test_process_diff_only_changed_files(tmp_path):
+    """--diff documents the files changed between two refs."""
+    from git import Repo
+
+    repo = Repo.init(tmp_path)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "old.md").write_text("Old docs")
+    (tmp_path / "app.py").write_text("print('v1')")
+    repo.index.add(["docs/old.md", "app.py"])
+    repo.index.commit("Initial commit")
+    repo.create_tag("v1")
+    (tmp_path / "app.py").write_text("print('v2')")
+    (tmp_path / "tests.py").write_text("assert True")
+    repo.index.add(["app.py", "tests.py"])
+    repo.index.commit("Second commit")
+
+    def run(*extra):
+        runner = CliRunner()
+        result = runner.invoke(cli, [
+            'process',
+            '--root-dir', str(tmp_path),
+            '--diff', 'v1..HEAD',
+            '--format', 'json',
+            '--output', str(tmp_path / 'output.json'),
+            *extra
+        ])
+        assert result.exit_code == 0
+        return json.loads((tmp_path / 'output.json').read_text())
+
+    data = run()
+    assert {f["path"]: f["content"] for f in data["files"]} == {
+        "app.py": "print('v2')",
+        "tests.py": "assert True",
+    }
+    assert "old.md" not in data["project"]["structure"]
+
+    data = run('--diff-tree', 'full')
+    assert [f["path"] for f in data["files"]] == ["app.py", "tests.py"]
+    assert "old.md" in data["project"]["structure"]
+
+
+def test_process_skips_its_own_output(tmp_path):
+    """The output and its manifest are not documented on the next run."""
+    (tmp_path / "main.py").write_text("print('hi')")
+
+    def run():
+        runner = CliRunner()
+        result = runner.invoke(cli, [
+            'process',
+            '--root-dir', str(tmp_path),
+            '--output', str(tmp_path / 'summary.txt'),
+            '--incremental',
+            '--force'
+        ])
+        assert result.exit_code == 0
+        return (tmp_path / 'summary.txt').read_text()
+
+    run()
+    assert (tmp_path / 'summary.txt.manifest.json').exists()
+    output = run()
+    assert "main.py" in output
+    assert "summary.txt" not in output
+
+def test_progress_shows_count_without_total():
+    """Tasks whose total is unknown show how many steps are done, not 0%."""
+    from project2md.cli import CountOrPercentageColumn, setup_progress
+
+    progress = setup_progress()
+    walk = progress.add_task("Analyzing files...", total=None)
+    progress.update(walk, advance=12)
+    done = progress.add_task("Generating documentation...", total=4, completed=1)
+    column = CountOrPercentageColumn()
+    tasks = {task.id: task for task in progress.tasks}
+    assert column.render(tasks[walk]).plain.strip() == "12"
+    assert column.render(tasks[done]).plain.strip() == "25%"
@@ -66,6 +66,12 @@ def test_invalid_patterns():
     with pytest.raises(ConfigError):
         config.validate()
 
+def test_invalid_tokenizer():
+    config = Config()
+    config.output.tokenizer = 'nonexistent'
+    with pytest.raises(ConfigError, match="Unknown tokenizer"):
+        config.validate()
+
 @pytest.fixture
 def temp_config_file(tmp_path):
     config_path = tmp_path / '.project2md.yml'
@@ -78,4 +84,48 @@ def test_save_and_load_config(temp_config_file, sample_config_dict):
     loaded_config = Config.from_yaml(temp_config_file)
     assert loaded_config.general.max_depth == config.general.max_depth
     assert loaded_config.include.files == config.include.files
-    assert loaded_config.exclude.dirs == config.exclude.dirs
\ No newline at end of file
+    assert loaded_config.exclude.dirs == config.exclude.dirs
+
+def test_read_workers_config(sample_config_dict):
+    sample_config_dict['general']['read_workers'] = 8
+    config = Config.from_dict(sample_config_dict)
+    assert config.general.read_workers == 8
+
+    config.merge_cli_args({'read_workers': 2})
+    assert config.general.read_workers == 2
+
+    config.general.read_workers = 0
+    with pytest.raises(ConfigError, match="read_workers"):
+        config.validate()
+
+def test_cache_config(sample_config_dict):
+    config = Config.from_dict(sample_config_dict)
+    assert config.cache.enabled is False
+    assert config.cache.max_size_bytes == 512 * 1024 * 1024
+
+    sample_config_dict['cache'] = {'enabled': True, 'dir': '/tmp/p2m', 'max_size': '1MB'}
+    config = Config.from_dict(sample_config_dict)
+    assert config.cache.enabled is True
+    assert config.cache.dir == '/tmp/p2m'
+    assert config.cache.max_size_bytes == 1024 * 1024
+
+    config.merge_cli_args({'cache': False})
+    assert config.cache.enabled is False
+
+    assert config.cache.mirrors is False
+    assert config.cache.mirror_max_size_bytes == 5 * 1024 ** 3
+    config.merge_cli_args({'mirror_cache': True})
+    assert config.cache.mirrors is True
+
+def test_diff_config(sample_config_dict):
+    config = Config.from_dict(sample_config_dict)
+    assert config.diff is None
+    assert config.output.diff_tree == "changed"
+
+    config.merge_cli_args({'diff': 'main..feature', 'diff_tree': 'FULL'})
+    assert config.diff == 'main..feature'
+    assert config.output.diff_tree == "full"
+
+    config.output.diff_tree = "partial"
+    with pytest.raises(ConfigError, match="diff_tree"):
+        config.validate()
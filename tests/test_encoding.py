@@ -0,0 +1,57 @@
+# tests/test_encoding.py
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from project2md.encoding import EncodingDetector
+
+SJIS_TEXT = "これは日本語のテストファイルです。よろしくお願いします。\n" * 200
+
+@pytest.fixture
+def detector():
+    return EncodingDetector(sample_size=8192)
+
+def test_decode_utf8_and_ascii(detector):
+    assert detector.decode(b"plain ascii") == "plain ascii"
+    assert detector.decode("Grüße, 世界".encode('utf-8')) == "Grüße, 世界"
+
+def test_decode_boms(detector):
+    assert detector.decode(b'\xef\xbb\xbfhello') == "hello"
+    assert detector.decode("hello".encode('utf-16')) == "hello"
+    assert detector.decode("hello".encode('utf-32')) == "hello"
+
+def test_detection_is_sample_bounded(detector):
+    data = SJIS_TEXT.encode('shift_jis') * 10
+
+    with patch('project2md.encoding.UniversalDetector.feed', autospec=True) as mock_feed:
+        detector.detect(data)
+
+    fed = sum(len(call.args[1]) for call in mock_feed.call_args_list)
+    assert fed <= detector.sample_size
+
+def test_decode_shift_jis(detector):
+    data = SJIS_TEXT.encode('shift_jis')
+    assert detector.decode(data, Path("src/legacy.txt")) == SJIS_TEXT
+
+def test_remembered_encoding_skips_detection(detector):
+    data = SJIS_TEXT.encode('shift_jis')
+    assert detector.decode(data, Path("src/a.txt")) == SJIS_TEXT
+
+    with patch.object(detector, 'detect') as mock_detect:
+        assert detector.decode(data, Path("src/b.txt")) == SJIS_TEXT
+        assert detector.decode(data, Path("other/c.txt")) == SJIS_TEXT
+    mock_detect.assert_not_called()
+
+def test_single_byte_encoding_is_not_reused_per_extension(detector):
+    latin = "Déjà vu, señor.\n".encode('latin-1')
+    cyrillic = "Привет, мир.\n".encode('cp1251')
+    with patch.object(detector, 'detect', return_value='ISO-8859-1'):
+        assert detector.decode(latin, Path("src/a.py")) == "Déjà vu, señor.\n"
+
+    with patch.object(detector, 'detect', return_value='windows-1251') as mock_detect:
+        assert detector.decode(cyrillic, Path("other/b.py")) == "Привет, мир.\n"
+    mock_detect.assert_called_once()
+
+def test_undetectable_returns_none(detector):
+    with patch.object(detector, 'detect', return_value=None):
+        assert detector.decode(b'caf\xe9') is None
@@ -132,4 +132,45 @@ def test_empty_repo(formatter, tmp_path):
     
     content = output.read_text()
     assert "# Project Overview" in content
-    assert "No files found" not in content  # Should handle empty repo gracefully
\ No newline at end of file
+    assert "No files found" not in content  # Should handle empty repo gracefully
+
+def test_write_stream_matches_generate_output(config, sample_files, sample_stats, tmp_path):
+    repo_path = tmp_path / "repo"
+    expected = tmp_path / "expected.md"
+    streamed = tmp_path / "streamed.md"
+    MarkdownFormatter(config).generate_output(repo_path, sample_files, sample_stats, expected)
+    ranges = MarkdownFormatter(config).write_stream(repo_path, iter(sample_files), lambda: sample_stats, streamed)
+
+    def without_footer(path):
+        return path.read_text().rsplit("Generated by project2md on", 1)[0]
+
+    assert without_footer(streamed) == without_footer(expected)
+    data = streamed.read_bytes()
+    assert [data[offset:offset + length].decode() for offset, length in ranges] == [
+        "### filepath src/main.py\n\n```python\nprint('Hello')\n```\n"
+    ]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["expected.md", "repo", "streamed.md"]
+
+def test_write_stream_releases_contents(formatter, sample_stats, tmp_path):
+    import weakref
+
+    class Content(str):
+        pass
+
+    repo_path = tmp_path / "repo"
+    alive = []
+
+    def files():
+        for i in range(50):
+            content = Content(f"value = {i}\n" * 100)
+            alive.append(weakref.ref(content))
+            yield repo_path / f"module_{i}.py", content
+            del content
+            # Only the file just written may still be referenced by the formatter
+            assert sum(ref() is not None for ref in alive) <= 1
+
+    output = tmp_path / "output.md"
+    formatter.write_stream(repo_path, files(), lambda: sample_stats, output)
+    text = output.read_text()
+    assert "### filepath module_49.py" in text
+    assert "module_0.py" in text.split("## File Contents")[0]
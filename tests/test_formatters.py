@@ -4,6 +4,7 @@ import json
 import yaml
 from project2md.formatters.base import BaseFormatter, FormatterError
 from project2md.formatters.json_formatter import JSONFormatter
+from project2md.formatters.jsonl_formatter import JSONLinesFormatter
 from project2md.formatters.yaml_formatter import YAMLFormatter
 from project2md.config import Config
 
@@ -103,6 +104,63 @@ class TestJSONFormatter:
         file_content = next(f["content"] for f in data["files"] if f["path"] == "test.json")
         assert json.loads(file_content) == {"nested": {"json": True, "array": [1,2,3]}}
 
+    def test_json_layout_matches_json_dumps(self, config, sample_files, sample_stats, tmp_path):
+        formatter = JSONFormatter(config)
+        output_file = tmp_path / "output.json"
+        files = sample_files + [(tmp_path / "repo" / "unicode.txt", 'caf\u00e9 "quoted"\n\ttab \u2028')]
+
+        formatter.generate_output(tmp_path / "repo", files, sample_stats, output_file)
+
+        text = output_file.read_text(encoding='utf-8')
+        assert text == json.dumps(json.loads(text), indent=2, ensure_ascii=False)
+
+    def test_json_token_counts(self, config, sample_files, sample_stats, tmp_path):
+        formatter = JSONFormatter(config)
+        formatter.token_counter = {path: i + 10 for i, (path, _) in enumerate(sample_files)}.get
+        output_file = tmp_path / "output.json"
+
+        formatter.generate_output(tmp_path / "repo", sample_files, sample_stats, output_file)
+
+        text = output_file.read_text(encoding='utf-8')
+        data = json.loads(text)
+        assert [f["tokens"] for f in data["files"]] == [10, 11, 12]
+        assert text == json.dumps(data, indent=2, ensure_ascii=False)
+
+class TestJSONLinesFormatter:
+    def test_jsonl_records(self, config, sample_files, sample_stats, tmp_path):
+        formatter = JSONLinesFormatter(config)
+        output_file = tmp_path / "output.jsonl"
+
+        formatter.generate_output(tmp_path / "repo", sample_files + [(tmp_path / "repo" / "logo.png", None)],
+                                  sample_stats, output_file)
+
+        lines = output_file.read_text(encoding='utf-8').split("\n")
+        assert lines[-1] == ""
+        records = [json.loads(line) for line in lines[:-1]]
+        header, files = records[0], records[1:]
+        assert header["record"] == "header"
+        assert header["metadata"]["generator"] == "project2md"
+        assert header["project"]["readme"] == "# Test Project\nThis is a test."
+        assert header["project"]["statistics"] == sample_stats
+        assert all(record["record"] == "file" for record in files)
+        assert [record["path"] for record in files] == ["README.md", "src/config.json", "src/config.yaml"]
+        assert files[1]["type"] == "json"
+        assert files[1]["content"] == sample_files[1][1]
+
+    def test_jsonl_stream_matches_generate_output(self, config, sample_files, sample_stats, tmp_path):
+        expected = tmp_path / "expected.jsonl"
+        streamed = tmp_path / "streamed.jsonl"
+        JSONLinesFormatter(config).generate_output(tmp_path / "repo", sample_files, sample_stats, expected)
+        JSONLinesFormatter(config).write_stream(tmp_path / "repo", iter(sample_files), lambda: sample_stats, streamed)
+
+        def records(path):
+            lines = path.read_text(encoding='utf-8').splitlines()
+            header = json.loads(lines[0])
+            del header["metadata"]["generated_at"]
+            return [header] + [json.loads(line) for line in lines[1:]]
+
+        assert records(streamed) == records(expected)
+
 class TestYAMLFormatter:
     def test_yaml_output_structure(self, config, sample_files, sample_stats, tmp_path):
         formatter = YAMLFormatter(config)
@@ -111,33 +169,33 @@ class TestYAMLFormatter:
         formatter.generate_output(tmp_path / "repo", sample_files, sample_stats, output_file)
         
         with open(output_file) as f:
-            data = yaml.safe_load(f)
+            header, *files = yaml.safe_load_all(f)
         
         # Check structure
-        assert "metadata" in data
-        assert "project" in data
-        assert "files" in data
-        assert isinstance(data["files"], list)
+        assert "metadata" in header
+        assert "project" in header
         
         # Check metadata
-        assert "generated_at" in data["metadata"]
-        assert data["metadata"]["generator"] == "project2md"
+        assert "generated_at" in header["metadata"]
+        assert header["metadata"]["generator"] == "project2md"
         
         # Check project data
-        assert data["project"]["readme"] == "# Test Project\nThis is a test."
-        assert data["project"]["statistics"] == sample_stats
+        assert header["project"]["readme"] == "# Test Project\nThis is a test."
+        assert header["project"]["statistics"] == sample_stats
         
-        # Check file entries
-        file_paths = [f["path"] for f in data["files"]]
-        assert "README.md" in file_paths
-        assert "src/config.json" in file_paths
-        assert "src/config.yaml" in file_paths
+        # Check file documents
+        file_paths = [f["path"] for f in files]
+        assert file_paths == ["README.md", "src/config.json", "src/config.yaml"]
+        assert files[2]["content"] == sample_files[2][1]
 
     def test_yaml_special_content_handling(self, config, tmp_path):
         """Test handling of files containing YAML content."""
         files = [(
             tmp_path / "test.yaml",
             'nested:\n  key: value\n  list:\n    - item1\n    - item2'
+        ), (
+            tmp_path / "separators.txt",
+            '---\nnot a new document\n...\n--- also not\n'
         )]
         
         formatter = YAMLFormatter(config)
@@ -147,16 +205,43 @@ class TestYAMLFormatter:
         
         # Verify output can be parsed as valid YAML
         with open(output_file) as f:
-            data = yaml.safe_load(f)
+            documents = list(yaml.safe_load_all(f))
+        assert len(documents) == 3
             
         # Check the nested YAML content is properly handled
-        file_content = next(f["content"] for f in data["files"] if f["path"] == "test.yaml")
+        file_content = next(f["content"] for f in documents[1:] if f["path"] == "test.yaml")
         assert yaml.safe_load(file_content) == {
             "nested": {
                 "key": "value",
                 "list": ["item1", "item2"]
             }
         }
+        # Document markers inside contents are quoted, not taken as separators
+        assert documents[2]["content"] == files[1][1]
+
+    def test_yaml_stream_matches_generate_output(self, config, sample_files, sample_stats, tmp_path):
+        expected = tmp_path / "expected.yaml"
+        streamed = tmp_path / "streamed.yaml"
+        YAMLFormatter(config).generate_output(tmp_path / "repo", sample_files, sample_stats, expected)
+        YAMLFormatter(config).write_stream(tmp_path / "repo", iter(sample_files), lambda: sample_stats, streamed)
+
+        def documents(path):
+            header, *files = yaml.safe_load_all(path.read_text(encoding='utf-8'))
+            del header["metadata"]["generated_at"]
+            return [header] + files
+
+        assert documents(streamed) == documents(expected)
+
+    def test_yaml_undecodable_file_name(self, config, tmp_path):
+        """Surrogate escapes of names that are not UTF-8 are written as YAML escapes."""
+        name = b"caf\xe9.txt".decode('utf-8', 'surrogateescape')
+        output_file = tmp_path / "output.yaml"
+
+        YAMLFormatter(config).generate_output(tmp_path, [(tmp_path / name, "content")], {}, output_file)
+
+        header, document = yaml.safe_load_all(output_file.read_text(encoding='utf-8'))
+        assert document["path"] == name
+        assert name in header["project"]["structure"]
 
 def test_formatter_error_handling():
     """Test error handling in formatters."""
@@ -181,3 +266,12 @@ def test_formatter_error_handling():
             {},
             Path("/nonexistent/output.yaml")
         )
+
+def test_formatter_must_render_sections(config):
+    """A formatter without the render methods cannot be created."""
+    class IncompleteFormatter(BaseFormatter):
+        def generate_output(self, repo_path, files, stats, output_path):
+            pass
+
+    with pytest.raises(TypeError, match="render_file"):
+        IncompleteFormatter(config)
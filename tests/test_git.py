@@ -6,6 +6,7 @@ from git.exc import GitCommandError
 from unittest.mock import Mock, patch
 from rich.progress import Progress
 import tempfile
+import os
 
 from project2md.git import GitHandler, GitError
 from project2md.config import Config
@@ -61,7 +62,9 @@ def test_validate_local_repository_nonexistent(git_handler, tmp_path):
 def test_clone_repository_success(mock_clone, git_handler, tmp_path):
     """Test that remote repositories are cloned to a temporary directory."""
     git_handler.config.repo_url = "https://github.com/test/repo.git"
-    mock_clone.return_value = Mock(spec=git.Repo)
+    mock_repo = Mock(spec=git.Repo)
+    mock_repo.git = Mock()
+    mock_clone.return_value = mock_repo
     
     result = git_handler._clone_repository()
     
@@ -69,7 +72,10 @@ def test_clone_repository_success(mock_clone, git_handler, tmp_path):
     assert result.parent == Path('/tmp')
     assert result.name.startswith('project2md_')
     assert mock_clone.called
-    assert mock_clone.call_args[1]['branch'] == git_handler.config.branch
+    # Without a requested branch the remote's default branch is cloned
+    assert 'branch' not in mock_clone.call_args[1]
+    assert mock_clone.call_args[1]['depth'] == 1
+    assert mock_clone.call_args[1]['single_branch'] is True
 
 @patch('git.Repo.clone_from')
 def test_clone_repository_failure(mock_clone, git_handler, tmp_path):
@@ -93,9 +99,10 @@ def test_clone_repository_cleanup(mock_clone, git_handler):
     assert git_handler._temp_dir is None or not git_handler._temp_dir.exists()
 
 def test_validate_local_repository_branch_switching(git_handler, temp_git_repo):
-    """Test branch switching in local repository."""
+    """A requested branch is read from its tree without switching the checkout."""
     # Create a new branch in the test repo
     repo = git.Repo(temp_git_repo)
+    current = repo.active_branch.name
     repo.create_head('test-branch')
     
     git_handler.config.target_dir = temp_git_repo
@@ -104,6 +111,32 @@ def test_validate_local_repository_branch_switching(git_handler, temp_git_repo):
     result = git_handler._validate_local_repository()
     assert result == temp_git_repo
     assert git_handler.get_current_branch() == 'test-branch'
+    assert repo.active_branch.name == current
+    assert [entry.path for entry in git_handler.list_tree_files()] == ['test.txt']
+
+@pytest.mark.parametrize("kind", ["tag", "commit"])
+def test_validate_local_repository_reads_tag_or_commit(config, mock_progress, temp_git_repo, kind):
+    repo = git.Repo(temp_git_repo)
+    first = repo.head.commit.hexsha
+    repo.create_tag('v1')
+    (temp_git_repo / "later.txt").write_text("Later content")
+    repo.index.add(["later.txt"])
+    repo.index.commit("Second commit")
+
+    # Several refs of one repository can be read side by side
+    handlers = []
+    for ref in ('v1' if kind == "tag" else first, repo.head.commit.hexsha):
+        handler = GitHandler(config, mock_progress)
+        handler.config.target_dir = temp_git_repo
+        handler.config.branch = ref
+        handler._validate_local_repository()
+        handlers.append(handler)
+
+    old, new = ([entry.path for entry in handler.list_tree_files()] for handler in handlers)
+    assert old == ["test.txt"]
+    assert new == ["later.txt", "test.txt"]
+    assert handlers[0].get_current_branch() == ('v1' if kind == "tag" else first)
+    assert not repo.is_dirty()
 
 def test_validate_local_repository_nonexistent_branch(git_handler, temp_git_repo):
     """Test handling of nonexistent branch."""
@@ -154,6 +187,7 @@ def test_get_repo_info_no_repo(git_handler):
 def test_get_repo_info_complete(git_handler, temp_git_repo):
     """Test complete repository info retrieval."""
     git_handler.config.target_dir = temp_git_repo
+    git_handler.config.general.check_dirty = True
     git_handler._validate_local_repository()
     
     info = git_handler.get_repo_info()
@@ -162,4 +196,241 @@ def test_get_repo_info_complete(git_handler, temp_git_repo):
     assert info['is_git_repo'] is True
     assert isinstance(info['has_uncommitted_changes'], bool)
     assert isinstance(info['remotes'], list)
-    assert isinstance(info['root_path'], str)
\ No newline at end of file
+    assert isinstance(info['root_path'], str)
+    assert info['head_commit'] == git.Repo(temp_git_repo).head.commit.hexsha
+
+@pytest.mark.parametrize("ref", ["feat", "v1", "sha"])
+def test_get_repo_info_reports_requested_ref(git_handler, temp_git_repo, ref):
+    """head_commit is the commit of the tree read, given by any kind of ref."""
+    repo = git.Repo(temp_git_repo)
+    main = repo.active_branch
+    feat = repo.create_head('feat')
+    feat.checkout()
+    (temp_git_repo / "feat.txt").write_text("Feature")
+    repo.index.add(["feat.txt"])
+    commit = repo.index.commit("Feature commit").hexsha
+    repo.create_tag('v1')
+    main.checkout()
+
+    git_handler.config.target_dir = temp_git_repo
+    git_handler.config.branch = commit[:12] if ref == "sha" else ref
+    git_handler._validate_local_repository()
+
+    assert git_handler.get_repo_info()["head_commit"] == commit
+    assert repo.head.commit.hexsha != commit
+
+def test_dirty_check_is_opt_in(git_handler, temp_git_repo):
+    (temp_git_repo / "test.txt").write_text("Staged change")
+    git.Repo(temp_git_repo).git.add("test.txt")
+    git_handler.config.target_dir = temp_git_repo
+    git_handler._validate_local_repository()
+
+    assert git_handler.get_repo_info()["has_uncommitted_changes"] is None
+    git_handler.config.general.check_dirty = True
+    assert git_handler.get_repo_info()["has_uncommitted_changes"] is True
+
+def test_dirty_check_sees_unstaged_changes(git_handler, temp_git_repo):
+    git_handler.config.target_dir = temp_git_repo
+    git_handler.config.general.check_dirty = True
+    git_handler._validate_local_repository()
+    git.Repo(temp_git_repo).git.update_index('--refresh')
+    assert git_handler.get_repo_info()["has_uncommitted_changes"] is False
+
+    (temp_git_repo / "test.txt").write_text("Unstaged change")
+    assert git_handler.get_repo_info()["has_uncommitted_changes"] is True
+
+def test_list_tracked_files(git_handler, temp_git_repo):
+    (temp_git_repo / "added.txt").write_text("Added content")
+    git.Repo(temp_git_repo).git.add("added.txt")
+    (temp_git_repo / "untracked.txt").write_text("build output")
+    git_handler.config.target_dir = temp_git_repo
+    git_handler._validate_local_repository()
+
+    tracked = git_handler.list_tracked_files()
+
+    assert [entry.path for entry in tracked] == ["added.txt", "test.txt"]
+    assert tracked[0].size == len("Added content")
+    assert tracked[0].mtime_ns > 0
+    assert all(len(entry.oid) == 40 for entry in tracked)
+
+def test_list_tracked_files_marks_racy_entries(git_handler, temp_git_repo):
+    added = temp_git_repo / "added.txt"
+    added.write_text("Added content")
+    past = added.stat().st_mtime_ns - 3600 * 10**9
+    os.utime(added, ns=(past, past))
+    repo = git.Repo(temp_git_repo)
+    repo.git.add("added.txt")
+    git_handler.config.target_dir = temp_git_repo
+    git_handler._validate_local_repository()
+
+    tracked = {entry.path: entry for entry in git_handler.list_tracked_files()}
+    assert not tracked["added.txt"].racy
+
+    output = repo.git.ls_files('-z', '--stage', '--debug', '-t')
+    entries = {entry.path: entry for entry in GitHandler._parse_ls_files(output, index_mtime_ns=past)}
+    assert entries["added.txt"].racy
+
+def test_list_tracked_files_no_repo(git_handler):
+    assert git_handler.list_tracked_files() is None
+
+def test_list_tracked_files_with_undecodable_path(git_handler, temp_git_repo):
+    name = os.fsdecode(b"caf\xe9.txt")
+    with open(os.path.join(os.fsencode(temp_git_repo), b"caf\xe9.txt"), "wb") as f:
+        f.write(b"Latin-1 name")
+    git.Repo(temp_git_repo).git.add("--all")
+    git_handler.config.target_dir = temp_git_repo
+    git_handler._validate_local_repository()
+
+    paths = [entry.path for entry in git_handler.list_tracked_files()]
+    assert paths == [name, "test.txt"]
+    assert (temp_git_repo / name).read_bytes() == b"Latin-1 name"
+
+def _origin_repo(tmp_path):
+    origin = tmp_path / "origin"
+    (origin / "src" / "pkg").mkdir(parents=True)
+    (origin / "docs").mkdir()
+    (origin / "src" / "pkg" / "app.py").write_text("print('app')\n")
+    (origin / "src" / "pkg" / "notes.txt").write_text("notes\n")
+    (origin / "docs" / "guide.md").write_text("# Guide\n")
+    repo = git.Repo.init(origin, initial_branch="main")
+    repo.git.config("uploadpack.allowFilter", "true")
+    repo.index.add(["src/pkg/app.py", "src/pkg/notes.txt", "docs/guide.md"])
+    repo.index.commit("Initial commit")
+    (origin / "docs" / "guide.md").write_text("# Guide v2\n")
+    repo.index.add(["docs/guide.md"])
+    repo.index.commit("Second commit")
+    return origin, repo
+
+def test_clone_is_shallow_and_sparse(git_handler, tmp_path):
+    origin, _ = _origin_repo(tmp_path)
+    git_handler.config.repo_url = origin.as_uri()
+    git_handler.config.include.files = ["src/**/*.py"]
+
+    repo_path = git_handler._clone_repository()
+    try:
+        repo = git.Repo(repo_path)
+        assert repo.git.rev_parse("--is-shallow-repository") == "true"
+        assert (repo_path / "src" / "pkg" / "app.py").exists()
+        assert not (repo_path / "docs").exists()
+    finally:
+        git_handler.cleanup()
+
+def test_clone_leaves_out_large_blobs(git_handler, tmp_path):
+    origin, repo = _origin_repo(tmp_path)
+    (origin / "src" / "pkg" / "big.py").write_text("x = 1\n" * 1000)
+    repo.index.add(["src/pkg/big.py"])
+    repo.index.commit("Add a large file")
+    git_handler.config.repo_url = origin.as_uri()
+    git_handler.config.general.max_file_size = "1KB"
+    git_handler.config.general.max_file_size_bytes = 1024
+
+    repo_path = git_handler._clone_repository()
+    try:
+        # The large blob is neither downloaded nor checked out; the rest of its
+        # directory is, listed file by file since a cone would include it
+        assert git_handler._missing_objects()
+        assert not (repo_path / "src" / "pkg" / "big.py").exists()
+        assert (repo_path / "src" / "pkg" / "app.py").exists()
+        assert (repo_path / "docs" / "guide.md").read_text() == "# Guide v2\n"
+    finally:
+        git_handler.cleanup()
+
+def test_cone_dirs():
+    cone = GitHandler._cone_dirs(["README.md", "src/a/x.py", "src/b.py", "docs/x/y/z.md"])
+    assert cone == {"src", "docs/x/y"}
+    assert GitHandler._in_cone("src/a/other.bin", cone)
+    assert GitHandler._in_cone("docs/top.md", cone)
+    assert not GitHandler._in_cone("docs/other/z.md", cone)
+
+def test_no_checkout_clone_lists_tree_without_fetching(git_handler, tmp_path):
+    origin, repo = _origin_repo(tmp_path)
+    (origin / "src" / "pkg" / "big.py").write_text("x = 1\n" * 1000)
+    repo.index.add(["src/pkg/big.py"])
+    repo.index.commit("Add a large file")
+    git_handler.config.repo_url = origin.as_uri()
+    git_handler.config.no_checkout = True
+    git_handler.config.general.max_file_size = "1KB"
+    git_handler.config.general.max_file_size_bytes = 1024
+
+    repo_path = git_handler._clone_repository()
+    try:
+        assert not (repo_path / "src").exists()
+        entries = {entry.path: entry for entry in git_handler.list_tree_files()}
+        assert set(entries) == {"docs/guide.md", "src/pkg/app.py", "src/pkg/big.py", "src/pkg/notes.txt"}
+        assert entries["src/pkg/app.py"].size == len("print('app')\n")
+        assert entries["src/pkg/big.py"].size > 1024
+        assert git_handler.get_blob_reader().read(entries["docs/guide.md"].oid) == b"# Guide v2\n"
+        # Listing did not download the blob the filter left out
+        assert entries["src/pkg/big.py"].oid in git_handler._missing_objects()
+    finally:
+        git_handler.cleanup()
+
+def test_no_checkout_local_branch(git_handler, temp_git_repo):
+    repo = git.Repo(temp_git_repo)
+    current = repo.active_branch.name
+    repo.create_head("feature").checkout()
+    (temp_git_repo / "feature.txt").write_text("Feature content")
+    repo.index.add(["feature.txt"])
+    repo.index.commit("Add feature")
+    repo.heads[current].checkout()
+
+    git_handler.config.target_dir = temp_git_repo
+    git_handler.config.branch = "feature"
+    git_handler.config.no_checkout = True
+    git_handler._validate_local_repository()
+
+    assert repo.active_branch.name == current
+    assert git_handler.get_current_branch() == "feature"
+    assert [entry.path for entry in git_handler.list_tree_files()] == ["feature.txt", "test.txt"]
+
+    git_handler.config.branch = "missing"
+    with pytest.raises(GitError, match="Branch 'missing' not found"):
+        git_handler._validate_local_repository()
+
+@pytest.mark.parametrize("spec, expected", [
+    ("main..feature", ("main", "..", "feature")),
+    ("main...feature", ("main", "...", "feature")),
+    ("v1.0..", ("v1.0", "..", "HEAD")),
+    ("...feature", ("HEAD", "...", "feature")),
+])
+def test_parse_diff_spec(spec, expected):
+    assert GitHandler._parse_diff_spec(spec) == expected
+
+def test_parse_diff_spec_invalid():
+    with pytest.raises(GitError, match="Invalid --diff range"):
+        GitHandler._parse_diff_spec("main")
+
+def test_list_changed_files(git_handler, temp_git_repo):
+    repo = git.Repo(temp_git_repo)
+    current = repo.active_branch.name
+    (temp_git_repo / "keep.txt").write_text("Unchanged")
+    (temp_git_repo / "gone.txt").write_text("Deleted later")
+    repo.index.add(["keep.txt", "gone.txt"])
+    repo.index.commit("Base")
+    repo.create_tag("base")
+    (temp_git_repo / "test.txt").write_text("Modified content")
+    (temp_git_repo / "new.txt").write_text("New content")
+    repo.index.add(["test.txt", "new.txt"])
+    repo.index.remove(["gone.txt"], working_tree=True)
+    repo.index.commit("Head")
+    repo.create_tag("head")
+    repo.git.reset("--hard", "base")
+
+    git_handler.config.target_dir = temp_git_repo
+    git_handler.config.diff = "base..head"
+    git_handler._validate_local_repository()
+
+    changed = git_handler.list_changed_files()
+    assert [(entry.path, entry.size) for entry in changed] == [
+        ("new.txt", len("New content")),
+        ("test.txt", len("Modified content")),
+    ]
+    assert git_handler.get_blob_reader().read(changed[0].oid) == b"New content"
+    assert git_handler.get_current_branch() == "head"
+    assert repo.active_branch.name == current
+    assert (temp_git_repo / "gone.txt").exists()
+
+    git_handler.config.diff = "base..missing"
+    with pytest.raises(GitError, match="Ref 'missing' not found"):
+        git_handler._validate_local_repository()
+
@@ -0,0 +1,66 @@
+# tests/test_gitmeta.py
+import pytest
+import git
+
+from project2md.gitmeta import GitMetadata, GitMetadataError
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = git.Repo.init(tmp_path / "repo")
+    (tmp_path / "repo" / "a.txt").write_text("a")
+    repo.index.add(["a.txt"])
+    repo.index.commit("Initial commit")
+    return repo
+
+def test_current_branch_and_head(repo):
+    metadata = GitMetadata(repo.git_dir)
+
+    assert metadata.current_branch() == repo.active_branch.name
+    assert metadata.head_commit() == repo.head.commit.hexsha
+
+def test_detached_head(repo):
+    repo.git.checkout("--detach")
+    metadata = GitMetadata(repo.git_dir)
+
+    assert metadata.current_branch() is None
+    assert metadata.head_commit() == repo.head.commit.hexsha
+
+def test_packed_refs(repo):
+    repo.create_head("feature")
+    repo.create_tag("v1")
+    repo.git.pack_refs("--all")
+    metadata = GitMetadata(repo.git_dir)
+
+    assert not (metadata.common_dir / "refs" / "heads" / "feature").exists()
+    assert metadata.head_commit() == repo.head.commit.hexsha
+    assert metadata.resolve("refs/heads/feature") == repo.head.commit.hexsha
+    assert metadata.resolve("refs/tags/v1") == repo.head.commit.hexsha
+    assert metadata.resolve("refs/heads/missing") is None
+
+def test_unborn_branch(tmp_path):
+    repo = git.Repo.init(tmp_path / "empty")
+    metadata = GitMetadata(repo.git_dir)
+
+    assert metadata.current_branch() is not None
+    assert metadata.head_commit() is None
+
+def test_remotes(repo):
+    repo.create_remote("origin", "https://example.com/a.git")
+    repo.create_remote('we"ird', "https://example.com/b.git")
+
+    assert GitMetadata(repo.git_dir).remotes() == ["origin", 'we"ird']
+
+def test_linked_worktree(repo, tmp_path):
+    repo.create_head("feature")
+    repo.git.worktree("add", str(tmp_path / "wt"), "feature")
+    worktree = git.Repo(tmp_path / "wt")
+    repo.create_remote("origin", "https://example.com/a.git")
+    metadata = GitMetadata(worktree.git_dir)
+
+    assert metadata.current_branch() == "feature"
+    assert metadata.head_commit() == repo.head.commit.hexsha
+    assert metadata.remotes() == ["origin"]
+
+def test_missing_git_dir(tmp_path):
+    with pytest.raises(GitMetadataError):
+        GitMetadata(tmp_path / "missing").current_branch()
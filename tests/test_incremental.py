@@ -0,0 +1,141 @@
+# tests/test_incremental.py
+import json
+import re
+import pytest
+import yaml
+from unittest.mock import Mock, patch
+
+from project2md.config import Config, OutputFormat
+from project2md.formatters.factory import get_formatter
+from project2md.incremental import IncrementalGenerator, manifest_path
+from project2md.stats import StatsCollector
+from project2md.walker import FileSystemWalker
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    (root / "src").mkdir(parents=True)
+    (root / "README.md").write_text("# Project\nIntro.")
+    (root / "src" / "a.py").write_text("print('a')\n")
+    (root / "src" / "b.py").write_text("print('b')\n")
+    (root / "src" / "c.md").write_text("## C\n")
+    (root / "logo.png").write_bytes(b'\x89PNG\r\n\x1a\n' + b'\x00' * 32)
+    return root
+
+def _config(tmp_path, output_format):
+    config = Config()
+    config.output.format = output_format
+    config.output_file = tmp_path / f"summary.{output_format.value}"
+    config.general.read_workers = 1
+    return config
+
+def _run_incremental(config, root):
+    walker = FileSystemWalker(config, Mock())
+    generator = IncrementalGenerator(config, walker, get_formatter(config))
+    with patch.object(walker, 'read_file', wraps=walker.read_file) as read_file:
+        stats = generator.generate(root, walker.iter_files(root), StatsCollector(), "main")
+    return stats, generator.get_counts(), sorted(call.args[0].name for call in read_file.call_args_list)
+
+def _run_full(config, root, output_path):
+    walker = FileSystemWalker(config, Mock())
+    collector = StatsCollector()
+    files = []
+    for file_path, content in walker.read_files(walker.iter_files(root)):
+        if content is not None:
+            collector.process_file(file_path, content, tokens=walker.get_tokens(file_path))
+            files.append((file_path, content))
+    stats = collector.get_stats("main", root)
+    get_formatter(config).generate_output(root, files, stats, output_path)
+    return stats
+
+def _modify(root):
+    (root / "src" / "a.py").write_text("print('changed a')\n")
+    (root / "src" / "b.py").unlink()
+    (root / "src" / "new.py").write_text("print('new')\n")
+    (root / "README.md").write_text("# Project\nNew intro.")
+
+def _strip_timestamp(text):
+    return re.sub(r"Generated by project2md on .*", "", text)
+
+def test_markdown_update_matches_full_rebuild(tmp_path, repo):
+    config = _config(tmp_path, OutputFormat.MARKDOWN)
+
+    _, counts, read = _run_incremental(config, repo)
+    assert counts["added"] == 5
+    assert manifest_path(config.output_file).exists()
+
+    _modify(repo)
+    stats, counts, read = _run_incremental(config, repo)
+    assert counts == {"added": 1, "changed": 2, "deleted": 1, "unchanged": 2}
+    assert read == ["README.md", "a.py", "new.py"]
+
+    full_output = tmp_path / "full.md"
+    full_stats = _run_full(config, repo, full_output)
+    assert stats == full_stats
+    assert _strip_timestamp(config.output_file.read_text()) == _strip_timestamp(full_output.read_text())
+
+def test_json_update_matches_full_rebuild(tmp_path, repo):
+    config = _config(tmp_path, OutputFormat.JSON)
+    _run_incremental(config, repo)
+
+    _modify(repo)
+    _, counts, read = _run_incremental(config, repo)
+    assert read == ["README.md", "a.py", "new.py"]
+
+    full_output = tmp_path / "full.json"
+    _run_full(config, repo, full_output)
+    data = json.loads(config.output_file.read_text())
+    expected = json.loads(full_output.read_text())
+    data["metadata"].pop("generated_at")
+    expected["metadata"].pop("generated_at")
+    assert data == expected
+
+def test_yaml_update_matches_full_rebuild(tmp_path, repo):
+    config = _config(tmp_path, OutputFormat.YAML)
+    _run_incremental(config, repo)
+
+    _modify(repo)
+    _, counts, read = _run_incremental(config, repo)
+    assert read == ["README.md", "a.py", "new.py"]
+
+    full_output = tmp_path / "full.yaml"
+    _run_full(config, repo, full_output)
+    documents = list(yaml.safe_load_all(config.output_file.read_text()))
+    expected = list(yaml.safe_load_all(full_output.read_text()))
+    documents[0]["metadata"].pop("generated_at")
+    expected[0]["metadata"].pop("generated_at")
+    assert documents == expected
+
+def test_section_ranges_point_into_output(tmp_path, repo):
+    config = _config(tmp_path, OutputFormat.MARKDOWN)
+    _run_incremental(config, repo)
+
+    manifest = json.loads(manifest_path(config.output_file).read_text())
+    output = config.output_file.read_bytes()
+    size, mtime_ns, inode, sha256, is_text, offset, length, tokens = manifest["files"]["src/a.py"]
+    assert tokens > 0
+    assert output[offset:offset + length].decode().startswith("### filepath src/a.py")
+    # README.md is part of the header and binaries have no section
+    assert manifest["files"]["README.md"][5] is None
+    assert manifest["files"]["logo.png"][4] is False
+
+def test_edited_output_forces_full_rebuild(tmp_path, repo):
+    config = _config(tmp_path, OutputFormat.MARKDOWN)
+    _run_incremental(config, repo)
+
+    with open(config.output_file, 'a') as f:
+        f.write("edited by hand\n")
+    _, counts, read = _run_incremental(config, repo)
+
+    assert counts["added"] == 5
+    assert "edited by hand" not in config.output_file.read_text()
+
+def test_settings_change_forces_full_rebuild(tmp_path, repo):
+    config = _config(tmp_path, OutputFormat.MARKDOWN)
+    _run_incremental(config, repo)
+
+    config.output.stats = False
+    _, counts, _ = _run_incremental(config, repo)
+
+    assert counts["added"] == 5
+    assert "## Project Statistics" not in config.output_file.read_text()
@@ -0,0 +1,67 @@
+# tests/test_matcher.py
+import random
+import pytest
+import pathspec
+
+from project2md.config import DEFAULT_INCLUDE_PATTERNS, DEFAULT_EXCLUDE_PATTERNS
+from project2md.matcher import PathMatcher
+
+COMPONENTS = [
+    'src', 'lib', 'node_modules', 'build', 'dist', '.git', '__pycache__', 'venv',
+    'docs', 'tests', 'a.b', 'pkg.egg-info', '.idea', 'vendor', 'coverage', 'target'
+]
+FILENAMES = [
+    'main.py', 'app.js', 'index.min.js', 'README.md', 'Makefile', 'Dockerfile',
+    'image.png', 'data.tar.gz', '.env', '.gitignore', 'package-lock.json', 'x.pyc',
+    'style.css', 'notes.txt', 'lib.so', 'archive.zip', 'build', 'q.PY', '.py'
+]
+
+def _random_paths(count: int, seed: int = 1234):
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        parts = [rng.choice(COMPONENTS) for _ in range(rng.randint(0, 4))]
+        if rng.random() < 0.2:
+            paths.append('/'.join(parts + [rng.choice(COMPONENTS)]) + '/')
+        else:
+            paths.append('/'.join(parts + [rng.choice(FILENAMES)]))
+    return paths
+
+def _assert_equivalent(patterns):
+    spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns)
+    matcher = PathMatcher(patterns)
+    for path in _random_paths(3000):
+        assert matcher.match_file(path) == spec.match_file(path), path
+
+def test_default_include_patterns_match_pathspec():
+    _assert_equivalent(DEFAULT_INCLUDE_PATTERNS['files'] + DEFAULT_INCLUDE_PATTERNS['dirs'])
+
+def test_default_exclude_patterns_match_pathspec():
+    _assert_equivalent(DEFAULT_EXCLUDE_PATTERNS['files'] + DEFAULT_EXCLUDE_PATTERNS['dirs'])
+
+@pytest.mark.parametrize("patterns", [
+    ['*.py', '!main.py'],
+    ['build/', '!build/', 'build'],
+    ['**/node_modules/**', '!**/node_modules/keep.js', 'src/*.js'],
+    ['*.tar.gz', '/build', 'docs/**/*.md', '!docs/README.md', '*.md'],
+    ['# comment', '', 'Makefile', '!Makefile', 'lib.so'],
+    ['[Dd]ist/', '*.p?c', 'a.b/', '!*.min.js', '*.js'],
+])
+def test_negations_and_globs_match_pathspec(patterns):
+    _assert_equivalent(patterns)
+
+def test_pattern_classification():
+    matcher = PathMatcher(['*.py', '**/*.js', 'Makefile', 'build/', '**/dist/**', 'src/*.c'])
+
+    assert matcher._tail.extensions == {'.py', '.js'}
+    assert matcher._tail.names == {'Makefile'}
+    assert matcher._tail.dir_names == {'build', 'dist'}
+    assert len(matcher._tail.regexes) == 1
+
+def test_check_reports_deciding_pattern():
+    matcher = PathMatcher(['*.log', '!keep.log'])
+
+    assert matcher.has_negations
+    assert matcher.check('debug.log') is True
+    assert matcher.check('keep.log') is False
+    assert matcher.check('main.py') is None
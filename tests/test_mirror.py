@@ -0,0 +1,127 @@
+# tests/test_mirror.py
+import subprocess
+import threading
+import pytest
+from pathlib import Path
+from unittest.mock import Mock, patch
+import git
+
+from project2md.config import Config
+from project2md.git import GitHandler, GitError
+from project2md.mirror import MirrorCache, MirrorError
+
+def _git(repo, *args):
+    subprocess.run(
+        ['git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *args],
+        cwd=repo, check=True, capture_output=True
+    )
+
+def _make_origin(path: Path, files: dict) -> str:
+    path.mkdir(parents=True)
+    _git(path, 'init', '-q', '-b', 'main')
+    _commit(path, files)
+    return path.as_uri()
+
+def _commit(repo: Path, files: dict) -> None:
+    for name, content in files.items():
+        (repo / name).write_text(content)
+    _git(repo, 'add', '.')
+    _git(repo, 'commit', '-q', '-m', 'Update')
+
+@pytest.fixture
+def mirrors(tmp_path):
+    return MirrorCache(tmp_path / "cache", max_size=1024 ** 3)
+
+def test_checkout_creates_mirror_then_fetches(mirrors, tmp_path):
+    origin = tmp_path / "origin"
+    url = _make_origin(origin, {"a.txt": "first"})
+
+    dest = tmp_path / "wt1"
+    checkout = mirrors.checkout(url, "main", dest)
+    assert (dest / "a.txt").read_text() == "first"
+    assert (mirrors.mirror_path(url) / "HEAD").exists()
+    checkout.release()
+    assert not dest.exists()
+
+    _commit(origin, {"b.txt": "second"})
+    with patch('git.Repo.clone_from') as mock_clone:
+        checkout = mirrors.checkout(url, "main", tmp_path / "wt2")
+    assert not mock_clone.called
+    assert (tmp_path / "wt2" / "b.txt").read_text() == "second"
+    checkout.release()
+    assert git.Repo(mirrors.mirror_path(url)).git.worktree('list').count('\n') == 0
+
+def test_missing_branch(mirrors, tmp_path):
+    url = _make_origin(tmp_path / "origin", {"a.txt": "first"})
+
+    with pytest.raises(MirrorError, match="Branch 'nope' not found"):
+        mirrors.checkout(url, "nope", tmp_path / "wt")
+
+def test_concurrent_checkouts(mirrors, tmp_path):
+    url = _make_origin(tmp_path / "origin", {"a.txt": "first"})
+    results, errors = [], []
+
+    def run(index):
+        try:
+            checkout = mirrors.checkout(url, "main", tmp_path / f"wt{index}")
+            results.append((tmp_path / f"wt{index}" / "a.txt").read_text())
+            checkout.release()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert results == ["first"] * 4
+
+def test_evicts_least_recently_used_idle_mirrors(tmp_path):
+    mirrors = MirrorCache(tmp_path / "cache", max_size=1)
+    urls = [_make_origin(tmp_path / f"origin{i}", {"a.txt": str(i)}) for i in range(3)]
+
+    for i, url in enumerate(urls[:2]):
+        mirrors.checkout(url, "main", tmp_path / f"wt{i}").release()
+    # The third mirror stays in use and cannot be evicted
+    busy = mirrors.checkout(urls[2], "main", tmp_path / "wt2")
+
+    removed = mirrors.evict()
+    assert removed == [mirrors.mirror_path(urls[0]), mirrors.mirror_path(urls[1])]
+    assert mirrors.mirror_path(urls[2]).exists()
+    busy.release()
+
+def test_git_handler_uses_mirror_cache(tmp_path):
+    url = _make_origin(tmp_path / "origin", {"a.txt": "first"})
+    config = Config()
+    config.repo_url = url
+    config.cache.dir = str(tmp_path / "cache")
+    config.cache.mirrors = True
+    handler = GitHandler(config, Mock())
+
+    repo_path = handler.prepare_repository()
+    assert (repo_path / "a.txt").read_text() == "first"
+    assert handler.get_current_branch() == "main"
+    assert (tmp_path / "cache" / "mirrors").is_dir()
+
+    handler.cleanup()
+    assert not repo_path.exists()
+
+def test_checkout_defaults_to_the_remote_default_branch(mirrors, tmp_path):
+    url = _make_origin(tmp_path / "origin", {"a.txt": "first"})
+
+    checkout = mirrors.checkout(url, None, tmp_path / "wt")
+    assert checkout.ref == "main"
+    assert (tmp_path / "wt" / "a.txt").read_text() == "first"
+    checkout.release()
+
+def test_git_handler_mirror_missing_branch(tmp_path):
+    config = Config()
+    config.repo_url = _make_origin(tmp_path / "origin", {"a.txt": "first"})
+    config.branch = "nope"
+    config.cache.dir = str(tmp_path / "cache")
+    config.cache.mirrors = True
+
+    with pytest.raises(GitError, match="Branch 'nope' not found"):
+        GitHandler(config, Mock()).prepare_repository()
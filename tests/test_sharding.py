@@ -0,0 +1,138 @@
+# tests/test_sharding.py
+import json
+import re
+import pytest
+from click.testing import CliRunner
+from unittest.mock import Mock
+
+from project2md.cli import cli
+from project2md.config import Config, ConfigError, OutputFormat
+from project2md.formatters.factory import get_formatter
+from project2md.sharding import ShardedGenerator, index_path, part_budget, part_path, part_pattern, plan_parts
+from project2md.stats import StatsCollector
+from project2md.walker import FileSystemWalker
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    (root / "src").mkdir(parents=True)
+    (root / "README.md").write_text("# Project\nIntro.\n")
+    for i in range(12):
+        (root / "src" / f"module_{i:02d}.py").write_text(f"value_{i} = {i}\n" * 200)
+    (root / "logo.png").write_bytes(b'\x89PNG\r\n\x1a\n' + b'\x00' * 32)
+    return root
+
+def _config(tmp_path, output_format=OutputFormat.MARKDOWN, max_part_size="12KB"):
+    config = Config()
+    config.output.format = output_format
+    config.output.max_part_size = max_part_size
+    config.output_file = tmp_path / "summary.out"
+    return config
+
+def _generate(config, root):
+    walker = FileSystemWalker(config, Mock())
+    generator = ShardedGenerator(config, walker, get_formatter(config))
+    stats = generator.generate(root, walker.iter_files(root), StatsCollector(), "main")
+    return generator, stats
+
+def test_plan_parts_respects_budget_and_order(tmp_path):
+    files = [(tmp_path / f"f{i}.py", 3000) for i in range(5)]
+    plan = plan_parts(tmp_path, files, 8000)
+    assert [len(part) for part in plan] == [1, 1, 1, 1, 1]
+    assert [path for part in plan for path in part] == [path for path, _ in files]
+
+    plan = plan_parts(tmp_path, files, 10000)
+    assert [len(part) for part in plan] == [2, 2, 1]
+
+def test_plan_parts_never_splits_files(tmp_path):
+    files = [(tmp_path / "small.py", 100), (tmp_path / "huge.py", 50000), (tmp_path / "tail.py", 100)]
+    assert plan_parts(tmp_path, files, 4096) == [[tmp_path / "small.py"], [tmp_path / "huge.py"], [tmp_path / "tail.py"]]
+    assert plan_parts(tmp_path, [], 4096) == [[]]
+
+def test_part_budget_and_names(tmp_path):
+    config = Config()
+    assert part_budget(config.output) is None
+    config.output.max_part_size = "1KB"
+    assert part_budget(config.output) == 1024
+    config.output.max_part_tokens = 100
+    assert part_budget(config.output) == 400
+    assert part_path(tmp_path / "summary.md", 7, 12).name == "summary.part007.md"
+    assert part_path(tmp_path / "summary.md", 7, 1200).name == "summary.part0007.md"
+    assert index_path(tmp_path / "summary.md").name == "summary.index.json"
+    pattern = re.compile(part_pattern(tmp_path / "summary.md"))
+    assert pattern.fullmatch(part_path(tmp_path / "summary.md", 7, 1200).as_posix())
+    assert not pattern.fullmatch((tmp_path / "summary.md").as_posix())
+    assert not pattern.fullmatch((tmp_path / "summary.part001.md.bak").as_posix())
+
+def test_invalid_part_budget():
+    config = Config()
+    config.output.max_part_size = "12 parsecs"
+    with pytest.raises(ConfigError):
+        config.output.validate()
+    config.output.max_part_size = None
+    config.output.max_part_tokens = 0
+    with pytest.raises(ConfigError):
+        config.output.validate()
+
+def test_generate_markdown_parts(tmp_path, repo):
+    config = _config(tmp_path)
+    generator, stats = _generate(config, repo)
+
+    index = json.loads(index_path(config.output_file).read_text())
+    assert len(generator.parts) == len(index["parts"]) > 1
+    assert not config.output_file.exists()
+
+    seen = []
+    for part in index["parts"]:
+        path = tmp_path / part["file"]
+        assert path.stat().st_size == part["size"] <= 12 * 1024
+        text = path.read_text()
+        assert text.startswith("# Project Overview")
+        files_in_part = [rel for rel, name in index["files"].items() if name == part["file"]]
+        for rel in files_in_part:
+            if rel != "README.md":
+                assert f"### filepath {rel}\n" in text
+        seen.extend(files_in_part)
+
+    # Every text file is in exactly one part, in walk order
+    assert sorted(seen) == ["README.md"] + [f"src/module_{i:02d}.py" for i in range(12)]
+    assert stats["text_files"] == 13
+    assert index["statistics"] == stats
+
+def test_generate_jsonl_parts_are_complete_documents(tmp_path, repo):
+    config = _config(tmp_path, OutputFormat.JSONL, max_part_size=None)
+    config.output.max_part_tokens = 3000
+    generator, _ = _generate(config, repo)
+    assert len(generator.parts) > 1
+    for part in generator.parts:
+        records = [json.loads(line) for line in part.path.read_text().splitlines()]
+        assert records[0]["record"] == "header"
+        assert [record["path"] for record in records[1:]] == part.files
+
+def test_stale_parts_are_removed(tmp_path, repo):
+    config = _config(tmp_path, max_part_size="8KB")
+    first, _ = _generate(config, repo)
+    config.output.max_part_size = "1MB"
+    second, _ = _generate(config, repo)
+
+    assert len(second.parts) == 1
+    assert sorted(p.name for p in tmp_path.glob("summary.part*")) == ["summary.part001.out"]
+    assert len(first.parts) > 1
+
+def test_rerun_does_not_document_earlier_parts(repo):
+    def run():
+        result = CliRunner().invoke(cli, [
+            'process',
+            '--root-dir', str(repo),
+            '--output', str(repo / 'summary.md'),
+            '--max-part-size', '12KB',
+            '--force'
+        ])
+        assert result.exit_code == 0
+        return json.loads((repo / "summary.index.json").read_text())
+
+    first = run()
+    second = run()
+    assert len(second["parts"]) == len(first["parts"])
+    assert sorted(second["files"]) == sorted(first["files"])
+    assert not any(name.startswith("summary.") for name in second["files"])
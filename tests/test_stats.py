@@ -142,4 +142,38 @@ def test_merge_collectors(stats_collector, tmp_path):
     assert stats["total_files"] == 2
     assert stats["text_files"] == 2
     assert stats["file_types"][".py"] == 1
-    assert stats["file_types"][".js"] == 1
\ No newline at end of file
+    assert stats["file_types"][".js"] == 1
+
+def test_process_entry_matches_process_file(sample_files):
+    from_files = StatsCollector()
+    from_entries = StatsCollector()
+    for file_path, content in sample_files:
+        from_files.process_file(file_path, content)
+        from_entries.process_entry(file_path, file_path.stat().st_size, content is not None)
+
+    assert from_entries.get_stats() == from_files.get_stats()
+
+def test_token_stats(stats_collector, tmp_path):
+    files = [
+        (tmp_path / "a.py", 120),
+        (tmp_path / "b.py", 30),
+        (tmp_path / "README.md", 50),
+        (tmp_path / "notes.txt", 7),
+    ]
+    for file_path, tokens in files:
+        stats_collector.process_entry(file_path, tokens * 4, True, tokens)
+    stats_collector.process_entry(tmp_path / "logo.png", 100, False)
+
+    stats = stats_collector.get_stats()
+    assert stats["total_tokens"] == 207
+    assert stats["tokens_by_language"] == {"Python": 150, "Markdown": 50, "Other": 7}
+    assert list(stats["most_tokens"].values()) == [120, 50, 30, 7]
+
+    other = StatsCollector()
+    other.process_file(tmp_path / "c.js", "x", size=1, tokens=13)
+    stats_collector.merge(other)
+    stats = stats_collector.get_stats(repo_path=tmp_path)
+    assert stats["total_tokens"] == 220
+    assert stats["tokens_by_language"]["JavaScript"] == 13
+    assert list(stats["most_tokens"])[:2] == ["a.py", "README.md"]
+    assert "c.js" in stats["most_tokens"]
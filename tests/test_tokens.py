@@ -0,0 +1,70 @@
+# tests/test_tokens.py
+import random
+import string
+import pytest
+
+from project2md.tokens import (
+    ApproximateTokenizer, Tokenizer, TokenizerError, estimate_tokens, get_tokenizer, register_tokenizer
+)
+
+def _reference_estimate(text: str) -> int:
+    """Per-character version of the estimator, used to check the byte class counting."""
+    data = text.encode('utf-8')
+    words, long_word_tokens, punctuation, newlines, high = 0, 0, 0, 0, 0
+    word_length = 0
+    for b in data + b' ':
+        is_word = chr(b) in string.ascii_letters + string.digits if b < 128 else False
+        if is_word:
+            word_length += 1
+            if word_length == 1:
+                words += 1
+            continue
+        long_word_tokens += max(0, word_length - 6) // 4
+        word_length = 0
+        if b < 128 and chr(b) in string.punctuation:
+            punctuation += 1
+        elif b == ord('\n'):
+            newlines += 1
+        elif b >= 128:
+            high += 1
+    return words + long_word_tokens + punctuation + newlines + -(-high // 3)
+
+@pytest.mark.parametrize("text, expected", [
+    ("", 0),
+    ("hello world", 2),
+    ("def foo(bar_baz):\n    return bar_baz + 1\n", 16),
+    ("getUserAccountBalanceFromDatabase", 7),
+    # Short words do not offset the extra tokens of long ones
+    ("a b c d e f getUserAccountBalanceFromDatabase", 13),
+    ("日本語", 3),
+])
+def test_estimate_tokens(text, expected):
+    assert estimate_tokens(text.encode('utf-8')) == expected
+    assert ApproximateTokenizer().count(text) == expected
+
+def test_estimate_matches_per_character_counting():
+    rng = random.Random(42)
+    alphabet = string.printable + "äöü日本語€"
+    for _ in range(200):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randrange(0, 300)))
+        assert estimate_tokens(text.encode('utf-8')) == _reference_estimate(text)
+
+def test_get_tokenizer():
+    assert isinstance(get_tokenizer("approximate"), ApproximateTokenizer)
+    with pytest.raises(TokenizerError, match="Unknown tokenizer"):
+        get_tokenizer("nonexistent")
+
+def test_register_tokenizer():
+    class CharTokenizer(Tokenizer):
+        def __init__(self, width: str = "1"):
+            self.width = int(width)
+            self.name = f"chars:{width}"
+
+        def count(self, text: str) -> int:
+            return len(text) // self.width
+
+    register_tokenizer("chars", CharTokenizer)
+    assert get_tokenizer("chars").count("abcd") == 4
+    tokenizer = get_tokenizer("chars:2")
+    assert tokenizer.name == "chars:2"
+    assert tokenizer.count("abcd") == 2
@@ -3,12 +3,36 @@ import pytest
 from pathlib import Path
 from unittest.mock import Mock, patch
 import logging
+import os
 from rich.progress import Progress
-import shutil
 
 from project2md.walker import FileSystemWalker, WalkerError
 from project2md.config import Config, PathPatterns
 
+@pytest.fixture(autouse=True)
+def remove_tmp_tree(tmp_path):
+    """
+    Empty tmp_path after each test without recursing per level.
+
+    Before Python 3.12 shutil.rmtree recurses once per directory level, so
+    pytest's cleanup of earlier runs fails on the deep test trees.
+    """
+    yield
+    stack = [(str(tmp_path), False)]
+    while stack:
+        path, emptied = stack.pop()
+        if emptied:
+            if path != str(tmp_path):
+                os.rmdir(path)
+            continue
+        stack.append((path, True))
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, False))
+                else:
+                    os.unlink(entry.path)
+
 @pytest.fixture
 def mock_progress():
     progress = Mock(spec=Progress)
@@ -133,9 +157,9 @@ def test_error_handling(walker, tmp_path, caplog):
                 print(f"{record.levelname}: {record.message}")
             raise
 
-@patch('pathlib.Path.iterdir')
-def test_permission_error_handling(mock_iterdir, walker, tmp_path):
-    mock_iterdir.side_effect = PermissionError()
+@patch('project2md.walker.os.scandir')
+def test_permission_error_handling(mock_scandir, walker, tmp_path):
+    mock_scandir.side_effect = PermissionError()
     
     # Should not raise an error, just log warning and continue
     files = walker.collect_files(tmp_path)
@@ -150,4 +174,236 @@ def test_is_binary_detection(walker):
     # Test text detection
     assert not walker._is_binary(b'Hello, World!')
     assert not walker._is_binary(b'{"key": "value"}')
-    assert not walker._is_binary(b'# Python code')
\ No newline at end of file
+    assert not walker._is_binary(b'# Python code')
+
+def test_excluded_directories_are_pruned(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src/main.py").write_text("print('hi')")
+    (tmp_path / "node_modules/pkg").mkdir(parents=True)
+    (tmp_path / "node_modules/pkg/index.js").write_text("module.exports = {}")
+
+    config = Config()
+    config.exclude = PathPatterns(files=[], dirs=["node_modules"])
+    walker = FileSystemWalker(config, Mock())
+
+    with patch('project2md.walker.os.scandir', side_effect=os.scandir) as mock_scandir:
+        files = walker.collect_files(tmp_path)
+
+    listed = {Path(call.args[0]).name for call in mock_scandir.call_args_list}
+    assert "node_modules" not in listed
+    assert "pkg" not in listed
+    assert files == [tmp_path / "src/main.py"]
+    assert walker.get_walk_stats()["pruned_dirs"] == 1
+
+
+def test_negated_exclude_disables_pruning(tmp_path):
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build/keep.txt").write_text("keep")
+    (tmp_path / "build/drop.txt").write_text("drop")
+
+    config = Config()
+    config.exclude = PathPatterns(files=["build/", "!build/keep.txt"], dirs=[])
+    walker = FileSystemWalker(config, Mock())
+
+    files = walker.collect_files(tmp_path)
+    assert tmp_path / "build/keep.txt" in files
+
+
+def test_deep_tree_does_not_recurse(tmp_path):
+    current = tmp_path
+    for _ in range(1200):
+        current = current / "d"
+        current.mkdir()
+    (current / "deep.txt").write_text("deep")
+
+    config = Config()
+    config.general.max_depth = 2000
+    walker = FileSystemWalker(config, Mock())
+
+    files = walker.collect_files(tmp_path)
+    assert files == [current / "deep.txt"]
+
+
+def test_collected_files_carry_stat(tmp_path):
+    (tmp_path / "a.txt").write_text("hello")
+    walker = FileSystemWalker(Config(), Mock())
+
+    files = walker.collect_files(tmp_path)
+    assert walker.get_stat(files[0]).st_size == 5
+
+
+def test_iter_files_streams_in_sorted_order(tmp_path):
+    for rel in ["b.txt", "b/c.txt", "a/z.txt", "a-b.txt", "A.txt", "b/a/d.txt"]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel)
+
+    walker = FileSystemWalker(Config(), Mock())
+    iterator = walker.iter_files(tmp_path)
+
+    first = next(iterator)
+    files = [first] + list(iterator)
+    assert files == sorted(files)
+    assert len(files) == 6
+
+
+def test_read_files_keeps_order_with_workers(tmp_path):
+    paths = []
+    for i in range(20):
+        path = tmp_path / f"file{i:02d}.txt"
+        path.write_text(f"content {i}")
+        paths.append(path)
+
+    walker = FileSystemWalker(Config(), Mock())
+    results = list(walker.read_files(paths, workers=4, max_in_flight=3))
+
+    assert [path for path, _ in results] == paths
+    assert [content for _, content in results] == [f"content {i}" for i in range(20)]
+
+
+def test_read_file_single_open_and_read(tmp_path):
+    test_file = tmp_path / "sjis.txt"
+    test_file.write_bytes("これは日本語のテストファイルです。よろしくお願いします。\n".encode('shift_jis') * 10)
+
+    walker = FileSystemWalker(Config(), Mock())
+    files = walker.collect_files(tmp_path)
+    content = walker.read_file(files[0])
+
+    assert content is not None
+    assert "日本語" in content
+    io_stats = walker.get_io_stats()
+    assert io_stats["files_read"] == 1
+    assert io_stats["open"] == 1
+    assert io_stats["fstat"] == 1
+    assert io_stats["read"] == 1
+
+
+def test_read_file_normalizes_newlines(tmp_path):
+    test_file = tmp_path / "crlf.txt"
+    test_file.write_bytes(b"line1\r\nline2\r\n")
+
+    walker = FileSystemWalker(Config(), Mock())
+    assert walker.read_file(test_file) == "line1\nline2\n"
+
+
+def test_read_file_rejects_binary_after_one_small_read(tmp_path):
+    test_file = tmp_path / "blob"  # no extension to give it away
+    test_file.write_bytes(b'\x7fELF' + bytes(range(256)) * 400)
+
+    walker = FileSystemWalker(Config(), Mock())
+    assert walker.read_file(test_file) is None
+
+    io_stats = walker.get_io_stats()
+    assert io_stats["binary_skipped"] == 1
+    assert io_stats["read"] == 1
+
+
+def test_is_binary_accepts_utf8_multibyte(walker):
+    text = ("日本語のテキスト " * 2000).encode('utf-8')
+    assert not walker._is_binary(text)
+    # A block boundary may cut a multibyte sequence in half
+    assert not walker._is_binary(text[:walker.SNIFF_SIZE])
+    assert not walker._is_binary("﻿hello".encode('utf-16'))
+    assert walker._is_binary(bytes(range(1, 32)) * 10)
+
+
+def test_iter_files_from_tracked_entries(tmp_path):
+    from project2md.git import TrackedFile
+
+    def tracked(path, size=1):
+        return TrackedFile(path, "0" * 40, 0o100644, size, 1, 1, 0, 0)
+
+    config = Config()
+    config.exclude = PathPatterns(files=[], dirs=["vendor"])
+    config.general.max_depth = 2
+    walker = FileSystemWalker(config, Mock())
+
+    entries = [
+        tracked("src/b.py", 7),
+        tracked("vendor/lib/x.py"),
+        tracked("a/b/c/too_deep.py"),
+        tracked("README.md"),
+        tracked("src/a.py"),
+    ]
+    files = walker.collect_files(tmp_path, entries)
+
+    assert files == [tmp_path / "README.md", tmp_path / "src/a.py", tmp_path / "src/b.py"]
+    assert walker.get_size(tmp_path / "src/b.py") == 7
+    assert walker.get_walk_stats()["pruned_dirs"] == 1
+
+
+def test_nested_gitignore_files(tmp_path):
+    (tmp_path / ".gitignore").write_text("*.log\nbuild/\n")
+    (tmp_path / "app.py").write_text("app")
+    (tmp_path / "root.log").write_text("log")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build/out.py").write_text("out")
+    (tmp_path / "pkg/generated").mkdir(parents=True)
+    (tmp_path / "pkg/.gitignore").write_text("/generated/\n!keep.log\n")
+    (tmp_path / "pkg/mod.py").write_text("mod")
+    (tmp_path / "pkg/keep.log").write_text("keep")
+    (tmp_path / "pkg/drop.log").write_text("drop")
+    (tmp_path / "pkg/generated/gen.py").write_text("gen")
+
+    config = Config()
+    walker = FileSystemWalker(config, Mock())
+    files = [f.relative_to(tmp_path).as_posix() for f in walker.collect_files(tmp_path)]
+
+    assert "app.py" in files
+    assert "pkg/mod.py" in files
+    assert "pkg/keep.log" in files
+    assert "root.log" not in files
+    assert "pkg/drop.log" not in files
+    assert "build/out.py" not in files
+    assert "pkg/generated/gen.py" not in files
+    assert walker.get_walk_stats()["pruned_dirs"] == 2
+
+
+def _commit_tree(repo_path, files):
+    import git
+    from project2md.git import GitHandler
+
+    repo = git.Repo.init(repo_path)
+    for name, data in files.items():
+        (repo_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (repo_path / name).write_bytes(data)
+    repo.index.add(list(files))
+    repo.index.commit("Initial commit")
+    for name in files:
+        (repo_path / name).unlink()
+    return repo, GitHandler._parse_ls_tree(repo.git.ls_tree('-r', '-z', '-l', 'HEAD'))
+
+
+def test_read_files_from_blobs(tmp_path):
+    from project2md.blobs import BlobReader
+
+    repo, entries = _commit_tree(tmp_path, {
+        "src/app.py": b"print('hi')\r\n",
+        "data.txt": b"\x00\x01\x02binary",
+        "empty.md": b"",
+    })
+    # Symlinks are stored as blobs holding the target path
+    app = next(entry for entry in entries if entry.path == "src/app.py")
+    entries.append(app._replace(path="link.py", mode=0o120000))
+
+    reader = BlobReader(repo.git_dir)
+    walker = FileSystemWalker(Config(), Mock())
+    try:
+        files = walker.collect_files(tmp_path, entries, blob_reader=reader)
+        assert files == [tmp_path / "data.txt", tmp_path / "empty.md", tmp_path / "link.py", tmp_path / "src/app.py"]
+        assert walker.read_file(tmp_path / "src/app.py") == "print('hi')\n"
+        assert walker.read_file(tmp_path / "link.py") is None
+
+        contents = dict(walker.read_files(files, workers=4))
+    finally:
+        reader.close()
+    assert contents == {
+        tmp_path / "data.txt": None,
+        tmp_path / "empty.md": None,
+        tmp_path / "link.py": None,
+        tmp_path / "src/app.py": "print('hi')\n",
+    }
+    assert walker.get_size(tmp_path / "src/app.py") == len(b"print('hi')\r\n")
+    # Empty files and symlinks are never requested
+    assert walker.get_io_stats()["blobs_read"] == 3
+    assert walker.get_io_stats()["open"] == 0